@@ -0,0 +1,591 @@
+from datetime import datetime, timedelta
+import re
+
+from Cake import Cake
+from Cup import Cup
+from Belt import Belt
+from Product import Product
+from ProductManager import ProductManager
+
+# Bump whenever parsed command objects change their meaning or layout
+PARSER_VERSION = 6
+
+# Later keywords must be whole words, so lines like BEGINNING stay unknown commands
+COMMAND_RE = re.compile(r"ADD|REM|SAVE|(?:BEGIN|COMMIT|ROLLBACK|COUNT|SUM|SELECT)(?!\S)")
+DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+# Well formed ADD data, anything else goes through the generic split path
+ADD_RE = re.compile(r"(Belt|Cake|Cup) *; *(\d{1,2}\.\d{1,2}\.\d{4}) *; *([^;]*?) *; *(\d+) *; *([^;]*?) *")
+CONDITION_RE = re.compile(
+    # Range condition (e.g., "100 <= amount <= 300")
+    r"(?P<min>.+) (?P<min_sign><=|<) (?P<range_field>supplyDate|amount|special) (?P<max_sign><=|<) (?P<max>.+)"
+    # Equal condition (e.g., "name = Test name")
+    r"|(?P<equal_field>supplyDate|name|amount|special) (?P<equal_sign>=|!=) (?P<equal_value>.+)"
+    # Greater or below condition (e.g., "amount > 100")
+    r"|(?P<field>supplyDate|amount|special) (?P<sign><=|>=|<|>) (?P<value>.+)"
+    # Type condition (e.g., "type = Cup")
+    r"|type (?P<type_sign>=|!=) (?P<type_name>Belt|Cake|Cup)$"
+)
+SUM_RE = re.compile(r"(?P<field>amount|special)(?: WHERE (?P<condition>.+))?")
+SELECT_RE = re.compile(r"(?:(?P<condition>.+) )?INTO (?P<filename>.+)")
+# Splits compound conditions (e.g., "type = Cup AND NOT (amount >= 10 OR special = 0)") at keywords, parentheses are split off separately
+CONDITION_KEYWORD_RE = re.compile(r"\s*\b(AND|OR|NOT)\b\s*")
+COMPOUND_RE = re.compile(r"\b(AND|OR|NOT)\b|^\(")
+# A keyword followed by something shaped like a condition, such text is never taken as one simple condition
+CONDITION_AFTER_KEYWORD_RE = re.compile(r"\b(?:AND|OR|NOT)\b\s*(?:\(|(?:supplyDate|name|amount|special|type|NOT)\b|\S+ [<>=!])")
+
+class Command:
+    """Base class for parsed command file lines"""
+    
+    __slots__ = ("line_num", "line")
+    
+    # Command name used in monitoring
+    keyword = "UNKNOWN"
+    
+    def __init__(self, line_num: int, line: str):
+        """
+        Initialize a command
+        
+        Args:
+            line_num (int): Line number in the command file
+            line (str): Stripped source line
+        """
+        self.line_num = line_num
+        self.line = line
+
+class AddCommand(Command):
+    """ADD command with an already built product"""
+    
+    __slots__ = ("product",)
+    keyword = "ADD"
+    
+    def __init__(self, line_num: int, line: str, product: Product):
+        super().__init__(line_num, line)
+        self.product = product
+
+class RemoveCommand(Command):
+    """REM command with a validated condition"""
+    
+    __slots__ = ("condition",)
+    keyword = "REM"
+    
+    def __init__(self, line_num: int, line: str, condition):
+        super().__init__(line_num, line)
+        self.condition = condition
+
+class SaveCommand(Command):
+    """SAVE command with a target file"""
+    
+    __slots__ = ("filename",)
+    keyword = "SAVE"
+    
+    def __init__(self, line_num: int, line: str, filename: str):
+        super().__init__(line_num, line)
+        self.filename = filename
+
+class TransactionCommand(Command):
+    """BEGIN, COMMIT or ROLLBACK command"""
+    
+    __slots__ = ("action",)
+    
+    def __init__(self, line_num: int, line: str, action: str):
+        super().__init__(line_num, line)
+        self.action = action
+    
+    @property
+    def keyword(self) -> str:
+        """Get BEGIN, COMMIT or ROLLBACK"""
+        return self.action
+    
+class QueryCommand(Command):
+    """Read-only COUNT, SUM or SELECT command"""
+    
+    __slots__ = ("kind", "condition", "field", "filename")
+    
+    def __init__(self, line_num: int, line: str, kind: str, condition, field: str|None = None, filename: str|None = None):
+        """
+        Initialize a query
+        
+        Args:
+            line_num (int): Line number in the command file
+            line (str): Stripped source line
+            kind (str): COUNT, SUM or SELECT
+            condition: REM style condition, None for all products
+            field (str|None): Summed field of SUM
+            filename (str|None): Output file of SELECT
+        """
+        super().__init__(line_num, line)
+        self.kind = kind
+        self.condition = condition
+        self.field = field
+        self.filename = filename
+    
+    @property
+    def keyword(self) -> str:
+        """Get COUNT, SUM or SELECT"""
+        return self.kind
+    
+    def predicate(self):
+        """Get a check for one product, None selects all products"""
+        if self.condition is None:
+            return None
+        return self.condition.predicate() or (lambda product: False)
+
+class UnknownCommand(Command):
+    """Line that is not a command, only logged as a warning"""
+    
+    __slots__ = ()
+
+class InvalidCommand(Command):
+    """Command that failed validation, raised when executed"""
+    
+    __slots__ = ("error",)
+    keyword = "INVALID"
+    
+    def __init__(self, line_num: int, line: str, error: str):
+        super().__init__(line_num, line)
+        self.error = error
+
+class RangeCondition:
+    """Field value in [range_min, range_max]"""
+    
+    __slots__ = ("field", "range_min", "range_max")
+    
+    def __init__(self, field: str, range_min: int|datetime, range_max: int|datetime):
+        self.field = field
+        self.range_min = range_min
+        self.range_max = range_max
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_by_range(self.field, self.range_min, self.range_max)
+    
+    def predicate(self):
+        """Get a check for one product, None if the field is not supported"""
+        return ProductManager.range_predicate(self.field, self.range_min, self.range_max)
+
+class EqualCondition:
+    """Field value (as string) equal or not equal to value"""
+    
+    __slots__ = ("field", "value", "is_equal")
+    
+    def __init__(self, field: str, value: str, is_equal: bool):
+        self.field = field
+        self.value = value
+        self.is_equal = is_equal
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_equal(self.field, self.value, self.is_equal)
+    
+    def predicate(self):
+        """Get a check for one product, None if the field is not supported"""
+        return ProductManager.equal_predicate(self.field, self.value, self.is_equal)
+
+class InequalityCondition:
+    """Field value greater equal or below equal than value"""
+    
+    __slots__ = ("field", "value", "is_greater")
+    
+    def __init__(self, field: str, value: int|datetime, is_greater: bool):
+        self.field = field
+        self.value = value
+        self.is_greater = is_greater
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_by_inequality(self.field, self.value, self.is_greater)
+    
+    def predicate(self):
+        """Get a check for one product, None if the field is not supported"""
+        return ProductManager.inequality_predicate(self.field, self.value, self.is_greater)
+
+class TypeCondition:
+    """Product is or is not of a type"""
+    
+    __slots__ = ("type_name", "is_equal")
+    
+    def __init__(self, type_name: str, is_equal: bool):
+        self.type_name = type_name
+        self.is_equal = is_equal
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_where(self.predicate())
+    
+    def predicate(self):
+        """Get a check for one product"""
+        return ProductManager.type_predicate(self.type_name, self.is_equal)
+
+class CompoundCondition:
+    """Conditions joined by AND or OR, checked together in one pass"""
+    
+    __slots__ = ("operator", "conditions")
+    
+    def __init__(self, operator: str, conditions: list):
+        self.operator = operator
+        self.conditions = conditions
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_where(self.predicate())
+    
+    def predicate(self):
+        """Get a check for one product, unsupported parts never match"""
+        predicates = [condition.predicate() or (lambda product: False) for condition in self.conditions]
+        result = predicates[0]
+        # Nested lambdas short-circuit without the generator overhead of all()/any()
+        for right in predicates[1:]:
+            if self.operator == "AND":
+                result = (lambda left, right: lambda product: left(product) and right(product))(result, right)
+            else:
+                result = (lambda left, right: lambda product: left(product) or right(product))(result, right)
+        return result
+
+class NotCondition:
+    """Negated condition"""
+    
+    __slots__ = ("condition",)
+    
+    def __init__(self, condition):
+        self.condition = condition
+    
+    def apply(self, product_manager) -> int:
+        """Remove matching products, returns number of removed ones"""
+        return product_manager.remove_where(self.predicate())
+    
+    def predicate(self):
+        """Get a check for one product, unsupported conditions never match so their negation always does"""
+        predicate = self.condition.predicate()
+        if predicate is None:
+            return lambda product: True
+        return lambda product: not predicate(product)
+
+class CommandParser:
+    """Turns command file lines into typed commands in one pass"""
+    
+    def __init__(self):
+        """Initialize a cache of parsed dates (supply files reuse few dates)"""
+        self.dates = {}
+    
+    def parse_file(self, filename: str) -> list[Command]:
+        """
+        Parse a whole command file
+        
+        Args:
+            filename (str): Path to file
+        
+        Returns:
+            list[Command]: Parsed commands
+        """
+        with open(filename, 'r') as file:
+            return list(self.parse(file))
+    
+    def parse(self, lines):
+        """
+        Parse command lines lazily, skipping empty lines and comments
+        
+        Args:
+            lines (Iterable[str]): Command lines
+        
+        Yields:
+            Command: Parsed command for every meaningful line
+        """
+        for line_num, line in enumerate(lines, 1):
+            line = line.strip()
+            if line and line[0] != '#':
+                yield self.parse_line(line_num, line)
+    
+    def parse_line(self, line_num: int, line: str) -> Command:
+        """
+        Parse one stripped command line
+        
+        Args:
+            line_num (int): Line number in the command file
+            line (str): Stripped line
+        
+        Returns:
+            Command: Parsed command, InvalidCommand if validation failed
+        """
+        match = COMMAND_RE.match(line)
+        if match is None:
+            return UnknownCommand(line_num, line)
+        keyword = match.group()
+        argument = line[len(keyword) + 1:].strip()
+        try:
+            if keyword == "ADD":
+                return AddCommand(line_num, line, self.parse_product(argument))
+            elif keyword == "REM":
+                return RemoveCommand(line_num, line, self.parse_condition(argument))
+            elif keyword == "SAVE":
+                return SaveCommand(line_num, line, argument)
+            elif keyword in ("COUNT", "SUM", "SELECT"):
+                return self.parse_query(line_num, line, keyword, argument)
+            if argument:
+                raise ValueError(f"{keyword} takes no arguments: {argument}")
+            return TransactionCommand(line_num, line, keyword)
+        except Exception as e:
+            return InvalidCommand(line_num, line, str(e))
+    
+    def parse_query(self, line_num: int, line: str, keyword: str, argument: str) -> QueryCommand:
+        """
+        Parse a read-only query
+        
+        Syntax is "COUNT [condition]", "SUM amount|special [WHERE condition]"
+        or "SELECT condition|* INTO filename", conditions as in REM.
+        
+        Args:
+            line_num (int): Line number in the command file
+            line (str): Stripped line
+            keyword (str): COUNT, SUM or SELECT
+            argument (str): Text after the keyword
+        
+        Returns:
+            QueryCommand: Parsed query
+        """
+        if keyword == "COUNT":
+            return QueryCommand(line_num, line, keyword, self.parse_condition(argument) if argument else None)
+        if keyword == "SUM":
+            match = SUM_RE.fullmatch(argument)
+            if match is None:
+                raise ValueError(f"Invalid SUM command format: {argument}")
+            condition = match.group("condition")
+            return QueryCommand(line_num, line, keyword, self.parse_condition(condition) if condition else None, field=match.group("field"))
+        match = SELECT_RE.fullmatch(argument)
+        if match is None:
+            raise ValueError(f"Invalid SELECT command format: {argument}")
+        condition = match.group("condition")
+        return QueryCommand(line_num, line, keyword, self.parse_condition(condition) if condition not in (None, "*") else None,
+                            filename=match.group("filename"))
+    
+    def parse_product(self, data: str) -> Product:
+        """
+        Build a product from ADD data
+        
+        Args:
+            data (str): New product data in csv format (Ex: Cake; 01.01.2028; Name; 10; 20)
+        
+        Returns:
+            Product: Parsed product
+        """
+        match = ADD_RE.fullmatch(data)
+        if match is None:
+            return self._parse_product_fields(data)
+        product_type, date_text, name, amount, special = match.groups()
+        supply_date = self.dates.get(date_text)
+        if supply_date is None:
+            supply_date = self.dates[date_text] = self.parse_date(date_text)
+        
+        if product_type == "Belt":
+            return Belt(supply_date, name, int(amount), special.lower() == "true")
+        elif product_type == "Cake":
+            return Cake(supply_date, name, int(amount), int(special))
+        return Cup(supply_date, name, int(amount), int(special))
+    
+    def _parse_product_fields(self, data: str) -> Product:
+        """
+        Build a product from irregular ADD data, field by field
+        
+        Args:
+            data (str): New product data in csv format
+        
+        Returns:
+            Product: Parsed product
+        """
+        parts = data.split(';')
+        if len(parts) < 5:
+            raise ValueError("Invalid ADD command format")
+        
+        product_type = parts[0].strip()
+        supply_date = self.parse_date(parts[1].strip())
+        name = parts[2].strip()
+        amount = int(parts[3])
+        special = parts[4].strip()
+        
+        if product_type == "Belt":
+            return Belt(supply_date, name, amount, special.lower() == "true")
+        elif product_type == "Cake":
+            return Cake(supply_date, name, amount, int(special))
+        elif product_type == "Cup":
+            return Cup(supply_date, name, amount, int(special))
+        raise ValueError(f"Unknown product type: {product_type}")
+    
+    @staticmethod
+    def parse_date(text: str) -> datetime:
+        """
+        Parse a dd.mm.yyyy date without strptime
+        
+        Args:
+            text (str): Date text
+        
+        Returns:
+            datetime: Parsed date at midnight
+        """
+        match = DATE_RE.fullmatch(text)
+        if match is None:
+            # Gives the usual strptime error message
+            return datetime.strptime(text, "%d.%m.%Y")
+        return datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+    
+    def parse_condition(self, condition: str):
+        """
+        Validate a REM condition, simple or combined with AND, OR, NOT and parentheses
+        
+        AND binds tighter than OR. A condition that is not a valid compound one
+        is parsed as a single condition, so values may contain the keywords
+        (Ex: name = Tom AND Jerry), unless a keyword is followed by a field,
+        NOT or a parenthesis (Ex: a typo like name != Foo AND amount >> 5).
+        
+        Args:
+            condition (str): Condition for removing (Ex: field < 100 AND type = Cup)
+        
+        Returns:
+            RangeCondition|EqualCondition|InequalityCondition|TypeCondition|CompoundCondition|NotCondition: Typed condition
+        """
+        if COMPOUND_RE.search(condition) is None:
+            return self.parse_simple_condition(condition)
+        tokens = self._condition_tokens(condition)
+        try:
+            parsed, position = self._parse_or(tokens, 0)
+            if position != len(tokens):
+                raise ValueError(f"Unexpected '{tokens[position]}' in REM condition: {condition}")
+            return parsed
+        except ValueError as error:
+            if CONDITION_AFTER_KEYWORD_RE.search(condition):
+                raise
+            try:
+                return self.parse_simple_condition(condition)
+            except ValueError:
+                # The compound error explains more
+                raise error
+    
+    @staticmethod
+    def _condition_tokens(condition: str) -> list[str]:
+        """
+        Split a compound condition into simple conditions, keywords and parentheses
+        
+        Parentheses group only at the start of a simple condition or as unbalanced
+        ones at its end, so values like "name = Foo (bar)" keep theirs.
+        
+        Args:
+            condition (str): Compound condition
+        
+        Returns:
+            list[str]: Tokens
+        """
+        tokens = []
+        for part in CONDITION_KEYWORD_RE.split(condition):
+            if part in ("AND", "OR", "NOT"):
+                tokens.append(part)
+                continue
+            part = part.strip()
+            while part.startswith("("):
+                tokens.append("(")
+                part = part[1:].lstrip()
+            closing = 0
+            unbalanced = part.count(")") - part.count("(")
+            while closing < unbalanced and part.endswith(")"):
+                closing += 1
+                part = part[:-1].rstrip()
+            if part:
+                tokens.append(part)
+            tokens += [")"] * closing
+        return tokens
+    
+    def _parse_or(self, tokens: list[str], position: int) -> tuple:
+        """Parse terms joined by OR, returns condition and next token position"""
+        conditions = []
+        while True:
+            condition, position = self._parse_and(tokens, position)
+            conditions.append(condition)
+            if position == len(tokens) or tokens[position] != "OR":
+                break
+            position += 1
+        return (conditions[0] if len(conditions) == 1 else CompoundCondition("OR", conditions)), position
+    
+    def _parse_and(self, tokens: list[str], position: int) -> tuple:
+        """Parse factors joined by AND, returns condition and next token position"""
+        conditions = []
+        while True:
+            condition, position = self._parse_factor(tokens, position)
+            conditions.append(condition)
+            if position == len(tokens) or tokens[position] != "AND":
+                break
+            position += 1
+        return (conditions[0] if len(conditions) == 1 else CompoundCondition("AND", conditions)), position
+    
+    def _parse_factor(self, tokens: list[str], position: int) -> tuple:
+        """Parse NOT, a parenthesized condition or a simple condition, returns condition and next token position"""
+        if position == len(tokens):
+            raise ValueError("Incomplete REM condition")
+        token = tokens[position]
+        if token == "NOT":
+            condition, position = self._parse_factor(tokens, position + 1)
+            return NotCondition(condition), position
+        if token == "(":
+            condition, position = self._parse_or(tokens, position + 1)
+            if position == len(tokens) or tokens[position] != ")":
+                raise ValueError("Missing ')' in REM condition")
+            return condition, position + 1
+        if token in ("AND", "OR", ")"):
+            raise ValueError(f"Unexpected '{token}' in REM condition")
+        return self.parse_simple_condition(token), position + 1
+    
+    def parse_simple_condition(self, condition: str) -> RangeCondition|EqualCondition|InequalityCondition|TypeCondition:
+        """
+        Validate a single field condition
+        
+        Args:
+            condition (str): Condition for removing (Ex: field < 100)
+        
+        Returns:
+            RangeCondition|EqualCondition|InequalityCondition|TypeCondition: Typed condition
+        """
+        match = CONDITION_RE.match(condition)
+        if match is None:
+            raise ValueError(f"Unsupported REM condition: {condition}")
+        
+        if match.group("range_field"):
+            field = match.group("range_field")
+            try:
+                if field == "supplyDate":
+                    range_min = datetime.fromisoformat(match.group("min"))
+                    range_max = datetime.fromisoformat(match.group("max"))
+                    step = timedelta(microseconds=1)
+                else:
+                    range_min = int(match.group("min"))
+                    range_max = int(match.group("max"))
+                    step = 1
+                if match.group("min_sign") == "<":
+                    range_min += step
+                if match.group("max_sign") == "<":
+                    range_max -= step
+                if range_min > range_max:
+                    raise ValueError(f"Incorrect condition min/max values: {range_min} > {range_max}")
+            except ValueError:
+                if field == "supplyDate":
+                    raise ValueError(f"Incorrect special field value. Only dates and integers are supported.")
+                raise ValueError(f"Incorrect special field value. Only dates and integers are supported: {match.group('min')}, {match.group('max')}")
+            return RangeCondition(field, range_min, range_max)
+        
+        if match.group("type_name"):
+            return TypeCondition(match.group("type_name"), match.group("type_sign") == "=")
+        
+        if match.group("equal_field"):
+            return EqualCondition(match.group("equal_field"), match.group("equal_value"), match.group("equal_sign") == "=")
+        
+        field = match.group("field")
+        sign = match.group("sign")
+        try:
+            if field == "supplyDate":
+                value = datetime.fromisoformat(match.group("value"))
+                step = timedelta(microseconds=1)
+            else:
+                value = int(match.group("value"))
+                step = 1
+        except ValueError:
+            raise ValueError(f"Incorrect special field value. Only dates and integers are supported.")
+        if sign == "<":
+            value -= step
+        elif sign == ">":
+            value += step
+        return InequalityCondition(field, value, sign.startswith(">"))
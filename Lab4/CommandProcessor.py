@@ -0,0 +1,371 @@
+from CommandParser import CommandParser, Command, AddCommand, RemoveCommand, SaveCommand, TransactionCommand, QueryCommand, InvalidCommand
+from Logger import Logger
+from ProductJournal import ProductJournal
+from ScenarioCache import ScenarioCache
+from ProductManager import ProductManager
+from ProductFileHandler import ProductFileHandler
+from Metrics import Metrics
+from Profiler import Profiler
+from itertools import compress
+import time
+
+class ExplainEntry:
+    """Dry run result of one command"""
+    
+    __slots__ = ("line_num", "line", "matches", "seconds", "error")
+    
+    def __init__(self, line_num: int, line: str, matches: int|None, seconds: float, error: str|None = None):
+        """
+        Initialize a result
+        
+        Args:
+            line_num (int): Line number in the command file
+            line (str): Command line
+            matches (int|None): Rows added, removed, saved or queried, None for unknown commands
+            seconds (float): Evaluation time
+            error (str|None): Why the command would fail
+        """
+        self.line_num = line_num
+        self.line = line
+        self.matches = matches
+        self.seconds = seconds
+        self.error = error
+    
+    def __str__(self) -> str:
+        """String representation of the result"""
+        if self.error is not None:
+            return f"line {self.line_num}: {self.line} -> would fail: {self.error}"
+        if self.matches is None:
+            return f"line {self.line_num}: {self.line} -> unknown command, skipped"
+        return f"line {self.line_num}: {self.line} -> {self.matches} rows ({self.seconds * 1000:.1f} ms)"
+
+class CommandProcessor:
+    """Handles processing of command files following SRP"""
+    
+    # Executed commands by keyword, shared by all processors for monitoring
+    command_counts = {}
+    
+    def __init__(self, product_manager: ProductManager, file_handler: ProductFileHandler, logger: Logger,
+                 atomic: bool = False, cache: ScenarioCache|None = None, output=None):
+        """
+        First call initialization
+        
+        Args:
+            product_manager (ProductManager): Instance of ProductManager in use
+            logger (Logger): Instance of Logger in use
+            atomic (bool): Run every command file as one transaction
+            cache (ScenarioCache|None): Cache of parsed command files, parse every time if None
+            output (Callable[[str], None]|None): Receives a result line for every query (Ex: print)
+        """
+        self.product_manager = product_manager
+        self.logger = logger
+        self.file_handler = file_handler
+        self.parser = CommandParser()
+        self.atomic = atomic
+        self.cache = cache
+        self.output = output
+        # Open transactions as (BEGIN line number, journal), 0 for the implicit one
+        self.transactions = []
+    
+    @Profiler.profiled("process_command_file")
+    def process_command_file(self, filename: str) -> bool:
+        """
+        Process a command file line by line
+        
+        Args:
+            filename (str): Path to file
+        
+        Returns:
+            bool: True if every command was executed
+        """
+        try:
+            if self.cache is not None:
+                self._run(self.cache.load(filename, self.parser))
+            else:
+                with open(filename, 'r') as file:
+                    self._run(self.parser.parse(file))
+            return True
+        except FileNotFoundError:
+            self.logger.log_message("ERROR", f"Command file not found: {filename}")
+        except Exception as e:
+            self.logger.log_message("ERROR", f"Failed to process command file: {str(e)}")
+        return False
+    
+    def process_commands(self, lines) -> bool:
+        """
+        Process commands from any iterable of lines (Ex: sys.stdin)
+        
+        Args:
+            lines (Iterable[str]): Command lines
+        
+        Returns:
+            bool: True if every command was executed
+        """
+        try:
+            self._run(self.parser.parse(lines))
+            return True
+        except Exception as e:
+            self.logger.log_message("ERROR", f"Failed to process commands: {str(e)}")
+        return False
+    
+    def explain_command_file(self, filename: str) -> list[ExplainEntry]:
+        """
+        Dry run a command file without changing products
+        
+        Args:
+            filename (str): Path to file
+        
+        Returns:
+            list[ExplainEntry]: Result per command, up to the first failing one
+        """
+        if self.cache is not None:
+            return self.explain(self.cache.load(filename, self.parser))
+        with open(filename, 'r') as file:
+            return self.explain(self.parser.parse(file))
+    
+    def explain_commands(self, lines) -> list[ExplainEntry]:
+        """
+        Dry run command lines without changing products
+        
+        Args:
+            lines (Iterable[str]): Command lines
+        
+        Returns:
+            list[ExplainEntry]: Result per command, up to the first failing one
+        """
+        return self.explain(self.parser.parse(lines))
+    
+    def explain(self, commands) -> list[ExplainEntry]:
+        """
+        Report how many rows each command would touch
+        
+        Products are never copied: removals are simulated with a byte mask
+        over ProductManager.products and ADD rows are kept aside.
+        
+        Args:
+            commands (Iterable[Command]): Parsed commands
+        
+        Returns:
+            list[ExplainEntry]: Result per command, up to the first failing one
+        """
+        products = self.product_manager.products
+        removed = bytearray(len(products))
+        added = []
+        added_removed = bytearray()
+        live = len(products)
+        # Per open transaction: (removed rows, removed added rows, added count, live count)
+        transactions = []
+        entries = []
+        for command in commands:
+            start = time.perf_counter()
+            matches = None
+            error = None
+            if isinstance(command, AddCommand):
+                added.append(command.product)
+                added_removed.append(0)
+                matches = 1
+                live += 1
+            elif isinstance(command, RemoveCommand):
+                predicate = command.condition.predicate()
+                rows = []
+                added_rows = []
+                if predicate is not None:
+                    try:
+                        rows = [row for row in compress(range(len(products)), map(predicate, products)) if not removed[row]]
+                        added_rows = [row for row in compress(range(len(added)), map(predicate, added)) if not added_removed[row]]
+                    except Exception as e:
+                        error = str(e)
+                for row in rows:
+                    removed[row] = 1
+                for row in added_rows:
+                    added_removed[row] = 1
+                if transactions:
+                    transactions[-1][0].extend(rows)
+                    transactions[-1][1].extend(added_rows)
+                matches = len(rows) + len(added_rows)
+                live -= matches
+            elif isinstance(command, SaveCommand):
+                matches = live
+            elif isinstance(command, QueryCommand):
+                predicate = command.predicate()
+                if predicate is None:
+                    matches = live
+                else:
+                    try:
+                        matches = sum(1 for row in compress(range(len(products)), map(predicate, products)) if not removed[row])
+                        matches += sum(1 for row in compress(range(len(added)), map(predicate, added)) if not added_removed[row])
+                    except Exception as e:
+                        error = str(e)
+            elif isinstance(command, TransactionCommand):
+                matches = 0
+                if command.action == "BEGIN":
+                    transactions.append(([], [], len(added), live))
+                elif not transactions:
+                    error = f"{command.action} without BEGIN"
+                elif command.action == "COMMIT":
+                    rows, added_rows, _, _ = transactions.pop()
+                    if transactions:
+                        transactions[-1][0].extend(rows)
+                        transactions[-1][1].extend(added_rows)
+                else:
+                    rows, added_rows, added_count, live = transactions.pop()
+                    for row in rows:
+                        removed[row] = 0
+                    for row in added_rows:
+                        added_removed[row] = 0
+                    del added[added_count:]
+                    del added_removed[added_count:]
+            elif isinstance(command, InvalidCommand):
+                error = command.error
+            entries.append(ExplainEntry(command.line_num, command.line, matches, time.perf_counter() - start, error))
+            if error is not None:
+                break
+        return entries
+    
+    def _run(self, commands) -> None:
+        """
+        Execute parsed commands, stop at the first failing one
+        
+        Open transactions are rolled back when a command fails
+        or when the commands end before COMMIT.
+        
+        Args:
+            commands (Iterable[Command]): Parsed commands
+        """
+        self.transactions = [(0, ProductJournal(self.product_manager))] if self.atomic else []
+        try:
+            # Runs of ADD commands are appended with one bulk insert
+            batch = []
+            for command in commands:
+                if isinstance(command, AddCommand):
+                    batch.append(command.product)
+                    continue
+                if batch:
+                    self._add_batch(batch)
+                    batch = []
+                self.execute(command)
+            self._add_batch(batch)
+        except Exception:
+            self._rollback_transactions(0)
+            raise
+        explicit = 1 if self.atomic else 0
+        if len(self.transactions) > explicit:
+            self.logger.log_message("WARNING", f"Transaction started at line {self.transactions[-1][0]} was not committed")
+            self._rollback_transactions(explicit)
+        if self.transactions:
+            self.transactions.pop()[1].close()
+    
+    def execute(self, command: Command) -> int:
+        """
+        Execute one parsed command
+        
+        Args:
+            command (Command): Parsed command
+        
+        Returns:
+            int: Rows added, removed or saved, result of a query
+        """
+        keyword = command.keyword
+        self.command_counts[keyword] = self.command_counts.get(keyword, 0) + 1
+        if not Metrics.enabled:
+            return self._execute_command(command)
+        start = time.perf_counter()
+        result = self._execute_command(command)
+        Metrics.record(f"CommandProcessor.{type(command).__name__}", time.perf_counter() - start, result)
+        return result
+    
+    def _add_batch(self, products: list) -> None:
+        """Append products of consecutive ADD commands with one bulk insert"""
+        self.command_counts["ADD"] = self.command_counts.get("ADD", 0) + len(products)
+        if not Metrics.enabled:
+            self.product_manager.add_products(products)
+            return
+        start = time.perf_counter()
+        self.product_manager.add_products(products)
+        if products:
+            Metrics.record("CommandProcessor.AddCommand", time.perf_counter() - start, len(products))
+    
+    def _execute_command(self, command: Command) -> int:
+        """Execute one parsed command, see execute"""
+        try:
+            if isinstance(command, AddCommand):
+                self.product_manager.add_product(command.product)
+                return 1
+            elif isinstance(command, RemoveCommand):
+                return command.condition.apply(self.product_manager)
+            elif isinstance(command, SaveCommand):
+                self._process_save_command(command.filename)
+                return len(self.product_manager.products)
+            elif isinstance(command, QueryCommand):
+                return self._process_query_command(command)
+            elif isinstance(command, TransactionCommand):
+                self._process_transaction_command(command)
+            elif isinstance(command, InvalidCommand):
+                raise ValueError(command.error)
+            else:
+                self.logger.log_message("WARNING", f"Unknown command at line {command.line_num}: {command.line}")
+            return 0
+        except Exception as e:
+            self.logger.log_message("ERROR", f"Failed processing line {command.line_num}: {command.line}. Error: {str(e)}")
+            raise
+    
+    def abort(self) -> None:
+        """Roll back every open transaction"""
+        self._rollback_transactions(0)
+    
+    def _process_transaction_command(self, command: TransactionCommand) -> None:
+        """
+        Process BEGIN, COMMIT and ROLLBACK commands
+        
+        Args:
+            command (TransactionCommand): Parsed command
+        """
+        explicit = 1 if self.atomic else 0
+        if command.action == "BEGIN":
+            self.transactions.append((command.line_num, ProductJournal(self.product_manager)))
+        elif len(self.transactions) <= explicit:
+            raise ValueError(f"{command.action} without BEGIN")
+        elif command.action == "COMMIT":
+            # Changes stay recorded by outer transactions
+            self.transactions.pop()[1].close()
+        else:
+            self.transactions.pop()[1].rollback()
+    
+    def _rollback_transactions(self, keep: int) -> None:
+        """
+        Roll back open transactions
+        
+        The outermost rolled back journal already holds every change of the
+        inner ones, so inner journals are only closed.
+        
+        Args:
+            keep (int): Number of outermost transactions to leave open
+        """
+        if len(self.transactions) <= keep:
+            return
+        while len(self.transactions) > keep + 1:
+            self.transactions.pop()[1].close()
+        line_num, journal = self.transactions.pop()
+        reverted = journal.rollback()
+        if line_num:
+            self.logger.log_message("WARNING", f"Rolled back transaction started at line {line_num} ({reverted} changes)")
+        else:
+            self.logger.log_message("WARNING", f"Rolled back whole command file ({reverted} changes)")
+    
+    def _process_save_command(self, filename: str) -> None:
+        """Process SAVE command"""
+        self.file_handler.save_products(self.product_manager.get_products(), filename)
+    
+    def _process_query_command(self, command: QueryCommand) -> int:
+        """Process COUNT, SUM or SELECT command, matching products are never collected into a list"""
+        predicate = command.predicate()
+        if command.kind == "COUNT":
+            result = self.product_manager.count_where(predicate)
+        elif command.kind == "SUM":
+            result = self.product_manager.sum_where(command.field, predicate)
+        else:
+            result = self.file_handler.save_products(self.product_manager.select_where(predicate), command.filename)
+        self.logger.log_message("INFO", f"Line {command.line_num}: {command.line} -> {result}")
+        if self.output is not None:
+            self.output(f"{command.line} -> {result}")
+        return result
@@ -0,0 +1,140 @@
+import asyncio
+
+from CommandParser import UnknownCommand
+from CommandProcessor import CommandProcessor
+
+class CommandServer:
+    """Serves the command file syntax line by line over a local socket"""
+    
+    # Longest accepted command line in bytes
+    LINE_LIMIT = 64 * 1024
+    
+    def __init__(self, processor: CommandProcessor, transaction_timeout: float|None = 30.0):
+        """
+        Initialize the server
+        
+        Args:
+            processor (CommandProcessor): Processor whose ProductManager is shared by all clients
+            transaction_timeout (float|None): Seconds a client with an open transaction may stay silent, None for no limit
+        """
+        self.processor = processor
+        self.transaction_timeout = transaction_timeout
+        # Held by a client while its transaction is open, so writes never interleave
+        self.lock = asyncio.Lock()
+        self.server = None
+        self.commands = 0
+        self.clients = 0
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str|None = None) -> None:
+        """
+        Start listening
+        
+        Args:
+            host (str): Host of TCP socket
+            port (int): Port of TCP socket (0 picks a free one)
+            path (str|None): Path of Unix socket, used instead of TCP if set
+        """
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path, limit=self.LINE_LIMIT)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port, limit=self.LINE_LIMIT)
+    
+    def address(self) -> str:
+        """Get listening address as text"""
+        name = self.server.sockets[0].getsockname()
+        return name if isinstance(name, str) else f"{name[0]}:{name[1]}"
+    
+    async def serve_forever(self) -> None:
+        """Serve clients until cancelled"""
+        async with self.server:
+            await self.server.serve_forever()
+    
+    async def close(self) -> None:
+        """Stop accepting clients"""
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Execute commands of one client and answer each with a result line
+        
+        Answers are "OK <rows>" or "ERR <message>". A client's open
+        transaction is rolled back when it disconnects or stays silent
+        longer than transaction_timeout, the latter also ends the connection,
+        like a line over the reader limit.
+        
+        Args:
+            reader (asyncio.StreamReader): Client input
+            writer (asyncio.StreamWriter): Client output
+        """
+        self.clients += 1
+        session = CommandProcessor(self.processor.product_manager, self.processor.file_handler, self.processor.logger)
+        session.parser = self.processor.parser
+        holds_lock = False
+        line_num = 0
+        try:
+            while True:
+                try:
+                    # Other clients wait for the lock, so an open transaction may not idle forever
+                    line = await asyncio.wait_for(reader.readline(), self.transaction_timeout if holds_lock else None)
+                except TimeoutError:
+                    session.abort()
+                    holds_lock = False
+                    self.lock.release()
+                    writer.write(b"ERR Transaction timed out, rolled back\n")
+                    break
+                except ValueError:
+                    # The rest of the line is still unread, so the next line can not be found reliably
+                    writer.write(f"ERR Line longer than {self.LINE_LIMIT} bytes\n".encode())
+                    break
+                if not line:
+                    break
+                line_num += 1
+                try:
+                    text = line.decode().strip()
+                except UnicodeDecodeError:
+                    writer.write(f"ERR Line {line_num} is not valid UTF-8\n".encode())
+                    continue
+                if not text or text.startswith('#'):
+                    continue
+                command = session.parser.parse_line(line_num, text)
+                if not holds_lock:
+                    await self.lock.acquire()
+                try:
+                    writer.write(self._execute(session, command).encode() + b"\n")
+                finally:
+                    holds_lock = bool(session.transactions)
+                    if not holds_lock:
+                        self.lock.release()
+                # Let the client fall behind a little before waiting for it
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if holds_lock:
+                session.abort()
+                self.lock.release()
+            self.clients -= 1
+            writer.close()
+    
+    def _execute(self, session: CommandProcessor, command) -> str:
+        """
+        Execute a command and format its result
+        
+        Args:
+            session (CommandProcessor): Processor of the client
+            command (Command): Parsed command
+        
+        Returns:
+            str: Result line without newline
+        """
+        self.commands += 1
+        try:
+            rows = session.execute(command)
+        except Exception as e:
+            return f"ERR {str(e)}"
+        if isinstance(command, UnknownCommand):
+            return f"ERR Unknown command: {command.line}"
+        return f"OK {rows}"
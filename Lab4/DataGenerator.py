@@ -0,0 +1,362 @@
+import argparse
+import functools
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+class DataGenerator:
+    """Seeded generator of supply and command files with configurable distributions"""
+    
+    # Rows built and written at once, column values are drawn per chunk from a generator seeded by (seed, chunk index)
+    CHUNK_ROWS = 100_000
+    AMOUNT_DISTRIBUTIONS = ("uniform", "normal", "lognormal", "zipf")
+    
+    def __init__(self, seed: int = 0, types: dict[str, float]|None = None, names: int = 1000, name_skew: float = 0.0,
+                 start_date: date = date(2020, 1, 1), end_date: date = date(2030, 12, 31),
+                 amount_min: int = 1, amount_max: int = 500, amount_distribution: str = "uniform", workers: int = 1):
+        """
+        Initialize distributions
+        
+        Args:
+            seed (int): Random seed, equal settings and seed give equal files
+            types (dict[str, float]|None): Weight per product type (Belt, Cake, Cup), equal weights as default
+            names (int): Number of distinct product names
+            name_skew (float): Zipf exponent of name popularity, 0 for uniform
+            start_date (date): First supply date
+            end_date (date): Last supply date
+            amount_min (int): Smallest amount
+            amount_max (int): Largest amount
+            amount_distribution (str): uniform, normal, lognormal or zipf
+            workers (int): Processes building chunks of written files, the output does not depend on it
+        """
+        if amount_distribution not in self.AMOUNT_DISTRIBUTIONS:
+            raise ValueError(f"Unknown amount distribution: {amount_distribution}")
+        if amount_min > amount_max or start_date > end_date or names < 1:
+            raise ValueError("Empty value range")
+        self.seed = seed
+        self.workers = workers
+        types = types or {"Belt": 1.0, "Cake": 1.0, "Cup": 1.0}
+        unknown = set(types) - {"Belt", "Cake", "Cup"}
+        if unknown:
+            raise ValueError(f"Unknown product type: {', '.join(sorted(unknown))}")
+        self.types = list(types)
+        self.type_weights = list(itertools.accumulate(types.values()))
+        self.names = [f"Supplier {i}" for i in range(1, names + 1)]
+        self.name_weights = list(itertools.accumulate(1 / rank ** name_skew for rank in range(1, names + 1)))
+        days = (end_date - start_date).days + 1
+        self.dates = [(start_date + timedelta(days=day)).strftime("%d.%m.%Y") for day in range(days)]
+        self.amounts = list(range(amount_min, amount_max + 1))
+        self.amount_weights = list(itertools.accumulate(self._amount_density(amount_distribution)))
+    
+    def _amount_density(self, distribution: str) -> list[float]:
+        """
+        Get relative probability of every amount
+        
+        Args:
+            distribution (str): uniform, normal, lognormal or zipf
+        
+        Returns:
+            list[float]: Weight per value of self.amounts
+        """
+        low, high = self.amounts[0], self.amounts[-1]
+        if distribution == "uniform" or low == high:
+            return [1.0] * len(self.amounts)
+        if distribution == "normal":
+            mean, deviation = (low + high) / 2, (high - low) / 6
+            return [math.exp(-((amount - mean) / deviation) ** 2 / 2) for amount in self.amounts]
+        if distribution == "lognormal":
+            # Median at a tenth of the range, long tail towards amount_max
+            mu, sigma = math.log(max((high - low) / 10, 1)), 1.0
+            return [math.exp(-(math.log(amount - low + 1) - mu) ** 2 / (2 * sigma ** 2)) / (amount - low + 1) for amount in self.amounts]
+        return [1 / (amount - low + 1) for amount in self.amounts]
+    
+    def chunk_rng(self, chunk: int) -> random.Random:
+        """
+        Get the random generator of a chunk, so chunks can be built in any order and process
+        
+        Args:
+            chunk (int): Chunk index
+        
+        Returns:
+            random.Random: Generator seeded by seed and chunk index
+        """
+        return random.Random(f"{self.seed}:{chunk}")
+    
+    def supply_lines(self, rows: int, chunk: int = 0) -> str:
+        """
+        Build supply file lines in the ProductFileHandler format
+        
+        Args:
+            rows (int): Number of products
+            chunk (int): Chunk index selecting the random stream
+        
+        Returns:
+            str: Lines with trailing newlines
+        """
+        rng = self.chunk_rng(chunk)
+        choices = rng.choices
+        types = choices(self.types, cum_weights=self.type_weights, k=rows)
+        dates = choices(self.dates, k=rows)
+        names = choices(self.names, cum_weights=self.name_weights, k=rows)
+        amounts = choices(self.amounts, cum_weights=self.amount_weights, k=rows)
+        specials = self._specials(rng, types)
+        return "".join([f'{product_type}({supply_date}, "{name}", {amount}, {special})\n'
+                        for product_type, supply_date, name, amount, special in zip(types, dates, names, amounts, specials)])
+    
+    def add_data(self, rows: int, chunk: int = 0) -> list[str]:
+        """
+        Build ADD command data
+        
+        Args:
+            rows (int): Number of products
+            chunk (int): Chunk index selecting the random stream
+        
+        Returns:
+            list[str]: Product data in csv format (Ex: Cake; 01.01.2028; Name; 10; 20)
+        """
+        return self._add_data(self.chunk_rng(chunk), rows)
+    
+    def _add_data(self, rng: random.Random, rows: int) -> list[str]:
+        """Build ADD command data from a random generator"""
+        choices = rng.choices
+        types = choices(self.types, cum_weights=self.type_weights, k=rows)
+        dates = choices(self.dates, k=rows)
+        names = choices(self.names, cum_weights=self.name_weights, k=rows)
+        amounts = choices(self.amounts, cum_weights=self.amount_weights, k=rows)
+        specials = self._specials(rng, types)
+        return [f"{product_type}; {supply_date}; {name}; {amount}; {special}"
+                for product_type, supply_date, name, amount, special in zip(types, dates, names, amounts, specials)]
+    
+    def command_lines(self, lines: int, add_ratio: float = 0.9, rem_ratio: float = 0.099, save_ratio: float = 0.001,
+                      selectivity: float = 0.01, chunk: int = 0) -> str:
+        """
+        Build ADD/REM/SAVE command lines
+        
+        REM commands remove amount ranges holding about selectivity of the products.
+        
+        Args:
+            lines (int): Number of command lines
+            add_ratio (float): Weight of ADD commands
+            rem_ratio (float): Weight of REM commands
+            save_ratio (float): Weight of SAVE commands
+            selectivity (float): Share of products matched by one REM (0 to 1)
+            chunk (int): Chunk index selecting the random stream
+        
+        Returns:
+            str: Lines with trailing newlines
+        """
+        rng = self.chunk_rng(chunk)
+        kinds = rng.choices("ARS", weights=(add_ratio, rem_ratio, save_ratio), k=lines)
+        adds = iter(self._add_data(rng, kinds.count("A")))
+        windows = self._amount_windows(rng, selectivity)
+        result = []
+        for kind in kinds:
+            if kind == "A":
+                result.append(f"ADD {next(adds)}\n")
+            elif kind == "R":
+                low, high = rng.choice(windows)
+                result.append(f"REM {low} <= amount <= {high}\n")
+            else:
+                result.append(f"SAVE output_{rng.randrange(1000)}.txt\n")
+        return "".join(result)
+    
+    def write_supply(self, filename: str, rows: int|None = None, size: int|None = None) -> int:
+        """
+        Write a supply file
+        
+        Args:
+            filename (str): Path to file
+            rows (int|None): Number of products
+            size (int|None): Approximate file size in bytes, used if rows is None
+        
+        Returns:
+            int: Number of written products
+        """
+        return self._write(filename, self.supply_lines, rows, size)
+    
+    def write_commands(self, filename: str, lines: int|None = None, size: int|None = None, **ratios) -> int:
+        """
+        Write a command file
+        
+        Args:
+            filename (str): Path to file
+            lines (int|None): Number of command lines
+            size (int|None): Approximate file size in bytes, used if lines is None
+            **ratios: add_ratio, rem_ratio, save_ratio and selectivity of command_lines
+        
+        Returns:
+            int: Number of written lines
+        """
+        return self._write(filename, functools.partial(self.command_lines, **ratios), lines, size)
+    
+    def _write(self, filename: str, build, rows: int|None, size: int|None) -> int:
+        """
+        Write chunks of lines until a row count or file size is reached
+        
+        Args:
+            filename (str): Path to file
+            build (Callable[[int, int], str]): Builds a chunk of lines from a line count and chunk index
+            rows (int|None): Number of lines
+            size (int|None): Approximate file size in bytes
+        
+        Returns:
+            int: Number of written lines
+        """
+        if rows is None and size is None:
+            raise ValueError("Either a row count or a size is required")
+        if rows is not None:
+            counts = [min(self.CHUNK_ROWS, rows - start) for start in range(0, rows, self.CHUNK_ROWS)]
+        else:
+            counts = itertools.repeat(self.CHUNK_ROWS)
+        written_rows = 0
+        written_bytes = 0
+        chunks = self._chunks(build, counts)
+        with open(filename, 'w', buffering=1024 * 1024) as file:
+            try:
+                for count, chunk in chunks:
+                    file.write(chunk)
+                    written_rows += count
+                    written_bytes += len(chunk)
+                    if rows is None and written_bytes >= size:
+                        break
+            finally:
+                chunks.close()
+        return written_rows
+    
+    def _chunks(self, build, counts):
+        """
+        Build chunks in file order, in worker processes when more than one worker is set
+        
+        Args:
+            build (Callable[[int, int], str]): Builds a chunk of lines from a line count and chunk index
+            counts (Iterable[int]): Line count of every chunk
+        
+        Yields:
+            tuple[int, str]: Line count and lines of a chunk
+        """
+        if self.workers <= 1 or (isinstance(counts, list) and len(counts) <= 1):
+            # Starting processes costs more than building a single chunk
+            for index, count in enumerate(counts):
+                yield count, build(count, chunk=index)
+            return
+        # Threads of the caller (Ex: logger) make forking unsafe
+        executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = deque()
+        try:
+            for index, count in enumerate(counts):
+                pending.append((count, executor.submit(build, count, chunk=index)))
+                # Two chunks per worker keep every process busy without holding the whole file in memory
+                if len(pending) >= self.workers * 2:
+                    count, future = pending.popleft()
+                    yield count, future.result()
+            while pending:
+                count, future = pending.popleft()
+                yield count, future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+    
+    def _specials(self, rng: random.Random, types: list[str]) -> list[str|int]:
+        """Draw the special attribute (metal, height or volume) of every product"""
+        heights = iter(rng.choices(range(5, 51), k=types.count("Cake")))
+        volumes = iter(rng.choices(range(100, 1001), k=types.count("Cup")))
+        metals = iter(rng.choices(("True", "False"), k=types.count("Belt")))
+        sources = {"Cake": heights, "Cup": volumes, "Belt": metals}
+        return [next(sources[product_type]) for product_type in types]
+    
+    def _amount_windows(self, rng: random.Random, selectivity: float, count: int = 256) -> list[tuple[int, int]]:
+        """
+        Find amount ranges holding about selectivity of the amount distribution
+        
+        Args:
+            rng (random.Random): Random generator of the chunk
+            selectivity (float): Wanted share of products (0 to 1)
+            count (int): Number of windows to choose from
+        
+        Returns:
+            list[tuple[int, int]]: (low, high) amount ranges
+        """
+        total = self.amount_weights[-1]
+        windows = []
+        for _ in range(count):
+            start = rng.randrange(len(self.amounts))
+            base = self.amount_weights[start - 1] if start else 0.0
+            end = start
+            while end < len(self.amounts) - 1 and self.amount_weights[end] - base < selectivity * total:
+                end += 1
+            # Windows cut off by amount_max grow downwards instead
+            while start > 0 and self.amount_weights[end] - base < selectivity * total:
+                start -= 1
+                base = self.amount_weights[start - 1] if start else 0.0
+            windows.append((self.amounts[start], self.amounts[end]))
+        return windows
+
+def parse_weights(text: str) -> dict[str, float]:
+    """Parse type weights (Ex: Cake=0.5,Cup=0.3,Belt=0.2)"""
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    return weights
+
+def parse_size(text: str) -> int:
+    """Parse a byte count with an optional K, M or G suffix"""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().removesuffix("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+def main(argv: list[str]|None = None) -> int:
+    """
+    Write a generated supply or command file
+    
+    Args:
+        argv (list[str]|None): Arguments without program name (sys.argv as default)
+    
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(description="Generate reproducible supply and command files")
+    parser.add_argument("kind", choices=("supply", "commands"), help="File to generate")
+    parser.add_argument("filename", help="Output file")
+    parser.add_argument("--rows", type=lambda text: int(float(text)), help="Number of lines (Ex: 1e6)")
+    parser.add_argument("--size", type=parse_size, help="Approximate file size instead of rows (Ex: 10G)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes building chunks, output is equal for any count (default: CPU count)")
+    parser.add_argument("--types", type=parse_weights, help="Type weights (Ex: Cake=0.5,Cup=0.3,Belt=0.2)")
+    parser.add_argument("--names", type=int, default=1000, help="Distinct product names (default: 1000)")
+    parser.add_argument("--name-skew", type=float, default=0.0, help="Zipf exponent of name popularity (default: 0, uniform)")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2020, 1, 1), help="First supply date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2030, 12, 31), help="Last supply date (YYYY-MM-DD)")
+    parser.add_argument("--amount-min", type=int, default=1, help="Smallest amount (default: 1)")
+    parser.add_argument("--amount-max", type=int, default=500, help="Largest amount (default: 500)")
+    parser.add_argument("--amounts", choices=DataGenerator.AMOUNT_DISTRIBUTIONS, default="uniform", help="Amount distribution")
+    parser.add_argument("--add-ratio", type=float, default=0.9, help="Weight of ADD commands (default: 0.9)")
+    parser.add_argument("--rem-ratio", type=float, default=0.099, help="Weight of REM commands (default: 0.099)")
+    parser.add_argument("--save-ratio", type=float, default=0.001, help="Weight of SAVE commands (default: 0.001)")
+    parser.add_argument("--selectivity", type=float, default=0.01, help="Share of products matched by one REM (default: 0.01)")
+    args = parser.parse_args(argv)
+    if args.rows is None and args.size is None:
+        parser.error("either --rows or --size is required")
+    
+    try:
+        generator = DataGenerator(args.seed, args.types, args.names, args.name_skew, args.start_date, args.end_date,
+                                  args.amount_min, args.amount_max, args.amounts, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.kind == "supply":
+        rows = generator.write_supply(args.filename, args.rows, args.size)
+    else:
+        rows = generator.write_commands(args.filename, args.rows, args.size, add_ratio=args.add_ratio, rem_ratio=args.rem_ratio,
+                                        save_ratio=args.save_ratio, selectivity=args.selectivity)
+    print(f"Wrote {rows} lines to {args.filename}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+from datetime import datetime
+import atexit
+import glob
+import gzip
+import json
+import os.path
+import queue
+import re
+import shutil
+import threading
+import time
+
+class Logger:
+    """Manages Exception logging, files are written by a background thread"""
+    
+    # Records taken from the queue per write, handles are flushed once per batch
+    BATCH_SIZE = 1000
+    # Rotated files left uncompressed, and on request plain files of earlier days, are archived at start-up
+    DAY_FILE_RE = re.compile(r"\d{2}-\d{2}-\d{4}\.log")
+    ROTATED_FILE_RE = re.compile(r".+\.\d+\.log")
+    
+    def __init__(self, directory: str = 'logs', queue_size: int = 10000, max_bytes: int = 10 * 1024 * 1024, max_archives: int = 30,
+                 dedup_window: float = 5.0, rate_limit: int = 1000, json_lines: bool = False, archive_earlier_days: bool = False):
+        """
+        Initialize a folder for logs, archive leftover rotated files and start the writer and archiver threads
+        
+        Args:
+            directory (str): Folder for log files
+            queue_size (int): Records waiting for the writer, newer ones are dropped when full
+            max_bytes (int): Size after which a log file is rotated, 0 for no limit
+            max_archives (int): Compressed log files kept, oldest are deleted
+            dedup_window (float): Seconds in which repeats of a message are only counted, 0 to log every one
+            rate_limit (int): Messages per second and level, 0 for no limit
+            json_lines (bool): Write records as JSON objects, one per line
+            archive_earlier_days (bool): Also rotate and compress plain DD-MM-YYYY.log files of earlier days found in the folder
+        """
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        # Totals for monitoring
+        self.dropped_total = 0
+        self.written = 0
+        self.max_bytes = max_bytes
+        self.max_archives = max_archives
+        self.dedup_window = dedup_window
+        self.rate_limit = rate_limit
+        self.json_lines = json_lines
+        # Guards the counters below, log_message may be called from any thread
+        self.lock = threading.Lock()
+        # First log time and suppressed repeats by (level, message, filename)
+        self.seen = {}
+        self.last_sweep = time.monotonic()
+        # Token bucket as [tokens, last refill] and [suppressed count, last log file] by level
+        self.buckets = {}
+        self.limited = {}
+        # Open handles and their sizes by file name, only used by the writer thread
+        self.files = {}
+        self.sizes = {}
+        self.day_file = None
+        # Rotated files waiting for compression, so a rollover costs the writer only a rename
+        self.archive_queue = queue.Queue()
+        self.archiver = threading.Thread(target=self._archive_files, name="Logger archiver", daemon=True)
+        self.archiver.start()
+        self._archive_leftovers(archive_earlier_days)
+        self.writer = threading.Thread(target=self._write_records, name="Logger", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+    
+    def log_message(self, level: str, message: str, filename: str|None = None) -> None:
+        """
+        Queue a message for the log file, never waits for the disk
+        
+        Repeats of a message within the dedup window are collapsed into one
+        "(repeated N times)" record, messages over the rate limit of their
+        level are counted and reported with the next allowed one.
+        
+        Args:
+            level (str): DEBUG, ERROR, WARNING...
+            message (str): Message to log
+            filename (str|None): Name for log file (date of the message as default)
+        """
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_sweep >= self.dedup_window:
+                self._sweep(now)
+            key = (level, message, filename)
+            seen = self.seen.get(key)
+            if seen is not None:
+                if now - seen[0] < self.dedup_window:
+                    seen[1] += 1
+                    return
+                if seen[1]:
+                    self._put(level, message, filename, seen[1])
+                # Reported repeats must not be reported again by a sweep if the rate limit drops this message
+                del self.seen[key]
+            if not self._allow(level, filename, now):
+                return
+            self.seen[key] = [now, 0]
+            self._put(level, message, filename)
+    
+    def flush(self) -> None:
+        """Wait until every queued message is written and rotated files are compressed"""
+        with self.lock:
+            self._sweep(None)
+        if self.writer.is_alive():
+            self.queue.join()
+        if self.archiver.is_alive():
+            self.archive_queue.join()
+    
+    def close(self) -> None:
+        """Write queued messages, close log files and stop the background threads"""
+        with self.lock:
+            self._sweep(None)
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        if self.archiver.is_alive():
+            self.archive_queue.put(None)
+            self.archiver.join()
+    
+    def _put(self, level: str, message: str, filename: str|None, repeated: int = 0) -> None:
+        """Queue a record, count it as dropped if the queue is full, called with self.lock held"""
+        try:
+            self.queue.put_nowait((datetime.now(), level, message, filename, repeated))
+        except queue.Full:
+            self.dropped += 1
+            self.dropped_total += 1
+    
+    def _allow(self, level: str, filename: str|None, now: float) -> bool:
+        """
+        Take a token from the bucket of a level
+        
+        Args:
+            level (str): Message level
+            filename (str|None): Log file of the message
+            now (float): Monotonic time
+        
+        Returns:
+            bool: True if the message may be logged
+        """
+        if not self.rate_limit:
+            return True
+        bucket = self.buckets.get(level)
+        if bucket is None:
+            bucket = self.buckets[level] = [self.rate_limit, now]
+        bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * self.rate_limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            limited = self.limited.setdefault(level, [0, filename])
+            limited[0] += 1
+            limited[1] = filename
+            return False
+        bucket[0] -= 1
+        if level in self.limited:
+            count, limited_filename = self.limited.pop(level)
+            self._put("WARNING", f"{count} {level} messages suppressed by rate limit", limited_filename)
+        return True
+    
+    def _sweep(self, now: float|None) -> None:
+        """
+        Log repeat counts of messages whose dedup window has ended
+        
+        Args:
+            now (float|None): Monotonic time, None to end every window
+        """
+        for key, (first, repeated) in list(self.seen.items()):
+            if now is None or now - first >= self.dedup_window:
+                del self.seen[key]
+                if repeated:
+                    self._put(*key, repeated)
+        if now is None:
+            for level, (count, filename) in self.limited.items():
+                self._put("WARNING", f"{count} {level} messages suppressed by rate limit", filename)
+            self.limited.clear()
+        self.last_sweep = time.monotonic()
+    
+    def _write_records(self) -> None:
+        """Writer thread loop, drains the queue in batches"""
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._write_batch([record for record in batch if record is not None])
+            except OSError:
+                pass
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                for file in self.files.values():
+                    file.close()
+                self.files.clear()
+                return
+    
+    def _write_batch(self, batch: list[tuple]) -> None:
+        """
+        Write records through persistent handles, rotating files by day and size
+        
+        Args:
+            batch (list[tuple]): Records as (time, level, message, filename, repeated)
+        """
+        with self.lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            batch.append((datetime.now(), "WARNING", f"{dropped} log messages dropped, queue was full", batch[-1][3] if batch else None, 0))
+        written = set()
+        for created, level, message, filename, repeated in batch:
+            if filename is None:
+                filename = f"{created.strftime("%d-%m-%Y")}.log"
+                if filename != self.day_file:
+                    if self.day_file is not None:
+                        self._rotate(self.day_file)
+                    self.day_file = filename
+            file = self._file(filename)
+            line = self._format(created, level, message, repeated)
+            file.write(line)
+            self.sizes[filename] += len(line)
+            if self.max_bytes and self.sizes[filename] >= self.max_bytes:
+                file.flush()
+                self._rotate(filename)
+            else:
+                written.add(file)
+        for file in written:
+            if not file.closed:
+                file.flush()
+        self.written += len(batch)
+    
+    def _format(self, created: datetime, level: str, message: str, repeated: int) -> str:
+        """Format a record as a text or JSON line"""
+        if self.json_lines:
+            record = {"time": created.isoformat(timespec="seconds"), "level": level, "message": message}
+            if repeated:
+                record["repeated"] = repeated
+            return json.dumps(record) + "\n"
+        if repeated:
+            message = f"{message} (repeated {repeated} times)"
+        return f"{created.strftime("%d-%m-%Y %H:%M:%S")} {level} {message}\n"
+    
+    def _file(self, filename: str):
+        """Get an open handle for a log file"""
+        file = self.files.get(filename)
+        if file is None:
+            file = self.files[filename] = open(os.path.join(self.directory, filename), "a")
+            self.sizes[filename] = file.tell()
+        return file
+    
+    def _rotate(self, filename: str) -> None:
+        """
+        Close a log file and rename it to a free numbered name for compression
+        
+        Args:
+            filename (str): Name of log file
+        """
+        file = self.files.pop(filename, None)
+        if file is not None:
+            file.close()
+        self.sizes.pop(filename, None)
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return
+        stem, extension = os.path.splitext(path)
+        # Numbers only grow, reusing one freed by retention would make a newer file sort as older
+        pattern = re.compile(rf"{re.escape(os.path.basename(stem))}\.(\d+){re.escape(extension)}(?:\.gz)?")
+        numbers = [int(match[1]) for match in map(pattern.fullmatch, os.listdir(self.directory)) if match]
+        rotated = f"{stem}.{max(numbers, default=0) + 1}{extension}"
+        os.replace(path, rotated)
+        self.archive_queue.put(rotated)
+    
+    def _archive_leftovers(self, earlier_days: bool) -> None:
+        """
+        Queue rotated files of a previous run for compression
+        
+        Args:
+            earlier_days (bool): Also rotate plain log files of earlier days, which may not belong to this logger
+        """
+        today = f"{datetime.now().strftime("%d-%m-%Y")}.log"
+        for filename in sorted(os.listdir(self.directory)):
+            try:
+                if earlier_days and self.DAY_FILE_RE.fullmatch(filename) and filename != today:
+                    self._rotate(filename)
+                elif self.ROTATED_FILE_RE.fullmatch(filename):
+                    self.archive_queue.put(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+    
+    def _archive_files(self) -> None:
+        """Archiver thread loop, compresses rotated files and deletes the oldest archives beyond max_archives"""
+        while True:
+            path = self.archive_queue.get()
+            try:
+                if path is None:
+                    return
+                with open(path, "rb") as source, gzip.open(f"{path}.gz", "wb") as target:
+                    shutil.copyfileobj(source, target)
+                # Archives keep the time of their last record, retention then drops the oldest logs first
+                shutil.copystat(path, f"{path}.gz")
+                os.remove(path)
+                archives = sorted(glob.glob(os.path.join(glob.escape(self.directory), "*.gz")), key=lambda archive: (os.path.getmtime(archive), archive))
+                for archive in archives[:max(len(archives) - self.max_archives, 0)]:
+                    os.remove(archive)
+            except OSError:
+                pass
+            finally:
+                self.archive_queue.task_done()
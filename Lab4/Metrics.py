@@ -0,0 +1,132 @@
+from bisect import bisect_left
+from functools import wraps
+import os
+import time
+
+class OperationStats:
+    """Call count, latency histogram and affected rows of one operation"""
+    
+    __slots__ = ("count", "seconds", "max_seconds", "rows", "histogram")
+    
+    def __init__(self):
+        """Initialize empty stats"""
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(Metrics.BUCKETS) + 1)
+    
+    def add(self, seconds: float, rows: int) -> None:
+        """
+        Record one call
+        
+        Args:
+            seconds (float): Call duration
+            rows (int): Rows loaded, saved, removed or otherwise affected
+        """
+        self.count += 1
+        self.seconds += seconds
+        self.rows += rows
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.histogram[bisect_left(Metrics.BUCKETS, seconds)] += 1
+    
+    def to_dict(self) -> dict:
+        """Get stats as plain data, histogram keys are bucket upper bounds in seconds"""
+        bounds = [str(bound) for bound in Metrics.BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "max_seconds": self.max_seconds,
+            "rows": self.rows,
+            "histogram": dict(zip(bounds, self.histogram)),
+        }
+
+class Metrics:
+    """Process wide instrumentation of hot paths, a single flag check when disabled"""
+    
+    # Upper bounds of latency buckets in seconds
+    BUCKETS = (0.000001, 0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+    
+    enabled = os.environ.get("LAB4_METRICS", "") not in ("", "0")
+    operations = {}
+    
+    @classmethod
+    def enable(cls, enabled: bool = True) -> None:
+        """
+        Turn recording on or off
+        
+        Args:
+            enabled (bool): Should calls be recorded
+        """
+        cls.enabled = enabled
+    
+    @classmethod
+    def record(cls, name: str, seconds: float, rows: int = 0) -> None:
+        """
+        Record one call of an operation
+        
+        Args:
+            name (str): Operation name (Ex: ProductManager.remove_where)
+            seconds (float): Call duration
+            rows (int): Rows affected by the call
+        """
+        stats = cls.operations.get(name)
+        if stats is None:
+            stats = cls.operations[name] = OperationStats()
+        stats.add(seconds, rows)
+    
+    @classmethod
+    def timed(cls, name: str, rows=None):
+        """
+        Decorator recording calls of a function while metrics are enabled
+        
+        Args:
+            name (str): Operation name
+            rows (Callable[[Any], int]|None): Gets affected rows from the result, int results are used as is
+        
+        Returns:
+            Callable: Decorator
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                result = function(*args, **kwargs)
+                seconds = time.perf_counter() - start
+                if rows is not None:
+                    cls.record(name, seconds, rows(result))
+                else:
+                    cls.record(name, seconds, result if type(result) is int else 0)
+                return result
+            return wrapper
+        return decorator
+    
+    @classmethod
+    def snapshot(cls) -> dict[str, dict]:
+        """Get stats of every recorded operation as plain data"""
+        return {name: stats.to_dict() for name, stats in sorted(cls.operations.items())}
+    
+    @classmethod
+    def reset(cls) -> None:
+        """Forget recorded stats"""
+        cls.operations = {}
+    
+    @classmethod
+    def report(cls) -> str:
+        """
+        Format recorded stats as a text table
+        
+        Returns:
+            str: One line per operation with count, total, mean, max and rows
+        """
+        if not cls.operations:
+            return "No operations recorded"
+        width = max(len(name) for name in cls.operations)
+        lines = [f"{'operation':<{width}} {'calls':>9} {'total ms':>10} {'mean us':>10} {'max ms':>9} {'rows':>10}"]
+        for name, stats in sorted(cls.operations.items()):
+            lines.append(f"{name:<{width}} {stats.count:>9} {stats.seconds * 1000:>10.1f} "
+                         f"{stats.seconds / stats.count * 1000000:>10.1f} {stats.max_seconds * 1000:>9.2f} {stats.rows:>10}")
+        return "\n".join(lines)
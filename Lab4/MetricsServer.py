@@ -0,0 +1,152 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from CommandProcessor import CommandProcessor
+from Logger import Logger
+from Metrics import Metrics
+from ProductAggregates import ProductAggregates
+from ProductManager import ProductManager
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the Prometheus text format"""
+    
+    def do_GET(self) -> None:
+        """Send current metrics"""
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics_server.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        """Keep scrapes out of stderr"""
+
+class MetricsServer:
+    """Serves counters of a running processor on a local HTTP endpoint"""
+    
+    def __init__(self, product_manager: ProductManager, logger: Logger|None = None):
+        """
+        Initialize the exporter
+        
+        Timings of Metrics are enabled, so load, save and command durations are exported.
+        
+        Args:
+            product_manager (ProductManager): Manager whose products are counted
+            logger (Logger|None): Logger whose queue is watched
+        """
+        self.product_manager = product_manager
+        self.logger = logger
+        self.aggregates = ProductAggregates(product_manager)
+        self.server = None
+        self.thread = None
+        Metrics.enable()
+    
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving on a background thread
+        
+        Args:
+            host (str): Host to listen on
+            port (int): Port to listen on (0 picks a free one)
+        
+        Returns:
+            str: Listening address as HOST:PORT
+        """
+        self.server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.server.metrics_server = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True)
+        self.thread.start()
+        return f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+    
+    def close(self) -> None:
+        """Stop serving"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+    
+    def render(self) -> str:
+        """
+        Format current counters
+        
+        Returns:
+            str: Metrics in the Prometheus text exposition format
+        """
+        lines = []
+        self._metric(lines, "lab4_products", "gauge", "Products in the table by type",
+                     [(f'{{type="{group}"}}', count) for group, count in sorted(self.aggregates.count_by_type().items())])
+        self._metric(lines, "lab4_product_changes_total", "counter", "Changes of the product table",
+                     [("", self.product_manager.version)])
+        self._metric(lines, "lab4_commands_total", "counter", "Executed commands by kind",
+                     [(f'{{kind="{kind}"}}', count) for kind, count in sorted(CommandProcessor.command_counts.items())])
+        
+        operations = Metrics.snapshot()
+        if operations:
+            lines += ["# HELP lab4_operation_seconds Duration of instrumented operations",
+                      "# TYPE lab4_operation_seconds histogram"]
+            for name, stats in operations.items():
+                cumulative = 0
+                for bound, count in stats["histogram"].items():
+                    cumulative += count
+                    lines.append(f'lab4_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'lab4_operation_seconds_sum{{operation="{name}"}} {stats["seconds"]}')
+                lines.append(f'lab4_operation_seconds_count{{operation="{name}"}} {stats["count"]}')
+            self._metric(lines, "lab4_operation_rows_total", "counter", "Rows affected by instrumented operations",
+                         [(f'{{operation="{name}"}}', stats["rows"]) for name, stats in operations.items()])
+        
+        if self.logger is not None:
+            self._metric(lines, "lab4_log_queue_depth", "gauge", "Log records waiting for the writer thread",
+                         [("", self.logger.queue.qsize())])
+            self._metric(lines, "lab4_log_records_written_total", "counter", "Log records written",
+                         [("", self.logger.written)])
+            self._metric(lines, "lab4_log_records_dropped_total", "counter", "Log records dropped on a full queue",
+                         [("", self.logger.dropped_total)])
+        
+        rss = self._resident_bytes()
+        if rss is not None:
+            self._metric(lines, "lab4_resident_memory_bytes", "gauge", "Resident memory of the process", [("", rss)])
+        if resource is not None:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS
+            self._metric(lines, "lab4_max_resident_memory_bytes", "gauge", "Peak resident memory of the process",
+                         [("", max_rss if sys.platform == "darwin" else max_rss * 1024)])
+        return "\n".join(lines) + "\n"
+    
+    @staticmethod
+    def _metric(lines: list[str], name: str, metric_type: str, help_text: str, samples: list[tuple[str, int|float]]) -> None:
+        """
+        Append one metric family
+        
+        Args:
+            lines (list[str]): Output lines
+            name (str): Metric name
+            metric_type (str): counter or gauge
+            help_text (str): Description
+            samples (list[tuple[str, int|float]]): Label sets (Ex: {type="Cup"}) with values
+        """
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+    
+    @staticmethod
+    def _resident_bytes() -> int|None:
+        """Get current resident memory, None where /proc is missing"""
+        try:
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return None
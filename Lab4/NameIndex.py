@@ -0,0 +1,269 @@
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from operator import add, sub
+from Product import Product
+
+class NameIndex:
+    """Trigram index over product names for fast substring search"""
+    
+    # Changes kept for translating positions of names on their next search, more trigger a full rebuild
+    MAX_CHANGES = 64
+    
+    def __init__(self, product_manager):
+        """
+        Build the index and subscribe to manager changes
+        
+        Args:
+            product_manager (ProductManager): Manager with indexed products
+        """
+        self.product_manager = product_manager
+        self.name_counts = {}
+        self.trigrams = {}
+        # name -> ascending product positions, kept up to date from the start so no keystroke pays for building them
+        self._rows = {}
+        # name -> number of logged changes already applied to its positions
+        self._epochs = {}
+        # ("removed", rows, size, rows per name) and ("added", rows, size, rows per name, gaps) not yet applied to every name
+        self._changes = []
+        self.products_added(range(len(product_manager.products)), product_manager.products)
+        product_manager.add_listener(self)
+    
+    @staticmethod
+    def split_trigrams(text: str) -> set[str]:
+        """
+        Get all three-letter substrings of a lowercased text
+        
+        Args:
+            text (str): Text to split
+        
+        Returns:
+            set[str]: Trigrams of the text
+        """
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def products_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """
+        Index added products
+        
+        Args:
+            rows (range|list[int]): Positions of the added products
+            products (list[Product]): Added products
+        """
+        # One pass groups the rows, counts and positions are then updated per distinct name
+        added = {}
+        for row, product in zip(rows, products):
+            positions = added.get(product.name)
+            if positions is None:
+                added[product.name] = [row]
+            else:
+                positions.append(row)
+        for name, positions in added.items():
+            count = self.name_counts.get(name)
+            if count is None:
+                self.name_counts[name] = len(positions)
+                for trigram in self.split_trigrams(name):
+                    self.trigrams.setdefault(trigram, set()).add(name)
+            else:
+                self.name_counts[name] = count + len(positions)
+        if self._rows is None or not rows:
+            return
+        
+        size = len(self.product_manager.products) - len(rows)
+        if rows[0] == size and not self._changes:
+            # Appends keep every known position valid
+            for name, positions in added.items():
+                known = self._rows.get(name)
+                if known is None:
+                    self._rows[name] = positions
+                    self._epochs[name] = 0
+                else:
+                    known += positions
+            return
+        # Old position p moves past every inserted row whose gap (row minus earlier insertions) is at most p
+        gaps = None if isinstance(rows, range) else [row - shift for shift, row in enumerate(rows)]
+        if self._log(("added", rows, size, added, gaps)):
+            for name, positions in added.items():
+                if name not in self._rows:
+                    self._rows[name] = positions
+                    self._epochs[name] = len(self._changes)
+    
+    def products_removed(self, rows: list[int], products: list[Product]) -> None:
+        """
+        Drop removed products from the index
+        
+        Args:
+            rows (list[int]): Former positions of the removed products
+            products (list[Product]): Removed products
+        """
+        for product in products:
+            name = product.name
+            count = self.name_counts[name] - 1
+            if count:
+                self.name_counts[name] = count
+                continue
+            del self.name_counts[name]
+            for trigram in self.split_trigrams(name):
+                names = self.trigrams[trigram]
+                names.discard(name)
+                if not names:
+                    del self.trigrams[trigram]
+            if self._rows is not None:
+                del self._rows[name]
+                del self._epochs[name]
+        if self._rows is not None and rows:
+            removed = {}
+            for row, product in zip(rows, products):
+                removed.setdefault(product.name, []).append(row)
+            self._log(("removed", rows, len(self.product_manager.products) + len(rows), removed))
+    
+    def products_cleared(self) -> None:
+        """Drop the whole index"""
+        self.name_counts = {}
+        self.trigrams = {}
+        self._rows = {}
+        self._epochs = {}
+        self._changes = []
+    
+    def matching_names(self, text: str) -> list[str]:
+        """
+        Get distinct names containing text (case insensitive)
+        
+        Args:
+            text (str): Searched substring
+        
+        Returns:
+            list[str]: Matching product names
+        """
+        needle = text.lower()
+        if len(needle) < 3:
+            candidates = self.name_counts
+        else:
+            postings = sorted((self.trigrams.get(trigram, set()) for trigram in self.split_trigrams(needle)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        return [name for name in candidates if needle in name.lower()]
+    
+    def search(self, text: str) -> list[int]|None:
+        """
+        Get positions of products whose name contains text
+        
+        The cost grows with the number of matches, not products: merging
+        100k positions takes some 15 ms, and pending changes add about as much
+        for each bulk removal since the names were last searched.
+        
+        Args:
+            text (str): Searched substring
+        
+        Returns:
+            list[int]|None: Ascending positions in ProductManager.products, None when every product matches
+        """
+        names = self.matching_names(text)
+        if not names:
+            return []
+        if len(names) == len(self.name_counts):
+            return None
+        rows = self._name_positions(names)
+        if len(rows) == 1:
+            return list(rows[0])
+        result = []
+        for positions in rows:
+            result.extend(positions)
+        result.sort()
+        return result
+    
+    def _log(self, change: tuple) -> bool:
+        """
+        Record a change for lazy translation, dropping the positions when too many are pending
+        
+        Args:
+            change (tuple): Logged change
+        
+        Returns:
+            bool: Were the positions kept
+        """
+        rows = change[1]
+        if not isinstance(rows, range) and rows[-1] - rows[0] == len(rows) - 1:
+            # Contiguous rows (Ex: a single deleted product) shift positions with slicing
+            change = (change[0], range(rows[0], rows[-1] + 1)) + change[2:]
+        if len(self._changes) >= self.MAX_CHANGES:
+            self._rows = None
+            self._epochs = {}
+            self._changes = []
+            return False
+        self._changes.append(change)
+        return True
+    
+    def _name_positions(self, names: list[str]) -> list[list[int]]:
+        """
+        Get current positions of names, applying pending changes only to them
+        
+        Args:
+            names (list[str]): Indexed names
+        
+        Returns:
+            list[list[int]]: Ascending positions per name
+        """
+        rows = self._name_rows()
+        epochs = self._epochs
+        stale = [name for name in names if epochs[name] < len(self._changes)]
+        for number, change in enumerate(self._changes):
+            names_to_update = [name for name in stale if epochs[name] <= number]
+            for name in names_to_update:
+                rows[name] = self._translate(rows[name], change, name)
+                epochs[name] = number + 1
+        return [rows[name] for name in names]
+    
+    @staticmethod
+    def _translate(positions: list[int], change: tuple, name: str) -> list[int]:
+        """
+        Move positions of one name over a logged change
+        
+        Shifts are found with bisect inside map, so every position costs a C call
+        instead of a Python loop step.
+        
+        Args:
+            positions (list[int]): Ascending positions before the change
+            change (tuple): Logged change
+            name (str): Name of the positions
+        
+        Returns:
+            list[int]: Ascending positions after the change
+        """
+        rows = change[1]
+        if change[0] == "removed":
+            if isinstance(rows, range):
+                first = bisect_left(positions, rows.start)
+                last = bisect_left(positions, rows.stop)
+                return positions[:first] + [position - len(rows) for position in positions[last:]]
+            removed = change[3].get(name)
+            if removed:
+                positions = positions.copy()
+                for row in reversed(removed):
+                    del positions[bisect_left(positions, row)]
+            return list(map(sub, positions, map(bisect_left, repeat(rows), positions)))
+        
+        if isinstance(rows, range):
+            first = bisect_left(positions, rows.start)
+            result = positions[:first] + [position + len(rows) for position in positions[first:]]
+        else:
+            result = list(map(add, positions, map(bisect_right, repeat(change[4]), positions)))
+        added = change[3].get(name)
+        if added:
+            result += added
+            result.sort()
+        return result
+    
+    def _name_rows(self) -> dict[str, list[int]]:
+        """Get positions of every name, rebuilding them if needed"""
+        if self._rows is None:
+            rows = {}
+            for row, product in enumerate(self.product_manager.products):
+                positions = rows.get(product.name)
+                if positions is None:
+                    rows[product.name] = [row]
+                else:
+                    positions.append(row)
+            self._rows = rows
+            self._epochs = dict.fromkeys(rows, 0)
+            self._changes = []
+        return self._rows
@@ -0,0 +1,78 @@
+from Product import Product
+from Belt import Belt
+
+class ProductAggregates:
+    """Running amount totals kept up to date on every product change"""
+    
+    def __init__(self, product_manager):
+        """
+        Compute initial totals and subscribe to manager changes
+        
+        Args:
+            product_manager (ProductManager): Manager with aggregated products
+        """
+        self.product_manager = product_manager
+        # group -> [row count, total amount]
+        self.by_type = {}
+        self.by_month = {}
+        self.by_metal = {}
+        self._account(product_manager.products, 1)
+        product_manager.add_listener(self)
+    
+    def products_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """Add products to the totals"""
+        self._account(products, 1)
+    
+    def products_removed(self, rows: list[int], products: list[Product]) -> None:
+        """Subtract products from the totals"""
+        self._account(products, -1)
+    
+    def products_cleared(self) -> None:
+        """Reset all totals"""
+        self.by_type = {}
+        self.by_month = {}
+        self.by_metal = {}
+    
+    def count_by_type(self) -> dict[str, int]:
+        """Get number of products per product type"""
+        return {group: total[0] for group, total in self.by_type.items()}
+    
+    def amount_by_type(self) -> dict[str, int]:
+        """Get total amount per product type"""
+        return {group: total[1] for group, total in self.by_type.items()}
+    
+    def amount_by_month(self) -> dict[str, int]:
+        """Get total amount per supply month (YYYY-MM), in month order"""
+        return {f"{year:04d}-{month:02d}": self.by_month[(year, month)][1] for year, month in sorted(self.by_month)}
+    
+    def amount_by_metal(self) -> dict[bool, int]:
+        """Get total amount of metal and non-metal belts"""
+        return {metal: self.by_metal.get(metal, [0, 0])[1] for metal in (True, False)}
+    
+    def _account(self, products: list[Product], sign: int) -> None:
+        """
+        Add or subtract products from every group
+        
+        Args:
+            products (list[Product]): Changed products
+            sign (int): 1 for added products, -1 for removed ones
+        """
+        for product in products:
+            amount = product.amount * sign
+            supply_date = product.supplyDate
+            self._update(self.by_type, type(product).__name__, sign, amount)
+            self._update(self.by_month, (supply_date.year, supply_date.month), sign, amount)
+            if isinstance(product, Belt):
+                self._update(self.by_metal, product.metal, sign, amount)
+    
+    @staticmethod
+    def _update(groups: dict, key, count: int, amount: int) -> None:
+        """Apply a change to one group and drop it once it becomes empty"""
+        total = groups.get(key)
+        if total is None:
+            groups[key] = [count, amount]
+        elif total[0] + count:
+            total[0] += count
+            total[1] += amount
+        else:
+            del groups[key]
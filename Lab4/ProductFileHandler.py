@@ -0,0 +1,72 @@
+from datetime import datetime
+from Product import Product
+from Cake import Cake
+from Cup import Cup
+from Belt import Belt
+from Metrics import Metrics
+from Profiler import Profiler
+
+class ProductFileHandler:
+    """Handles saving and loading products to/from files"""
+    
+    @staticmethod
+    @Metrics.timed("ProductFileHandler.save_products")
+    def save_products(products: list[Product], filename: str) -> int:
+        """
+        Save products to a file
+        
+        Args:
+            products (Iterable[Product]): List of products, iterators are written while consumed
+            filename (str): Path to file
+        
+        Returns:
+            int: Number of written products
+        """
+        count = 0
+        with open(filename, 'w') as file:
+            for product in products:
+                file.write(str(product)+"\n")
+                count += 1
+        return count
+    
+    @staticmethod
+    @Metrics.timed("ProductFileHandler.load_products", rows=len)
+    @Profiler.profiled("load_products")
+    def load_products(filename: str) -> list[Product]:
+        """
+        Load products from a file
+        
+        Args:
+            filename (str): Path to file
+            
+        Returns:
+            List[Product]: List of products
+        """
+        products = []
+        with open(filename, 'r') as file:
+            for line in file:
+                supply_type, values = line.strip().split("(")
+                values = values[0:-1].split(", ")
+                
+                if supply_type == "Belt":
+                    products.append(Belt(
+                        supplyDate=datetime.strptime(values[0], "%d.%m.%Y"),
+                        name=values[1][1:-1],
+                        amount=int(values[2]),
+                        metal=(values[3].lower() == "true")
+                    ))
+                elif supply_type == "Cake":
+                    products.append(Cake(
+                        supplyDate=datetime.strptime(values[0], "%d.%m.%Y"),
+                        name=values[1][1:-1],
+                        amount=int(values[2]),
+                        height=int(values[3])
+                    ))
+                elif supply_type == "Cup":
+                    products.append(Cup(
+                        supplyDate=datetime.strptime(values[0], "%d.%m.%Y"),
+                        name=values[1][1:-1],
+                        amount=int(values[2]),
+                        volume=int(values[3])
+                    ))
+        return products
@@ -0,0 +1,95 @@
+from Product import Product
+
+class ProductJournal:
+    """Records inverse deltas of product changes so they can be rolled back"""
+    
+    def __init__(self, product_manager, listen: bool = True):
+        """
+        Start recording changes of a manager
+        
+        Args:
+            product_manager (ProductManager): Manager to watch
+            listen (bool): Subscribe to the manager, False when another listener feeds the journal (Ex: UndoHistory)
+        """
+        self.product_manager = product_manager
+        # ("added", rows, products) or ("removed", rows, products), oldest first
+        self.entries = []
+        self.cleared = False
+        if listen:
+            product_manager.add_listener(self)
+    
+    def products_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """Record added rows, merging consecutive appends into one entry"""
+        if self.entries:
+            kind, last_rows, last_products = self.entries[-1]
+            if kind == "added" and isinstance(last_rows, range) and isinstance(rows, range) and last_rows.stop == rows.start:
+                last_products.extend(products)
+                self.entries[-1] = (kind, range(last_rows.start, rows.stop), last_products)
+                return
+        self.entries.append(("added", rows, list(products)))
+    
+    def products_removed(self, rows: list[int], products: list[Product]) -> None:
+        """Record removed products with their former positions"""
+        self.entries.append(("removed", rows, products))
+    
+    def products_cleared(self) -> None:
+        """Mark the journal as impossible to roll back"""
+        self.cleared = True
+        self.entries = []
+    
+    def close(self) -> None:
+        """Stop recording and drop the deltas (commit)"""
+        self.product_manager.remove_listener(self)
+        self.entries = []
+    
+    def rollback(self) -> int:
+        """
+        Undo recorded changes, newest first, and stop recording
+        
+        Returns:
+            int: Number of reverted product changes
+        """
+        self.product_manager.remove_listener(self)
+        if self.cleared:
+            raise RuntimeError("Cannot roll back changes made before products were cleared")
+        reverted = self.revert()
+        self.entries = []
+        return reverted
+    
+    def revert(self) -> int:
+        """
+        Undo recorded changes, newest first, keeping them for reapply
+        
+        Returns:
+            int: Number of reverted product changes
+        """
+        return self._replay(reversed(self.entries), "removed")
+    
+    def reapply(self) -> int:
+        """
+        Apply reverted changes again, oldest first
+        
+        Returns:
+            int: Number of restored product changes
+        """
+        return self._replay(self.entries, "added")
+    
+    def _replay(self, entries, restored: str) -> int:
+        """
+        Replay entries on the manager, a listening journal records the replay like any change
+        
+        Args:
+            entries (Iterable[tuple]): Entries in replay order
+            restored (str): Kind of entries whose products are inserted back, removed to revert and added to reapply
+        
+        Returns:
+            int: Number of changed products
+        """
+        changed = 0
+        for kind, rows, products in entries:
+            if kind == restored:
+                self.product_manager.insert_rows(rows, products)
+            else:
+                self.product_manager.remove_rows(rows)
+            changed += len(products)
+        return changed
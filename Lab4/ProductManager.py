@@ -0,0 +1,404 @@
+from datetime import datetime
+from Product import Product
+from Cake import Cake
+from Cup import Cup
+from Belt import Belt
+from Metrics import Metrics
+from itertools import compress
+from operator import attrgetter
+
+class ProductManager:
+    """Manages a collection of products"""
+    
+    def __init__(self):
+        """Initialize an empty product list"""
+        self.products = []
+        # Bumped on every change so views can drop cached data
+        self.version = 0
+        self.listeners = []
+    
+    def add_listener(self, listener) -> None:
+        """
+        Subscribe to product changes
+        
+        Listener must implement products_added(rows, products),
+        products_removed(rows, products) and products_cleared().
+        Rows are ascending positions in the list after an addition
+        and before a removal.
+        
+        Args:
+            listener: Object notified about every change
+        """
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener) -> None:
+        """
+        Unsubscribe from product changes
+        
+        Args:
+            listener: Previously added listener
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def add_product(self, product: Product) -> None:
+        """
+        Add a product to the manager
+        
+        Args:
+            product (Product): Product to add
+        """
+        self.products.append(product)
+        self._notify_added(range(len(self.products) - 1, len(self.products)), [product])
+    
+    def add_products(self, products: list[Product]) -> None:
+        """
+        Append several products with a single change notification
+        
+        Args:
+            products (list[Product]): Products to add
+        """
+        if not products:
+            return
+        start = len(self.products)
+        self.products.extend(products)
+        self._notify_added(range(start, len(self.products)), products)
+    
+    def delete_product(self, index: int) -> None:
+        """
+        Delete a product at the specified index
+        
+        Args:
+            index (int): Product position
+        """
+        if 0 <= index < len(self.products):
+            product = self.products.pop(index)
+            self._notify_removed([index], [product])
+    
+    @Metrics.timed("ProductManager.remove_rows")
+    def remove_rows(self, rows: list[int]) -> int:
+        """
+        Remove products at several positions in one operation
+        
+        Args:
+            rows (list[int]|range): Product positions
+        
+        Returns:
+            int: Number of removed products
+        """
+        if isinstance(rows, range) and rows.step == 1:
+            rows = range(max(rows.start, 0), min(rows.stop, len(self.products)))
+            ranges = [(rows.start, rows.stop - 1)] if rows else []
+        else:
+            rows = sorted({row for row in rows if 0 <= row < len(self.products)})
+            ranges = self.row_ranges(rows)
+        if not rows:
+            return 0
+        if len(ranges) == 1 and ranges[0][1] == len(self.products) - 1:
+            # Tail removal (Ex: undoing appends) needs no copy of the kept rows
+            removed = self.products[ranges[0][0]:]
+            del self.products[ranges[0][0]:]
+        else:
+            keep = []
+            removed = []
+            start = 0
+            for first, last in ranges:
+                keep.extend(self.products[start:first])
+                removed.extend(self.products[first:last + 1])
+                start = last + 1
+            keep.extend(self.products[start:])
+            self.products = keep
+        self._notify_removed(rows, removed)
+        return len(rows)
+    
+    def insert_rows(self, rows: list[int], products: list[Product]) -> None:
+        """
+        Insert products so they end up at given positions (inverse of remove_rows)
+        
+        Args:
+            rows (list[int]): Ascending positions of products after insertion
+            products (list[Product]): Products to insert
+        """
+        if not rows:
+            return
+        if rows[0] == len(self.products):
+            self.products.extend(products)
+        else:
+            result = []
+            taken = 0
+            for row, product in zip(rows, products):
+                if row > len(result):
+                    count = row - len(result)
+                    result.extend(self.products[taken:taken + count])
+                    taken += count
+                result.append(product)
+            result.extend(self.products[taken:])
+            self.products = result
+        self._notify_added(rows, products)
+    
+    @staticmethod
+    def row_ranges(rows: list[int]) -> list[tuple[int, int]]:
+        """
+        Coalesce ascending rows into contiguous ranges
+        
+        Args:
+            rows (list[int]): Ascending unique rows
+        
+        Returns:
+            list[tuple[int, int]]: Inclusive (first, last) ranges
+        """
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1] = (ranges[-1][0], row)
+            else:
+                ranges.append((row, row))
+        return ranges
+    
+    def clear_products(self) -> None:
+        """Remove all products from list"""
+        self.products = []
+        self.version += 1
+        for listener in self.listeners:
+            listener.products_cleared()
+    
+    def get_products(self) -> list[Product]:
+        """Get a copy of product list"""
+        return self.products.copy()
+    
+    @Metrics.timed("ProductManager.remove_where")
+    def remove_where(self, predicate) -> int:
+        """
+        Remove all products matching predicate in a single pass
+        
+        Args:
+            predicate (Callable[[Product], bool]): Condition for removing
+        
+        Returns:
+            int: Number of removed products
+        """
+        keep = []
+        rows = []
+        removed = []
+        for row, product in enumerate(self.products):
+            if predicate(product):
+                rows.append(row)
+                removed.append(product)
+            else:
+                keep.append(product)
+        if rows:
+            self.products = keep
+            self._notify_removed(rows, removed)
+        return len(rows)
+    
+    def select_where(self, predicate=None):
+        """
+        Iterate over matching products without building a list
+        
+        Args:
+            predicate (Callable[[Product], bool]|None): Condition for selecting, all products if None
+        
+        Returns:
+            Iterator[Product]: Matching products in table order
+        """
+        if predicate is None:
+            return iter(self.products)
+        return compress(self.products, map(predicate, self.products))
+    
+    def count_where(self, predicate=None) -> int:
+        """
+        Count matching products
+        
+        Args:
+            predicate (Callable[[Product], bool]|None): Condition for counting, all products if None
+        
+        Returns:
+            int: Number of matching products
+        """
+        if predicate is None:
+            return len(self.products)
+        return sum(map(bool, map(predicate, self.products)))
+    
+    def sum_where(self, field: str, predicate=None) -> int:
+        """
+        Sum a numeric field of matching products
+        
+        Args:
+            field (str): amount or special (only Cake height and Cup volume count)
+            predicate (Callable[[Product], bool]|None): Condition for summing, all products if None
+        
+        Returns:
+            int: Sum of field values
+        """
+        products = self.select_where(predicate)
+        if field == "amount":
+            return sum(map(attrgetter("amount"), products))
+        elif field == "special":
+            return sum(self.special_value(product) for product in products if isinstance(product, (Cake, Cup)))
+        raise ValueError(f"Unsupported SUM field: {field}")
+    
+    @Metrics.timed("ProductManager.remove_by_range")
+    def remove_by_range(self, field: str, range_min: int|datetime, range_max: int|datetime) -> int:
+        """
+        Remove products with field value in selected range [start, end]
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            range_min (int|datetime): Start of the range
+            range_max (int|datetime): End of the range
+        
+        Returns:
+            int: Number of removed products
+        """
+        predicate = self.range_predicate(field, range_min, range_max)
+        return 0 if predicate is None else self.remove_where(predicate)
+    
+    @Metrics.timed("ProductManager.remove_equal")
+    def remove_equal(self, field: str, value: str, is_equal: bool) -> int:
+        """
+        Remove products with field value equal to desired value
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            value (str): Value for equation
+            is_equal (bool): Should the field be equal to value or not
+        
+        Returns:
+            int: Number of removed products
+        """
+        predicate = self.equal_predicate(field, value, is_equal)
+        return 0 if predicate is None else self.remove_where(predicate)
+    
+    @Metrics.timed("ProductManager.remove_by_inequality")
+    def remove_by_inequality(self, field: str, value: int|datetime, is_greater: bool) -> int:
+        """
+        Remove products with field value below equal or greater equal than desired value
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            value (int|datetime): Value for equation
+            is_greater (bool): Should the field be greater than value or not
+        
+        Returns:
+            int: Number of removed products
+        """
+        predicate = self.inequality_predicate(field, value, is_greater)
+        return 0 if predicate is None else self.remove_where(predicate)
+    
+    @classmethod
+    def range_predicate(cls, field: str, range_min: int|datetime, range_max: int|datetime):
+        """
+        Build a check for field value in range [start, end]
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            range_min (int|datetime): Start of the range
+            range_max (int|datetime): End of the range
+        
+        Returns:
+            Callable[[Product], bool]|None: Predicate or None for unsupported field
+        """
+        if field == "amount":
+            return lambda product: range_min <= product.amount <= range_max
+        elif field == "supplyDate":
+            return lambda product: range_min <= product.supplyDate <= range_max
+        elif field == "special":
+            return lambda product: isinstance(product, (Cake, Cup)) and range_min <= cls.special_value(product) <= range_max
+        return None
+    
+    @classmethod
+    def equal_predicate(cls, field: str, value: str, is_equal: bool):
+        """
+        Build a check for field value (as string) equal to value
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            value (str): Value for equation
+            is_equal (bool): Should the field be equal to value or not
+        
+        Returns:
+            Callable[[Product], bool]|None: Predicate or None for unsupported field
+        """
+        if field == "name":
+            return lambda product: (product.name == value) == is_equal
+        elif field == "supplyDate":
+            return lambda product: (str(product.supplyDate) == value) == is_equal
+        elif field == "amount":
+            return lambda product: (str(product.amount) == value) == is_equal
+        elif field == "special":
+            return lambda product: isinstance(product, (Belt, Cake, Cup)) and (str(cls.special_value(product)) == value) == is_equal
+        return None
+    
+    @classmethod
+    def inequality_predicate(cls, field: str, value: int|datetime, is_greater: bool):
+        """
+        Build a check for field value greater equal or below equal than value
+        
+        Args:
+            field (str): Desired field to equation (Ex: supplyDate, amount...)
+            value (int|datetime): Value for equation
+            is_greater (bool): Should the field be greater than value or not
+        
+        Returns:
+            Callable[[Product], bool]|None: Predicate or None for unsupported field
+        """
+        if is_greater:
+            matches = lambda field_value: field_value >= value
+        else:
+            matches = lambda field_value: field_value <= value
+        
+        if field == "amount":
+            return lambda product: matches(product.amount)
+        elif field == "supplyDate":
+            return lambda product: matches(product.supplyDate)
+        elif field == "special":
+            return lambda product: isinstance(product, (Cake, Cup)) and matches(cls.special_value(product))
+        return None
+    
+    @staticmethod
+    def type_predicate(type_name: str, is_equal: bool):
+        """
+        Build a check for product type
+        
+        Args:
+            type_name (str): Product class name (Belt, Cake or Cup)
+            is_equal (bool): Should the product be of this type or not
+        
+        Returns:
+            Callable[[Product], bool]|None: Predicate or None for unsupported type
+        """
+        product_type = {"Belt": Belt, "Cake": Cake, "Cup": Cup}.get(type_name)
+        if product_type is None:
+            return None
+        return lambda product: isinstance(product, product_type) == is_equal
+    
+    @staticmethod
+    def special_value(product: Product) -> bool|int|None:
+        """
+        Get the type specific attribute of a product
+        
+        Args:
+            product (Product): Selected product
+        
+        Returns:
+            bool|int|None: Belt metal flag, Cake height, Cup volume or None
+        """
+        if isinstance(product, Belt):
+            return product.metal
+        elif isinstance(product, Cake):
+            return product.height
+        elif isinstance(product, Cup):
+            return product.volume
+        return None
+    
+    def _notify_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """Bump version and pass added rows to listeners"""
+        self.version += 1
+        for listener in self.listeners:
+            listener.products_added(rows, products)
+    
+    def _notify_removed(self, rows: list[int], products: list[Product]) -> None:
+        """Bump version and pass removed rows to listeners"""
+        self.version += 1
+        for listener in self.listeners:
+            listener.products_removed(rows, products)
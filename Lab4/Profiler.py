@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+import cProfile
+import io
+import os
+import tracemalloc
+
+class Profiler:
+    """Opt-in cProfile and tracemalloc runs of scenarios and file loads, reports go next to the logs"""
+    
+    # Functions and allocation sites listed in a report
+    TOP = 30
+    
+    modes = set()
+    directory = "logs"
+    # Only the outermost profiled call is reported, profilers can not be nested
+    active = False
+    last_files = []
+    
+    @classmethod
+    def configure(cls, modes: str, directory: str|None = None) -> None:
+        """
+        Select what profiled calls record
+        
+        Args:
+            modes (str): Comma separated cpu, memory or all (also 1), empty or 0 to disable
+            directory (str|None): Folder for reports, logs as default
+        """
+        cls.modes = {mode.strip() for mode in modes.lower().split(",")} - {"", "0"}
+        if cls.modes & {"all", "1"}:
+            cls.modes = {"cpu", "memory"}
+        if directory is not None:
+            cls.directory = directory
+    
+    @classmethod
+    @contextmanager
+    def profile(cls, label: str):
+        """
+        Profile the enclosed block if profiling is enabled
+        
+        Args:
+            label (str): Name of the profiled operation, used in report file names
+        """
+        if not cls.modes or cls.active:
+            yield
+            return
+        cls.active = True
+        profiler = cProfile.Profile() if "cpu" in cls.modes else None
+        tracing = "memory" in cls.modes and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (Ex: a debugger or coverage tool) owns the hook
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            snapshot = None
+            if tracing:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            cls.active = False
+            try:
+                cls.last_files = cls._write(label, profiler, snapshot, peak if tracing else 0)
+            except OSError:
+                cls.last_files = []
+    
+    @classmethod
+    def profiled(cls, label: str):
+        """
+        Decorator profiling every call of a function if profiling is enabled
+        
+        Args:
+            label (str): Name of the profiled operation
+        
+        Returns:
+            Callable: Decorator
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.modes:
+                    return function(*args, **kwargs)
+                with cls.profile(label):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    @classmethod
+    def _write(cls, label: str, profiler: cProfile.Profile|None, snapshot: tracemalloc.Snapshot|None, peak: int) -> list[str]:
+        """
+        Write report files of one profiled run
+        
+        Args:
+            label (str): Name of the profiled operation
+            profiler (cProfile.Profile|None): Finished cProfile run
+            snapshot (tracemalloc.Snapshot|None): Allocations at the end of the run
+            peak (int): Peak traced memory in bytes
+        
+        Returns:
+            list[str]: Paths of written files
+        """
+        os.makedirs(cls.directory, exist_ok=True)
+        base = os.path.join(cls.directory, f"profile_{datetime.now().strftime("%d-%m-%Y_%H-%M-%S")}_{label}")
+        number = 1
+        path = base
+        while os.path.exists(f"{path}.txt"):
+            number += 1
+            path = f"{base}_{number}"
+        
+        files = []
+        lines = [f"Profile of {label}"]
+        if profiler is not None:
+            profiler.dump_stats(f"{path}.prof")
+            files.append(f"{path}.prof")
+            # Only needed for reports, keeps it out of every startup
+            import pstats
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(cls.TOP)
+            lines += ["", f"Top {cls.TOP} functions by cumulative time:", text.getvalue()]
+        if snapshot is not None:
+            statistics = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics("lineno")
+            lines += ["", f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", f"Top {cls.TOP} allocation sites:"]
+            lines += [str(statistic) for statistic in statistics[:cls.TOP]]
+        with open(f"{path}.txt", "w") as file:
+            file.write("\n".join(lines) + "\n")
+        files.append(f"{path}.txt")
+        return files
+
+Profiler.configure(os.environ.get("LAB4_PROFILE", ""))
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import os
+
+from CommandParser import CommandParser, Command, PARSER_VERSION
+from SnapshotFile import SnapshotFile
+
+class ScenarioCache:
+    """Stores parsed command files on disk, like .pyc files for scenarios"""
+    
+    MAGIC = b"SCNCACHE"
+    
+    def __init__(self, directory: str = "scenario_cache", max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            directory (str): Folder for cached scenarios
+            max_entries (int): Entries kept, least recently used ones are deleted after a write
+            max_bytes (int): Total size of kept entries
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self, filename: str, parser: CommandParser) -> list[Command]:
+        """
+        Get parsed commands of a file, parsing it only if no valid cache entry exists
+        
+        Args:
+            filename (str): Path to command file
+            parser (CommandParser): Parser used on cache miss
+        
+        Returns:
+            list[Command]: Parsed commands
+        """
+        with open(filename, 'rb') as file:
+            data = file.read()
+        # Decoded like open(filename, 'r') of the uncached path, the encoding is part of the key
+        text = io.TextIOWrapper(io.BytesIO(data))
+        digest = hashlib.sha256(text.encoding.encode() + b"\0" + data).digest()
+        path = self.entry_path(digest)
+        
+        commands = self._read(path, digest)
+        if commands is not None:
+            self.hits += 1
+            # Modification time doubles as last use for eviction
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return commands
+        
+        self.misses += 1
+        commands = list(parser.parse(text))
+        if self._write(path, digest, commands):
+            self._evict()
+        return commands
+    
+    def entry_path(self, digest: bytes) -> str:
+        """
+        Get cache file path for a content hash
+        
+        Args:
+            digest (bytes): SHA-256 of the text encoding and command file
+        
+        Returns:
+            str: Path of the cache entry
+        """
+        return os.path.join(self.directory, f"{digest.hex()}.scn")
+    
+    def header(self, digest: bytes) -> bytes:
+        """Get the expected header of an entry (magic, parser version, content hash), followed by payload CRC32"""
+        return self.MAGIC + PARSER_VERSION.to_bytes(4, "little") + digest
+    
+    def _read(self, path: str, digest: bytes) -> list[Command]|None:
+        """
+        Read a cache entry
+        
+        Returns:
+            list[Command]|None: Cached commands, None if missing, stale or corrupted
+        """
+        header = self.header(digest)
+        return SnapshotFile.read(path, lambda file: file.read(len(header)) == header, Command)
+    
+    def _write(self, path: str, digest: bytes, commands: list[Command]) -> bool:
+        """Write a cache entry atomically, a failed write only disables caching for it"""
+        return SnapshotFile.write(path, self.header(digest), commands)
+    
+    def _evict(self) -> None:
+        """Delete entries with the oldest modification time until both limits are met"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".scn"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        except OSError:
+            return
+        entries.sort()
+        count = len(entries)
+        total = sum(size for _, _, size in entries)
+        for _, name, size in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            count -= 1
+            total -= size
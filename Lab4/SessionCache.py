@@ -0,0 +1,83 @@
+import os
+
+from Product import Product
+from SnapshotFile import SnapshotFile
+
+class SessionCache:
+    """Keeps a binary snapshot of the window's products, so a launch restores them without parsing the source file"""
+    
+    MAGIC = b"LAB4SESS"
+    # Bump when Product classes or the snapshot layout change
+    VERSION = 1
+    
+    def __init__(self, directory: str = "session_cache"):
+        """
+        Initialize the cache
+        
+        Args:
+            directory (str): Folder for the snapshot
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, "session.snap")
+    
+    @staticmethod
+    def stamp(filename: str) -> tuple[str, int, int]:
+        """
+        Identify the current contents of a source file, taken before it is loaded
+        
+        Args:
+            filename (str): Path to products file
+        
+        Returns:
+            tuple[str, int, int]: Absolute path, size and modification time in nanoseconds
+        """
+        stat = os.stat(filename)
+        return os.path.abspath(filename), stat.st_size, stat.st_mtime_ns
+    
+    def save(self, source: tuple[str, int, int], products: list[Product]) -> bool:
+        """
+        Write a snapshot atomically, a failed write only leaves the previous one in place
+        
+        Args:
+            source (tuple[str, int, int]): Stamp of the file the products were loaded from
+            products (list[Product]): Current products, including later changes
+        
+        Returns:
+            bool: Was the snapshot written
+        """
+        return SnapshotFile.write(self.path, self.header(source), products)
+    
+    def restore(self) -> tuple[tuple[str, int, int], list[Product]]|None:
+        """
+        Read the snapshot if its source file is unchanged
+        
+        Returns:
+            tuple[tuple[str, int, int], list[Product]]|None: Source stamp and products, None if missing, stale or corrupted
+        """
+        source = None
+        
+        def check_header(file) -> bool:
+            nonlocal source
+            if file.read(len(self.MAGIC) + 4) != self.MAGIC + self.VERSION.to_bytes(4, "little"):
+                return False
+            path = file.read(int.from_bytes(file.read(4), "little")).decode()
+            size = int.from_bytes(file.read(8), "little")
+            mtime = int.from_bytes(file.read(8), "little", signed=True)
+            source = (path, size, mtime)
+            # Size and mtime only, hashing a multi-million-row file would cost as much as parsing it
+            return self.stamp(path) == source
+        
+        products = SnapshotFile.read(self.path, check_header, Product)
+        return None if products is None else (source, products)
+    
+    def header(self, source: tuple[str, int, int]) -> bytes:
+        """Get the header of a snapshot (magic, version, source path, size and mtime), followed by payload CRC32"""
+        path, size, mtime = source
+        path = path.encode()
+        return (self.MAGIC + self.VERSION.to_bytes(4, "little") + len(path).to_bytes(4, "little") + path
+                + size.to_bytes(8, "little") + mtime.to_bytes(8, "little", signed=True))
+    
+    def clear(self) -> None:
+        """Remove the snapshot"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
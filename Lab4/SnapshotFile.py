@@ -0,0 +1,74 @@
+import gc
+import os
+import pickle
+import zlib
+
+class SnapshotFile:
+    """Pickled list behind a header and a CRC32 of the payload, shared by the on-disk caches"""
+    
+    @staticmethod
+    def write(path: str, header: bytes, items: list) -> bool:
+        """
+        Write a snapshot atomically, a failed write only leaves the previous file in place
+        
+        Args:
+            path (str): Path of the snapshot, its folder is created if needed
+            header (bytes): Header identifying the contents (Ex: magic, version, source)
+            items (list): Pickled items
+        
+        Returns:
+            bool: Was the snapshot written
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            data = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(temp_path, 'wb') as file:
+                file.write(header)
+                file.write(zlib.crc32(data).to_bytes(4, "little"))
+                file.write(data)
+            os.replace(temp_path, path)
+            return True
+        # Unpicklable objects raise PicklingError, AttributeError or TypeError
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+    
+    @staticmethod
+    def read(path: str, check_header, item_type: type) -> list|None:
+        """
+        Read a snapshot
+        
+        Args:
+            path (str): Path of the snapshot
+            check_header (Callable[[BinaryIO], bool]): Reads the header from the open file and tells if it is still valid
+            item_type (type): Class every item must be an instance of
+        
+        Returns:
+            list|None: Items, None if missing, stale or corrupted
+        """
+        try:
+            with open(path, 'rb') as file:
+                if not check_header(file):
+                    return None
+                checksum = int.from_bytes(file.read(4), "little")
+                data = file.read()
+        except (OSError, ValueError):
+            return None
+        if zlib.crc32(data) != checksum:
+            return None
+        
+        # Millions of new objects would trigger useless collections
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            items = pickle.loads(data)
+        except Exception:
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if not isinstance(items, list) or not all(isinstance(item, item_type) for item in items):
+            return None
+        return items
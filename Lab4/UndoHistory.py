@@ -0,0 +1,171 @@
+from collections import deque
+from contextlib import contextmanager
+from Product import Product
+from ProductJournal import ProductJournal
+
+class UndoHistory:
+    """Undo and redo stacks of product changes, steps are ProductJournal deltas instead of list copies"""
+    
+    MAX_BYTES = 64 * 1024 * 1024
+    # Estimated size of a product kept alive only by the history (object, attribute dict, date and name)
+    PRODUCT_BYTES = 400
+    # Size of one stored row position or product reference
+    REFERENCE_BYTES = 8
+    
+    def __init__(self, product_manager, max_bytes: int = MAX_BYTES):
+        """
+        Start recording changes of a manager
+        
+        Args:
+            product_manager (ProductManager): Manager to watch
+            max_bytes (int): Estimated memory cap of both stacks, oldest steps are dropped first
+        """
+        self.product_manager = product_manager
+        self.max_bytes = max_bytes
+        # Steps are (journal, estimated bytes), journals are fed by this history instead of listening themselves
+        self.undo_steps = deque()
+        self.redo_steps = deque()
+        self.bytes = 0
+        self.dropped = 0
+        # Journal of an open action, None outside of action()
+        self._journal = None
+        self._depth = 0
+        self._applying = False
+        product_manager.add_listener(self)
+    
+    def products_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """Record added rows"""
+        if not self._applying:
+            journal = self._record()
+            journal.products_added(rows, products)
+            self._end_change(journal)
+    
+    def products_removed(self, rows: list[int], products: list[Product]) -> None:
+        """Record removed products with their former positions"""
+        if not self._applying:
+            journal = self._record()
+            journal.products_removed(rows, products)
+            self._end_change(journal)
+    
+    def products_cleared(self) -> None:
+        """Forget the history, a clear can not be undone without a copy of the list"""
+        if not self._applying:
+            self.clear()
+    
+    @contextmanager
+    def action(self):
+        """Group every change made inside the block (Ex: a scenario run) into one undo step"""
+        self._depth += 1
+        if self._depth == 1:
+            self._journal = ProductJournal(self.product_manager, listen=False)
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                journal, self._journal = self._journal, None
+                if journal.entries:
+                    self._push(self.undo_steps, journal, "removed")
+    
+    def can_undo(self) -> bool:
+        """Is there a step to undo"""
+        return bool(self.undo_steps)
+    
+    def can_redo(self) -> bool:
+        """Is there an undone step to redo"""
+        return bool(self.redo_steps)
+    
+    def undo(self) -> int:
+        """
+        Revert the newest step
+        
+        Returns:
+            int: Number of reverted product changes
+        """
+        if not self.undo_steps:
+            return 0
+        journal, cost = self.undo_steps.pop()
+        self.bytes -= cost
+        changed = self._apply(journal.revert)
+        # Undone additions are now only referenced by the redo stack
+        self._push(self.redo_steps, journal, "added")
+        return changed
+    
+    def redo(self) -> int:
+        """
+        Apply the last undone step again
+        
+        Returns:
+            int: Number of restored product changes
+        """
+        if not self.redo_steps:
+            return 0
+        journal, cost = self.redo_steps.pop()
+        self.bytes -= cost
+        changed = self._apply(journal.reapply)
+        self._push(self.undo_steps, journal, "removed")
+        return changed
+    
+    def clear(self) -> None:
+        """Drop every step"""
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.bytes = 0
+        if self._journal is not None:
+            self._journal.entries = []
+    
+    def close(self) -> None:
+        """Stop recording and drop the history"""
+        self.product_manager.remove_listener(self)
+        self.clear()
+    
+    def _record(self) -> ProductJournal:
+        """Get the journal of a new change, a new change makes redo impossible"""
+        if self.redo_steps:
+            self.bytes -= sum(cost for _, cost in self.redo_steps)
+            self.redo_steps.clear()
+        if self._journal is None:
+            return ProductJournal(self.product_manager, listen=False)
+        return self._journal
+    
+    def _end_change(self, journal: ProductJournal) -> None:
+        """Make a change outside of an action a step of its own"""
+        if journal is not self._journal:
+            self._push(self.undo_steps, journal, "removed")
+    
+    def _apply(self, replay) -> int:
+        """
+        Replay a journal without recording it
+        
+        Args:
+            replay (Callable[[], int]): ProductJournal.revert or ProductJournal.reapply of the step
+        
+        Returns:
+            int: Number of changed products
+        """
+        self._applying = True
+        try:
+            return replay()
+        finally:
+            self._applying = False
+    
+    def _push(self, steps: deque, journal: ProductJournal, owned: str) -> None:
+        """
+        Add a step to a stack and drop the oldest steps over the memory cap
+        
+        Args:
+            steps (deque): Undo or redo stack
+            journal (ProductJournal): Changes of the step
+            owned (str): Kind of entries whose products are kept alive only by this step
+        """
+        cost = 0
+        for kind, rows, products in journal.entries:
+            cost += 0 if isinstance(rows, range) else len(rows) * self.REFERENCE_BYTES
+            cost += len(products) * (self.REFERENCE_BYTES + (self.PRODUCT_BYTES if kind == owned else 0))
+        steps.append((journal, cost))
+        self.bytes += cost
+        # Oldest history first: bottom of the undo stack, then the furthest redo
+        while self.bytes > self.max_bytes and (self.undo_steps or self.redo_steps):
+            _, dropped_cost = (self.undo_steps or self.redo_steps).popleft()
+            self.bytes -= dropped_cost
+            self.dropped += 1
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from CommandParser import CommandParser
+from CommandProcessor import CommandProcessor
+from DataGenerator import DataGenerator
+from ProductFileHandler import ProductFileHandler
+from ProductManager import ProductManager
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# REM flavours, each run on a fresh copy of the loaded products
+REMOVALS = {
+    "rem_range": "REM 100 <= amount <= 200",
+    "rem_equal": "REM name = Supplier 7",
+    "rem_inequality": "REM supplyDate < 2022-01-01",
+    "rem_special": "REM special > 900",
+    "rem_compound": "REM type = Cup AND amount < 100 AND NOT supplyDate >= 2025-01-01",
+}
+# Rows rendered by the table benchmark, data() does not depend on table size
+TABLE_ROWS = 10_000
+
+class NullLogger:
+    """Logger that drops messages, keeps log I/O out of timings"""
+    
+    def log_message(self, level: str, message: str, filename: str|None = None) -> None:
+        """Ignore a message"""
+
+def timed(function, repeat: int) -> float:
+    """
+    Get the best duration of several calls
+    
+    Args:
+        function (Callable[[], None]): Measured call
+        repeat (int): Number of calls
+    
+    Returns:
+        float: Shortest duration in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+def bench_parser(lines: int) -> float:
+    """
+    Measure command file parsing throughput
+    
+    Args:
+        lines (int): Number of command lines
+    
+    Returns:
+        float: Parsed lines per second
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "scenario.txt")
+        DataGenerator(workers=os.cpu_count() or 1).write_commands(filename, lines)
+        start = time.perf_counter()
+        CommandParser().parse_file(filename)
+        return lines / (time.perf_counter() - start)
+
+def bench_table(products: list, repeat: int) -> float:
+    """
+    Measure ProductTableModel.data on the offscreen Qt platform
+    
+    Args:
+        products (list[Product]): Products shown in the table
+        repeat (int): Number of measured passes
+    
+    Returns:
+        float: Seconds of one pass over TABLE_ROWS rows and every column
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from gui import ProductTableModel
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    manager = ProductManager()
+    manager.add_products(products)
+    model = ProductTableModel(manager)
+    indexes = [model.index(row, column) for row in range(min(TABLE_ROWS, len(products))) for column in range(model.columnCount())]
+    data = model.data
+    return timed(lambda: [data(index) for index in indexes], repeat)
+
+def run_suite(sizes: list[int], repeat: int = 3, table: bool = True) -> list[dict]:
+    """
+    Run every benchmark at every size
+    
+    Args:
+        sizes (list[int]): Row counts of generated files
+        repeat (int): Calls per benchmark, the fastest one is reported
+        table (bool): Include the Qt table benchmark
+    
+    Returns:
+        list[dict]: Results with benchmark, rows, seconds and rows_per_second
+    """
+    results = []
+    
+    def add(benchmark: str, rows: int, seconds: float) -> None:
+        results.append({"benchmark": benchmark, "rows": rows, "seconds": seconds,
+                        "rows_per_second": rows / seconds if seconds else None})
+        print(f"{benchmark:>16} {rows:>10}: {seconds * 1000:10.1f} ms", file=sys.stderr)
+    
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            supply_file = os.path.join(directory, "supply.txt")
+            adds_file = os.path.join(directory, "adds.txt")
+            output_file = os.path.join(directory, "output.txt")
+            generator = DataGenerator(workers=os.cpu_count() or 1)
+            generator.write_supply(supply_file, rows)
+            generator.write_commands(adds_file, rows, add_ratio=1, rem_ratio=0, save_ratio=0)
+            
+            products = []
+            
+            def load() -> None:
+                products[:] = ProductFileHandler.load_products(supply_file)
+            add("load_products", rows, timed(load, repeat))
+            
+            add("save_products", rows, timed(lambda: ProductFileHandler.save_products(products, output_file), repeat))
+            
+            def bulk_add() -> None:
+                CommandProcessor(ProductManager(), ProductFileHandler(), NullLogger()).process_command_file(adds_file)
+            add("bulk_add", rows, timed(bulk_add, repeat))
+            
+            parser = CommandParser()
+            for benchmark, line in REMOVALS.items():
+                command = parser.parse_line(1, line)
+                seconds = None
+                for _ in range(repeat):
+                    manager = ProductManager()
+                    manager.add_products(products.copy())
+                    start = time.perf_counter()
+                    command.condition.apply(manager)
+                    elapsed = time.perf_counter() - start
+                    seconds = elapsed if seconds is None else min(seconds, elapsed)
+                add(benchmark, rows, seconds)
+            
+            if table:
+                add("table_data", min(TABLE_ROWS, rows), bench_table(products, repeat))
+    return results
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Find benchmarks slower than a baseline run
+    
+    Args:
+        results (list[dict]): Current results
+        baseline (list[dict]): Results of an earlier run
+        tolerance (float): Allowed slowdown factor (Ex: 1.25)
+    
+    Returns:
+        list[str]: One line per regression
+    """
+    previous = {(result["benchmark"], result["rows"]): result["seconds"] for result in baseline}
+    regressions = []
+    for result in results:
+        seconds = previous.get((result["benchmark"], result["rows"]))
+        if seconds and result["seconds"] > seconds * tolerance:
+            regressions.append(f"{result['benchmark']} at {result['rows']} rows: "
+                               f"{seconds * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms ({result['seconds'] / seconds:.2f}x)")
+    return regressions
+
+def parse_sizes(text: str) -> list[int]:
+    """Parse comma separated row counts, 1e5 style allowed"""
+    return [int(float(size)) for size in text.split(",") if size.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loading, commands, saving and table rendering")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(SIZES), help="Comma separated row counts (default: 1e3,1e4,1e5,1e6,1e7)")
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per benchmark, the fastest one is reported")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run, exit with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown against the baseline (default: 1.25)")
+    parser.add_argument("--no-table", action="store_true", help="Skip the Qt table benchmark")
+    parser.add_argument("--parse-lines", type=int, default=0, help="Also measure parser throughput on this many command lines")
+    args = parser.parse_args()
+    
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": run_suite(args.sizes, args.repeat, not args.no_table),
+    }
+    if args.parse_lines:
+        report["parse_lines_per_second"] = bench_parser(args.parse_lines)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report["results"], json.load(file)["results"], args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,147 @@
+import time
+
+_started = time.perf_counter()
+
+import argparse
+import sys
+
+from Logger import Logger
+from ProductManager import ProductManager
+from ProductFileHandler import ProductFileHandler
+from CommandProcessor import CommandProcessor
+from ScenarioCache import ScenarioCache
+from Metrics import Metrics
+from Profiler import Profiler
+
+def report(phase: str, seconds: float) -> None:
+    """
+    Print duration of a phase to stderr
+    
+    Args:
+        phase (str): Phase name
+        seconds (float): Phase duration
+    """
+    print(f"{phase}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
+def parse_args(argv: list[str]|None = None) -> argparse.Namespace:
+    """
+    Parse command line arguments
+    
+    Args:
+        argv (list[str]|None): Arguments without program name (sys.argv as default)
+    
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Run command scenarios against a supply file without GUI")
+    parser.add_argument("supply", nargs="?", help="Supply file to load before running commands")
+    parser.add_argument("commands", nargs="*", help="Command files to run in order, '-' reads stdin (default without --serve or --socket)")
+    parser.add_argument("--atomic", action="store_true", help="Roll back a whole command file if any command fails")
+    parser.add_argument("--dry-run", action="store_true", help="Report rows each command would touch without changing anything")
+    parser.add_argument("--cache-dir", default="scenario_cache", help="Folder for parsed command files (default: scenario_cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse command files on every run")
+    parser.add_argument("--stats", action="store_true", help="Record timings of hot paths and print them at exit")
+    parser.add_argument("--profile", metavar="MODES", help="Profile file loads and command files: cpu, memory or all (also LAB4_PROFILE)")
+    parser.add_argument("--metrics", metavar="[HOST:]PORT", help="Serve Prometheus metrics on http://HOST:PORT/metrics while running")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="After running command files, serve commands over TCP")
+    parser.add_argument("--socket", metavar="PATH", help="After running command files, serve commands over a Unix socket")
+    return parser.parse_args(argv)
+
+def main(argv: list[str]|None = None) -> int:
+    """
+    Load supply file and run command files
+    
+    Args:
+        argv (list[str]|None): Arguments without program name (sys.argv as default)
+    
+    Returns:
+        int: Exit code, 1 if any scenario failed
+    """
+    args = parse_args(argv)
+    if args.stats:
+        Metrics.enable()
+    if args.profile:
+        Profiler.configure(args.profile)
+    product_manager = ProductManager()
+    file_handler = ProductFileHandler()
+    logger = Logger()
+    cache = None if args.no_cache else ScenarioCache(args.cache_dir)
+    processor = CommandProcessor(product_manager, file_handler, logger, atomic=args.atomic, cache=cache, output=print)
+    metrics_server = None
+    if args.metrics:
+        from MetricsServer import MetricsServer
+        host, _, port = args.metrics.rpartition(":")
+        metrics_server = MetricsServer(product_manager, logger)
+        print(f"Serving metrics on http://{metrics_server.start(host or "127.0.0.1", int(port))}/metrics", file=sys.stderr)
+    report("startup", time.perf_counter() - _started)
+    
+    if args.supply:
+        start = time.perf_counter()
+        try:
+            product_manager.add_products(file_handler.load_products(args.supply))
+        except Exception as e:
+            logger.log_message("ERROR", f"Failed to load file: {str(e)}")
+            print(f"Failed to load file: {str(e)}", file=sys.stderr)
+            if metrics_server is not None:
+                metrics_server.close()
+            return 1
+        report(f"load {args.supply} ({len(product_manager.products)} products)", time.perf_counter() - start)
+    
+    success = True
+    # A server reads its commands from clients, stdin is only the default without one
+    commands = args.commands or ([] if args.serve or args.socket else ["-"])
+    for filename in commands:
+        start = time.perf_counter()
+        if args.dry_run:
+            try:
+                entries = processor.explain_commands(sys.stdin) if filename == "-" else processor.explain_command_file(filename)
+            except OSError as e:
+                print(f"Failed to read {filename}: {str(e)}", file=sys.stderr)
+                success = False
+                continue
+            for entry in entries:
+                print(entry)
+            success = success and all(entry.error is None for entry in entries)
+            report(f"explain {filename}", time.perf_counter() - start)
+            continue
+        if filename == "-":
+            with Profiler.profile("process_commands"):
+                success = processor.process_commands(sys.stdin) and success
+        else:
+            success = processor.process_command_file(filename) and success
+        report(f"run {filename}", time.perf_counter() - start)
+    
+    report(f"total ({len(product_manager.products)} products)", time.perf_counter() - _started)
+    if args.serve or args.socket:
+        import asyncio
+        try:
+            asyncio.run(serve(processor, args.serve, args.socket))
+        except KeyboardInterrupt:
+            pass
+    if metrics_server is not None:
+        metrics_server.close()
+    if Metrics.enabled:
+        print(Metrics.report(), file=sys.stderr)
+    return 0 if success else 1
+
+async def serve(processor: CommandProcessor, address: str|None, path: str|None) -> None:
+    """
+    Serve commands until interrupted
+    
+    Args:
+        processor (CommandProcessor): Processor with loaded products
+        address (str|None): TCP address as [HOST:]PORT
+        path (str|None): Unix socket path, used if address is not set
+    """
+    from CommandServer import CommandServer
+    server = CommandServer(processor)
+    if address:
+        host, _, port = address.rpartition(":")
+        await server.start(host or "127.0.0.1", int(port))
+    else:
+        await server.start(path=path)
+    print(f"Serving commands on {server.address()}", file=sys.stderr)
+    await server.serve_forever()
+
+if __name__ == "__main__":
+    sys.exit(main())
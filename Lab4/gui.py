@@ -0,0 +1,938 @@
+from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QTableView, QPushButton, QLineEdit, QDateEdit, QSpinBox,
+                             QLabel, QMessageBox, QFileDialog, QComboBox, QDialog, QCheckBox,
+                             QPlainTextEdit)
+from PyQt6.QtCore import QDate, Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt6.QtGui import QFontDatabase, QKeySequence
+from Cake import Cake
+from Cup import Cup
+from Belt import Belt
+from Product import Product
+from NameIndex import NameIndex
+from ProductAggregates import ProductAggregates
+from Logger import Logger
+from ProductManager import ProductManager
+from ProductFileHandler import ProductFileHandler
+from CommandProcessor import CommandProcessor
+from ScenarioCache import ScenarioCache
+from SessionCache import SessionCache
+from UndoHistory import UndoHistory
+from Metrics import Metrics
+from Profiler import Profiler
+from datetime import datetime
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress, repeat
+from operator import add
+
+class ProductTableModel(QAbstractTableModel):
+    """Qt model for displaying products in a table view"""
+    
+    # Rows of one change placed in the sort caches with binary search, bigger changes drop the caches
+    MAX_INSERTS = 64
+    # Removed slots remembered by a sort cache before it is rebuilt
+    MAX_REMOVED = 4096
+    
+    def __init__(self, product_manager: ProductManager, parent=None):
+        """
+        Initialize the table model
+        
+        Args:
+            product_manager (ProductManager): Manager containing products to display
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.product_manager = product_manager
+        self.headers = ["Supply Date", "Name", "Amount", "Special Attribute"]
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        # column -> [sort keys, ascending permutation, removed slots, descending permutation or None, keys by position or None]
+        # Keys and permutations hold slots (positions before the listed removals), so removals only delete entries
+        self._sort_cache = {}
+        product_manager.add_listener(self)
+    
+    def columnCount(self, parent=None) -> int:
+        """Get number of columns"""
+        return len(self.headers)
+    
+    def rowCount(self, parent=None) -> int:
+        """Get number of rows"""
+        return len(self.product_manager.products)
+    
+    def products_added(self, rows: range|list[int], products: list[Product]) -> None:
+        """Place added rows in the sort caches"""
+        for column, entry in list(self._sort_cache.items()):
+            if len(rows) > self.MAX_INSERTS or not self._insert_slots(column, entry, rows, products):
+                del self._sort_cache[column]
+    
+    def products_removed(self, rows: range|list[int], products: list[Product]) -> None:
+        """Drop removed rows from the sort caches"""
+        for column, entry in list(self._sort_cache.items()):
+            if len(rows) > self.MAX_INSERTS or len(entry[2]) + len(rows) > self.MAX_REMOVED:
+                del self._sort_cache[column]
+            else:
+                self._remove_slots(entry, rows)
+    
+    def products_cleared(self) -> None:
+        """Drop the sort caches"""
+        self._sort_cache = {}
+    
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole) -> str|None:
+        """
+        Get data of the selected row for display
+        
+        Args:
+            index (QModelIndex): Selected model index
+            role (Qt.ItemDataRole): Role of QStandartItem
+        
+        Returns:
+            str|None: Selected field as string or None
+        """
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.display_value(self.source_row(index.row()), index.column())
+    
+    @Metrics.timed("ProductTableModel.data")
+    def display_value(self, position: int, column: int) -> str|None:
+        """
+        Get a field of a product as displayed text
+        
+        Args:
+            position (int): Index in ProductManager.products
+            column (int): Selected column
+        
+        Returns:
+            str|None: Selected field as string or None
+        """
+        product = self.product_manager.products[position]
+        
+        if column == 0:
+            return str(product.supplyDate)
+        elif column == 1:
+            return product.name
+        elif column == 2:
+            return str(product.amount)
+        elif column == 3:
+            if isinstance(product, Belt):
+                return str(product.metal)
+            elif isinstance(product, Cake):
+                return str(product.height)
+            elif isinstance(product, Cup):
+                return str(product.volume)
+        return None
+    
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        """
+        Sort rows by column using typed keys
+        
+        Args:
+            column (int): Column to sort by (-1 restores insertion order)
+            order (Qt.SortOrder): Ascending or descending order
+        """
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.sort_order = order
+        self._row_order()
+        self.layoutChanged.emit()
+    
+    def source_row(self, row: int) -> int:
+        """
+        Map a table row to the product position in the manager
+        
+        Args:
+            row (int): Row in the table
+        
+        Returns:
+            int: Index in ProductManager.products
+        """
+        order = self._row_order()
+        if order is None:
+            return row
+        removed = self._sort_cache[self.sort_column][2]
+        slot = order[row]
+        return slot - bisect_left(removed, slot) if removed else slot
+    
+    def sort_positions(self, positions: list[int]) -> list[int]:
+        """
+        Put product positions in the order of the table
+        
+        Args:
+            positions (list[int]): Ascending indexes in ProductManager.products
+        
+        Returns:
+            list[int]: Positions ordered like their table rows
+        """
+        if self._row_order() is None:
+            return positions
+        entry = self._sort_cache[self.sort_column]
+        keys = entry[0]
+        if entry[2]:
+            if entry[4] is None:
+                # Built once per edit, cheaper than mapping every searched position to its slot
+                kept = bytearray(b"\x01") * len(keys)
+                for slot in entry[2]:
+                    kept[slot] = 0
+                entry[4] = list(compress(keys, kept))
+            keys = entry[4]
+        # Stable sort of ascending positions keeps ties in the order of the full permutation
+        result = sorted(positions, key=keys.__getitem__)
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            result.reverse()
+        return result
+    
+    def _row_order(self) -> list[int]|None:
+        """Get the slot permutation for the current sort, building it on first use"""
+        if self.sort_column < 0 or self.sort_column >= len(self.headers):
+            return None
+        
+        entry = self._sort_cache.get(self.sort_column)
+        if entry is None:
+            keys = self._sort_keys(self.sort_column, self.product_manager.products)
+            entry = [keys, sorted(range(len(keys)), key=keys.__getitem__), [], None, None]
+            self._sort_cache[self.sort_column] = entry
+        if self.sort_order == Qt.SortOrder.AscendingOrder:
+            return entry[1]
+        if entry[3] is None:
+            entry[3] = entry[1][::-1]
+        return entry[3]
+    
+    @staticmethod
+    def _slots(removed: list[int], positions: list[int]) -> list[int]:
+        """
+        Map product positions to slots of a sort cache
+        
+        Args:
+            removed (list[int]): Ascending removed slots of the cache
+            positions (list[int]): Ascending indexes in ProductManager.products
+        
+        Returns:
+            list[int]: Slot per position
+        """
+        if not removed:
+            return list(positions)
+        # A position moves past every removed slot whose gap (slot minus earlier removed slots) is at most the position
+        gaps = [slot - shift for shift, slot in enumerate(removed)]
+        return list(map(add, positions, map(bisect_right, repeat(gaps), positions)))
+    
+    def _remove_slots(self, entry: list, rows: range|list[int]) -> None:
+        """
+        Delete removed rows from the permutation of a sort cache
+        
+        Args:
+            entry (list): Cache entry of a column
+            rows (range|list[int]): Ascending positions of the removed products
+        """
+        keys, order, removed = entry[0], entry[1], entry[2]
+        slot_key = lambda slot: (keys[slot], slot)
+        slots = self._slots(removed, rows)
+        # The permutation is sorted by key, then slot, so every entry is found with binary search
+        for slot in slots:
+            del order[bisect_left(order, slot_key(slot), key=slot_key)]
+        removed += slots
+        removed.sort()
+        entry[3] = None
+        entry[4] = None
+    
+    def _insert_slots(self, column: int, entry: list, rows: range|list[int], products: list[Product]) -> bool:
+        """
+        Place added rows into the permutation of a sort cache
+        
+        Args:
+            column (int): Column of the cache
+            entry (list): Cache entry of the column
+            rows (range|list[int]): Ascending positions of the added products
+            products (list[Product]): Added products
+        
+        Returns:
+            bool: Were the rows placed, False when a row needs a slot between two kept ones
+        """
+        keys, order, removed = entry[0], entry[1], entry[2]
+        slot_key = lambda slot: (keys[slot], slot)
+        entry[3] = None
+        entry[4] = None
+        # Rows are ascending, so inserting them one by one keeps every row a current position
+        for row, key in zip(rows, self._sort_keys(column, products)):
+            following = self._slots(removed, [row])[0]
+            index = bisect_left(removed, following)
+            if index and removed[index - 1] == following - 1:
+                # Undoing a removal refills the freed slot
+                slot = removed.pop(index - 1)
+                keys[slot] = key
+            elif following == len(keys):
+                slot = len(keys)
+                keys.append(key)
+            else:
+                return False
+            insort(order, slot, key=slot_key)
+        return True
+    
+    @staticmethod
+    def _sort_keys(column: int, products: list[Product]) -> list:
+        """
+        Get typed sort keys of products for a column
+        
+        Args:
+            column (int): Selected column
+            products (list[Product]): Products to get keys of
+        
+        Returns:
+            list: datetime, str or int key per product
+        """
+        if column == 0:
+            return [product.supplyDate for product in products]
+        elif column == 1:
+            return [product.name for product in products]
+        elif column == 2:
+            return [product.amount for product in products]
+        return [int(ProductManager.special_value(product) or 0) for product in products]
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole) -> str|None:
+        """
+        Get header data
+        
+        Args:
+            section (int): Selected model section
+            orientation (Qt.Orientation): Table orientation (Vertical|Horizontal)
+        
+        Returns:
+            str|None: Selected header as string or None
+        """
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+class ProductFilterModel(QAbstractTableModel):
+    """Row mapping model showing products of ProductTableModel matched by name"""
+    
+    def __init__(self, source_model: ProductTableModel, name_index: NameIndex, parent=None):
+        """
+        Initialize the filter model
+        
+        Args:
+            source_model (ProductTableModel): Model with all products
+            name_index (NameIndex): Index used to search names
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.source_model = source_model
+        self.name_index = name_index
+        self.filter_text = ""
+        self._rows = None
+        self._rows_key = None
+        # Row count reported while a bulk removal is signalled to views
+        self._pending_count = None
+    
+    def columnCount(self, parent=None) -> int:
+        """Get number of columns"""
+        return self.source_model.columnCount()
+    
+    def rowCount(self, parent=None) -> int:
+        """Get number of rows"""
+        if self._pending_count is not None:
+            return self._pending_count
+        rows = self._filtered_rows()
+        return self.source_model.rowCount() if rows is None else len(rows)
+    
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole) -> str|None:
+        """
+        Get data of the selected row from the source model
+        
+        Args:
+            index (QModelIndex): Selected model index
+            role (Qt.ItemDataRole): Role of QStandartItem
+        
+        Returns:
+            str|None: Selected field as string or None
+        """
+        if not index.isValid() or self._pending_count is not None:
+            return None
+        rows = self._filtered_rows()
+        if rows is None:
+            return self.source_model.data(self.source_model.index(index.row(), index.column()), role)
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.source_model.display_value(rows[index.row()], index.column())
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole) -> str|None:
+        """Get header data from the source model"""
+        return self.source_model.headerData(section, orientation, role)
+    
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        """
+        Sort the source model and remap filtered rows
+        
+        Args:
+            column (int): Column to sort by
+            order (Qt.SortOrder): Ascending or descending order
+        """
+        self.layoutAboutToBeChanged.emit()
+        self.source_model.sort(column, order)
+        self.layoutChanged.emit()
+    
+    def set_filter_text(self, text: str) -> None:
+        """
+        Show only products whose name contains text
+        
+        Args:
+            text (str): Searched substring, empty string shows everything
+        """
+        self.beginResetModel()
+        self.filter_text = text.strip()
+        self._rows_key = None
+        self.endResetModel()
+    
+    def remove_rows(self, rows: list[int]) -> int:
+        """
+        Remove products shown in rows with one bulk manager operation
+        
+        Args:
+            rows (list[int]): Rows in this model
+        
+        Returns:
+            int: Number of removed products
+        """
+        rows = sorted({row for row in rows if 0 <= row < self.rowCount()})
+        if not rows:
+            return 0
+        positions = [self.source_row(row) for row in rows]
+        self._pending_count = self.rowCount()
+        removed = self.source_model.product_manager.remove_rows(positions)
+        # Remaining rows keep their relative order, so ranges can be reported bottom up
+        for first, last in reversed(ProductManager.row_ranges(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._pending_count -= last - first + 1
+            self.endRemoveRows()
+        self._pending_count = None
+        return removed
+    
+    def source_row(self, row: int) -> int:
+        """
+        Map a filtered row to the product position in the manager
+        
+        Args:
+            row (int): Row in this model
+        
+        Returns:
+            int: Index in ProductManager.products
+        """
+        rows = self._filtered_rows()
+        return self.source_model.source_row(row) if rows is None else rows[row]
+    
+    def _filtered_rows(self) -> list[int]|None:
+        """
+        Get manager positions matching the filter in table order, None when every product is shown
+        
+        Broad needles stay linear in the number of matches, 100k matches of
+        1M products take some 45 ms with a sort active. The first keystroke
+        after a change bigger than ProductTableModel.MAX_INSERTS also pays for
+        sorting all products again, like the table itself does.
+        """
+        if not self.filter_text:
+            return None
+        key = (self.source_model.product_manager.version, self.source_model.sort_column, self.source_model.sort_order)
+        if key != self._rows_key:
+            matches = self.name_index.search(self.filter_text)
+            self._rows = None if matches is None else self.source_model.sort_positions(matches)
+            self._rows_key = key
+        return self._rows
+
+class ProductFormManager:
+    """Manages dynamic form fields for different product types"""
+    
+    def __init__(self, special_layout: QHBoxLayout):
+        """
+        Initialize the special fields form manager
+        
+        Args:
+            special_layout (QHBoxLayout): Layout to add special fields to
+        """
+        self.special_layout = special_layout
+        self.special_fields = []
+    
+    def update_form_fields(self, product_type: str) -> None:
+        """
+        Update form fields based on product type
+        
+        Args:
+            product_type (str): Name of product type (Ex: Belt, Cake, Cup...)
+        """
+        self.clear_fields()
+        
+        if product_type == "Belt":
+            self.create_belt_fields()
+        elif product_type == "Cake":
+            self.create_cake_fields()
+        elif product_type == "Cup":
+            self.create_cup_fields()
+    
+    def clear_fields(self) -> None:
+        """Clear all special fields items and containers"""
+        for i in range(self.special_layout.count()):
+            for j in range(self.special_layout.itemAt(i).layout().count()):
+                self.special_layout.itemAt(i).layout().itemAt(j).widget().deleteLater()
+            self.special_layout.itemAt(i).layout().deleteLater()
+        self.special_fields = []
+    
+    def create_belt_fields(self) -> None:
+        """Create fields specific to Belt products"""
+        metal_layout = QVBoxLayout()
+        metal_layout.addWidget(QLabel("Metal?"))
+        metal_select = QComboBox()
+        metal_select.addItems(["True", "False"])
+        metal_layout.addWidget(metal_select)
+        self.special_layout.addLayout(metal_layout)
+        self.special_fields = [metal_select]
+    
+    def create_cake_fields(self) -> None:
+        """Create fields specific to Cake products"""
+        cake_layout = QVBoxLayout()
+        cake_layout.addWidget(QLabel("Height"))
+        cake_height = QSpinBox()
+        cake_height.setMinimum(5)
+        cake_height.setMaximum(1000)
+        cake_layout.addWidget(cake_height)
+        self.special_layout.addLayout(cake_layout)
+        self.special_fields = [cake_height]
+    
+    def create_cup_fields(self) -> None:
+        """Create fields specific to Cup products"""
+        cup_layout = QVBoxLayout()
+        cup_layout.addWidget(QLabel("Volume"))
+        cup_volume = QSpinBox()
+        cup_volume.setMinimum(30)
+        cup_volume.setMaximum(3000)
+        cup_layout.addWidget(cup_volume)
+        self.special_layout.addLayout(cup_layout)
+        self.special_fields = [cup_volume]
+    
+    def get_special_field_value(self) -> bool|int|None:
+        """
+        Get the value from the special field
+        
+        Returns:
+            bool|int|None: Special field value or None
+        """
+        if self.special_fields:
+            if isinstance(self.special_fields[0], QComboBox):
+                return bool(self.special_fields[0].currentText())
+            elif isinstance(self.special_fields[0], QSpinBox):
+                return self.special_fields[0].value()
+        return None
+
+class DiagnosticsDialog(QDialog):
+    """Shows timings recorded by Metrics"""
+    
+    def __init__(self, parent=None):
+        """
+        Initialize the dialog
+        
+        Args:
+            parent: Parent QWidget
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(700, 400)
+        layout = QVBoxLayout(self)
+        
+        self.enabled_check = QCheckBox("Record timings")
+        self.enabled_check.setChecked(Metrics.enabled)
+        self.enabled_check.toggled.connect(Metrics.enable)
+        layout.addWidget(self.enabled_check)
+        
+        self.report_text = QPlainTextEdit()
+        self.report_text.setReadOnly(True)
+        self.report_text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        layout.addWidget(self.report_text)
+        
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(self.refresh_button)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset)
+        button_layout.addWidget(self.reset_button)
+        layout.addLayout(button_layout)
+        
+        self.refresh()
+    
+    def refresh(self) -> None:
+        """Show current stats"""
+        self.report_text.setPlainText(Metrics.report())
+    
+    def reset(self) -> None:
+        """Forget recorded stats"""
+        Metrics.reset()
+        self.refresh()
+
+class ProductWindow(QMainWindow):
+    """Main application window for product management"""
+    
+    def __init__(self, session_cache: SessionCache|None = None, scenario_cache: ScenarioCache|None = None):
+        """
+        Initialize the main window
+        
+        Args:
+            session_cache (SessionCache|None): Snapshot of the last session, restored at launch and written after loads and on exit
+            scenario_cache (ScenarioCache|None): Cache of parsed scenarios, None parses every run
+        """
+        super().__init__()
+        self.setWindowTitle("Product supply")
+        self.setGeometry(100, 100, 800, 600)
+        
+        # Initialize components
+        self.product_manager = ProductManager()
+        self.file_handler = ProductFileHandler()
+        self.logger = Logger()
+        self.scenario_cache = scenario_cache
+        self.session_cache = session_cache
+        self.history = UndoHistory(self.product_manager)
+        # Stamp of the loaded file, the snapshot is keyed on it
+        self.session_source = None
+        
+        # Create UI
+        self.init_ui()
+        self.restore_session()
+    
+    def init_ui(self) -> None:
+        """Initialize the user interface"""
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+        
+        # Create search field
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search by name...")
+        self.search_edit.textChanged.connect(self.on_search_changed)
+        layout.addWidget(self.search_edit)
+        
+        # Create table view
+        self.table_view = QTableView()
+        self.table_model = ProductTableModel(self.product_manager)
+        self.name_index = NameIndex(self.product_manager)
+        self.filter_model = ProductFilterModel(self.table_model, self.name_index)
+        self.table_view.setModel(self.filter_model)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.table_view)
+        
+        # Create summary panel
+        self.aggregates = ProductAggregates(self.product_manager)
+        summary_layout = QHBoxLayout()
+        self.type_summary = QLabel()
+        self.month_summary = QLabel()
+        self.belt_summary = QLabel()
+        for label in (self.type_summary, self.month_summary, self.belt_summary):
+            label.setAlignment(Qt.AlignmentFlag.AlignTop)
+            summary_layout.addWidget(label)
+        layout.addLayout(summary_layout)
+        self._summary_version = None
+        self.refresh_summary()
+        self.summary_timer = QTimer(self)
+        self.summary_timer.timeout.connect(self.refresh_summary)
+        self.summary_timer.start(1000)
+        
+        # Create form
+        form_layout = QHBoxLayout()
+        
+        # Type selection
+        type_layout = QVBoxLayout()
+        type_layout.addWidget(QLabel("Product type:"))
+        self.type_select = QComboBox()
+        self.type_select.addItems(["Belt", "Cake", "Cup"])
+        type_layout.addWidget(self.type_select)
+        form_layout.addLayout(type_layout)
+        
+        # Date input
+        date_layout = QVBoxLayout()
+        date_layout.addWidget(QLabel("Supply Date:"))
+        self.date_edit = QDateEdit(QDate.currentDate())
+        date_layout.addWidget(self.date_edit)
+        form_layout.addLayout(date_layout)
+        
+        # Name input
+        name_layout = QVBoxLayout()
+        name_layout.addWidget(QLabel("Product Name:"))
+        self.name_edit = QLineEdit()
+        name_layout.addWidget(self.name_edit)
+        form_layout.addLayout(name_layout)
+        
+        # Amount input
+        amount_layout = QVBoxLayout()
+        amount_layout.addWidget(QLabel("Amount:"))
+        self.amount_edit = QSpinBox()
+        self.amount_edit.setMinimum(1)
+        self.amount_edit.setMaximum(99999)
+        amount_layout.addWidget(self.amount_edit)
+        form_layout.addLayout(amount_layout)
+        
+        # Special fields container
+        self.special_layout = QHBoxLayout()
+        form_layout.addLayout(self.special_layout)
+        
+        # Initialize form manager
+        self.form_manager = ProductFormManager(self.special_layout)
+        self.type_select.activated.connect(self.on_type_changed)
+        self.on_type_changed()  # Initialize with default fields
+        
+        # Add Product button
+        self.add_button = QPushButton("Add Product")
+        self.add_button.clicked.connect(self.add_product)
+        form_layout.addWidget(self.add_button)
+        
+        layout.addLayout(form_layout)
+        
+        # Create button layout
+        button_layout = QHBoxLayout()
+        
+        # Load data button
+        self.load_button = QPushButton("Load Data")
+        self.load_button.clicked.connect(self.load_products)
+        button_layout.addWidget(self.load_button)
+        
+        # Save data button
+        self.save_button = QPushButton("Save Data")
+        self.save_button.clicked.connect(self.save_products)
+        button_layout.addWidget(self.save_button)
+        
+        # Delete selected button
+        self.delete_button = QPushButton("Delete Selected")
+        self.delete_button.clicked.connect(self.delete_product)
+        button_layout.addWidget(self.delete_button)
+        
+        # Load scenario button
+        self.scenario_button = QPushButton("Load scenario")
+        self.scenario_button.clicked.connect(self.load_scenario)
+        button_layout.addWidget(self.scenario_button)
+        
+        # Dry run scenario button
+        self.explain_button = QPushButton("Dry run scenario")
+        self.explain_button.clicked.connect(self.explain_scenario)
+        button_layout.addWidget(self.explain_button)
+        
+        # Undo and redo buttons
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setShortcut(QKeySequence(QKeySequence.StandardKey.Undo))
+        self.undo_button.clicked.connect(self.undo)
+        button_layout.addWidget(self.undo_button)
+        
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setShortcut(QKeySequence(QKeySequence.StandardKey.Redo))
+        self.redo_button.clicked.connect(self.redo)
+        button_layout.addWidget(self.redo_button)
+        
+        # Diagnostics button
+        self.diagnostics_button = QPushButton("Diagnostics")
+        self.diagnostics_button.clicked.connect(self.show_diagnostics)
+        button_layout.addWidget(self.diagnostics_button)
+        
+        layout.addLayout(button_layout)
+        self.update_history_buttons()
+    
+    def refresh_summary(self) -> None:
+        """Show current totals, costs O(number of groups)"""
+        if self._summary_version == self.product_manager.version:
+            return
+        self._summary_version = self.product_manager.version
+        
+        lines = ["Amount by type:"]
+        lines += [f"{group}: {amount}" for group, amount in sorted(self.aggregates.amount_by_type().items())]
+        self.type_summary.setText("\n".join(lines))
+        
+        lines = ["Amount by month:"]
+        lines += [f"{group}: {amount}" for group, amount in self.aggregates.amount_by_month().items()]
+        self.month_summary.setText("\n".join(lines))
+        
+        metal = self.aggregates.amount_by_metal()
+        self.belt_summary.setText(f"Belts:\nMetal: {metal[True]}\nNon-metal: {metal[False]}")
+    
+    def on_search_changed(self, text: str) -> None:
+        """Handle search text change"""
+        self.filter_model.set_filter_text(text)
+    
+    def on_type_changed(self) -> None:
+        """Handle product type selection change"""
+        self.form_manager.update_form_fields(self.type_select.currentText())
+    
+    def add_product(self) -> None:
+        """Add a new product based on form data"""
+        name = self.name_edit.text().strip()
+        if not name:
+            QMessageBox.warning(self, "Warning", "Product name cannot be empty!")
+            self.logger.log_message("WARNING", "Tried to add empty named product")
+            return
+        
+        supply_date = datetime.combine(
+            self.date_edit.date().toPyDate(),
+            datetime.min.time()
+        )
+        amount = self.amount_edit.value()
+        special_value = self.form_manager.get_special_field_value()
+        
+        product_type = self.type_select.currentText()
+        if product_type == "Belt":
+            product = Belt(supply_date, name, amount, special_value)
+        elif product_type == "Cake":
+            product = Cake(supply_date, name, amount, special_value)
+        else:
+            product = Cup(supply_date, name, amount, special_value)
+        
+        self.product_manager.add_product(product)
+        self.filter_model.layoutChanged.emit()
+        self.refresh_summary()
+        self.update_history_buttons()
+    
+    def delete_product(self) -> None:
+        """Deletes selected products"""
+        rows = sorted({index.row() for index in self.table_view.selectionModel().selectedRows()})
+        if not rows:
+            selected = self.table_view.currentIndex()
+            if selected.isValid():
+                rows = [selected.row()]
+        if not rows:
+            QMessageBox.warning(self, "Warning", "Please select a product to delete!")
+            self.logger.log_message("WARNING", "Tried remove object from table without selecting any")
+            return
+        
+        if len(rows) == 1:
+            question = "Are you sure you want to delete this product?"
+        else:
+            question = f"Are you sure you want to delete {len(rows)} products?"
+        reply = QMessageBox.question(
+            self, "Confirm Delete", question,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.filter_model.remove_rows(rows)
+            self.refresh_summary()
+            self.update_history_buttons()
+    
+    def save_products(self) -> None:
+        """Save products to file"""
+        filename, _ = QFileDialog.getSaveFileName(
+            None, "Save File", ".", "Text Files (*.txt);;All Files (*)"
+        )
+        if filename:
+            self.file_handler.save_products(
+                self.product_manager.get_products(),
+                filename
+            )
+    
+    def load_products(self) -> None:
+        """Load products from a file"""
+        filename, _ = QFileDialog.getOpenFileName(
+            None, "Open File", ".", "Text Files (*.txt);;All Files (*)"
+        )
+        if filename:
+            try:
+                # Taken before parsing, so a file changed meanwhile never matches the snapshot
+                source = SessionCache.stamp(filename) if self.session_cache is not None else None
+                products = self.file_handler.load_products(filename)
+                self.product_manager.clear_products()
+                self.product_manager.add_products(products)
+                # Loading is not undoable, the file can be loaded again
+                self.history.clear()
+                self.update_history_buttons()
+                self.filter_model.layoutChanged.emit()
+                self.refresh_summary()
+                self.session_source = source
+                self.save_session()
+                QMessageBox.information(self, "Success", "Data loaded successfully!")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
+                self.logger.log_message("ERROR", f"Failed to load file: {str(e)}")
+
+    def load_scenario(self) -> None:
+        """Load scenario from a file and executes it"""
+        filename, _ = QFileDialog.getOpenFileName(
+            None, "Open File", ".", "Text Files (*.txt);;All Files (*)"
+        )
+        if filename:
+            # Includes model and summary updates, unlike the profile of process_command_file
+            with Profiler.profile("load_scenario"):
+                scenario = CommandProcessor(self.product_manager, self.file_handler, self.logger, cache=self.scenario_cache)
+                # The whole run is undone in one step
+                with self.history.action():
+                    scenario.process_command_file(filename)
+                self.filter_model.layoutChanged.emit()
+                self.refresh_summary()
+            self.update_history_buttons()
+            QMessageBox.information(self, "Info", "Comands executed")
+    
+    def explain_scenario(self) -> None:
+        """Report what a scenario would do without executing it"""
+        filename, _ = QFileDialog.getOpenFileName(
+            None, "Open File", ".", "Text Files (*.txt);;All Files (*)"
+        )
+        if filename:
+            scenario = CommandProcessor(self.product_manager, self.file_handler, self.logger, cache=self.scenario_cache)
+            try:
+                entries = scenario.explain_command_file(filename)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to read scenario: {str(e)}")
+                self.logger.log_message("ERROR", f"Failed to read scenario: {str(e)}")
+                return
+            removals = [entry for entry in entries if entry.line.startswith("REM") and entry.matches is not None]
+            lines = [f"{len(removals)} REM commands would remove {sum(entry.matches for entry in removals)} products", ""]
+            lines += [str(entry) for entry in entries[:30]]
+            if len(entries) > 30:
+                lines.append(f"... {len(entries) - 30} more commands")
+            QMessageBox.information(self, "Dry run", "\n".join(lines))
+    
+    def show_diagnostics(self) -> None:
+        """Show recorded timings"""
+        DiagnosticsDialog(self).exec()
+    
+    def undo(self) -> None:
+        """Revert the last add, delete or scenario run"""
+        if self.history.undo():
+            self.filter_model.layoutChanged.emit()
+            self.refresh_summary()
+        self.update_history_buttons()
+    
+    def redo(self) -> None:
+        """Apply the last undone change again"""
+        if self.history.redo():
+            self.filter_model.layoutChanged.emit()
+            self.refresh_summary()
+        self.update_history_buttons()
+    
+    def update_history_buttons(self) -> None:
+        """Enable undo and redo only when there is something to revert or apply"""
+        self.undo_button.setEnabled(self.history.can_undo())
+        self.redo_button.setEnabled(self.history.can_redo())
+    
+    def restore_session(self) -> bool:
+        """
+        Show products of the last session if its source file is unchanged
+        
+        Returns:
+            bool: Was a snapshot restored
+        """
+        if self.session_cache is None:
+            return False
+        restored = self.session_cache.restore()
+        if restored is None:
+            return False
+        self.session_source, products = restored
+        self.product_manager.clear_products()
+        self.product_manager.add_products(products)
+        self.history.clear()
+        self.update_history_buttons()
+        self.filter_model.layoutChanged.emit()
+        self.refresh_summary()
+        self.logger.log_message("INFO", f"Restored {len(products)} products of {self.session_source[0]} from session snapshot")
+        return True
+    
+    def save_session(self) -> None:
+        """Write a snapshot of current products if they come from a loaded file"""
+        if self.session_cache is None or self.session_source is None:
+            return
+        if not self.session_cache.save(self.session_source, self.product_manager.get_products()):
+            self.logger.log_message("WARNING", f"Failed to write session snapshot {self.session_cache.path}")
+    
+    def closeEvent(self, event) -> None:
+        """Write the session snapshot before closing"""
+        self.save_session()
+        super().closeEvent(event)
@@ -1,8 +1,23 @@
 import unittest
 import sys
 import os
+import io
+import asyncio
+import queue
+import gzip
+import json
+import locale
+import gc
+import math
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
 import datetime
-from unittest.mock import patch, MagicMock
+import subprocess
+import tempfile
+import shutil
+from unittest.mock import patch, MagicMock, AsyncMock
 from PyQt6.QtWidgets import QApplication, QMessageBox, QFileDialog
 from PyQt6.QtCore import Qt
 
@@ -10,12 +25,29 @@ from Belt import Belt
 from Cake import Cake
 from Cup import Cup
 
+from NameIndex import NameIndex
+from ProductAggregates import ProductAggregates
+from ProductJournal import ProductJournal
+from UndoHistory import UndoHistory
+from ScenarioCache import ScenarioCache
+from SessionCache import SessionCache
+from SnapshotFile import SnapshotFile
+from CommandServer import CommandServer
+from Metrics import Metrics
+from Profiler import Profiler
+from MetricsServer import MetricsServer
+import cli
+import benchmarks
+from DataGenerator import DataGenerator
+from CommandParser import CommandParser, AddCommand, RemoveCommand, SaveCommand, QueryCommand, UnknownCommand, InvalidCommand
 from main import (
     ProductManager,
     ProductTableModel,
+    ProductFilterModel,
     ProductFormManager,
     ProductFileHandler,
     ProductWindow,
+    DiagnosticsDialog,
     CommandProcessor,
     Logger
 )
@@ -52,6 +84,11 @@ class TestProductManager(unittest.TestCase):
         self.assertEqual(len(self.manager.products), 1)
         self.assertIsInstance(self.manager.products[0], Cake)
 
+    def test_remove_rows_stepped_range(self):
+        self.manager.add_products([self.sample_belt, self.sample_cake, self.sample_cup])
+        self.assertEqual(self.manager.remove_rows(range(0, 3, 2)), 2)
+        self.assertEqual(self.manager.products, [self.sample_cake])
+
     def test_clear_products(self):
         self.manager.add_product(self.sample_belt)
         self.manager.add_product(self.sample_cup)
@@ -64,6 +101,202 @@ class TestProductManager(unittest.TestCase):
         self.assertEqual(len(products), 1)
         self.assertEqual(products[0].name, "Belt")
 
+    def test_remove_by_range(self):
+        self.manager.add_product(self.sample_belt)
+        self.manager.add_product(self.sample_cake)
+        self.manager.add_product(self.sample_cup)
+        self.assertEqual(self.manager.remove_by_range("amount", 6, 20), 2)
+        self.assertIsInstance(self.manager.products[0], Cake)
+        self.assertEqual(self.manager.remove_by_range("special", 0, 1000), 1)
+        self.assertEqual(len(self.manager.products), 0)
+
+    def test_remove_equal_and_inequality(self):
+        self.manager.add_product(self.sample_belt)
+        self.manager.add_product(self.sample_cake)
+        self.manager.add_product(self.sample_cup)
+        self.manager.remove_equal("special", "True", True)
+        self.assertEqual([product.name for product in self.manager.products], ["Cake", "Cup"])
+        self.manager.remove_by_inequality("special", 100, True)
+        self.assertEqual([product.name for product in self.manager.products], ["Cake"])
+        self.manager.remove_equal("name", "Cake", False)
+        self.assertEqual(len(self.manager.products), 1)
+
+    def test_listener_receives_changes(self):
+        listener = MagicMock()
+        self.manager.add_listener(listener)
+        self.manager.add_product(self.sample_belt)
+        self.manager.add_product(self.sample_cake)
+        listener.products_added.assert_called_with(range(1, 2), [self.sample_cake])
+        self.manager.remove_by_range("amount", 0, 5)
+        listener.products_removed.assert_called_with([1], [self.sample_cake])
+        self.manager.clear_products()
+        listener.products_cleared.assert_called_once()
+
+    def test_remove_rows(self):
+        for product in (self.sample_belt, self.sample_cake, self.sample_cup, self.sample_belt):
+            self.manager.add_product(product)
+        self.assertEqual(self.manager.remove_rows([3, 1, 2, 7]), 3)
+        self.assertEqual(self.manager.products, [self.sample_belt])
+
+    def test_row_ranges(self):
+        self.assertEqual(ProductManager.row_ranges([1, 2, 3, 5, 7, 8]), [(1, 3), (5, 5), (7, 8)])
+        self.assertEqual(ProductManager.row_ranges([]), [])
+
+    def test_add_products(self):
+        listener = MagicMock()
+        self.manager.add_product(self.sample_belt)
+        self.manager.add_listener(listener)
+        self.manager.add_products([self.sample_cake, self.sample_cup])
+        listener.products_added.assert_called_once_with(range(1, 3), [self.sample_cake, self.sample_cup])
+        self.assertEqual(len(self.manager.products), 3)
+
+    def test_insert_rows(self):
+        self.manager.add_product(self.sample_cake)
+        self.manager.insert_rows([0, 2], [self.sample_belt, self.sample_cup])
+        self.assertEqual(self.manager.products, [self.sample_belt, self.sample_cake, self.sample_cup])
+
+class TestProductJournal(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        self.products = [Cup(datetime.datetime(2023, 1, 1), f"Cup {amount}", amount, 250) for amount in range(6)]
+        for product in self.products:
+            self.manager.add_product(product)
+
+    def test_rollback_restores_order(self):
+        journal = ProductJournal(self.manager)
+        self.manager.remove_by_range("amount", 1, 2)
+        self.manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Cake", 1, 10))
+        self.manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Cake", 2, 10))
+        self.manager.remove_equal("amount", "4", True)
+        self.assertEqual(len(journal.entries), 3)
+        journal.rollback()
+        self.assertEqual(self.manager.products, self.products)
+        self.assertNotIn(journal, self.manager.listeners)
+
+    def test_close_keeps_changes(self):
+        journal = ProductJournal(self.manager)
+        self.manager.delete_product(0)
+        journal.close()
+        self.assertEqual(len(self.manager.products), 5)
+        self.assertEqual(journal.entries, [])
+
+class TestUndoHistory(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        self.products = [Cup(datetime.datetime(2023, 1, 1), f"Cup {amount}", amount, 250) for amount in range(6)]
+        self.manager.add_products(self.products)
+        self.history = UndoHistory(self.manager)
+
+    def test_undo_redo_single_changes(self):
+        cake = Cake(datetime.datetime(2023, 1, 1), "Cake", 1, 10)
+        self.manager.add_product(cake)
+        self.manager.remove_rows([1, 3])
+        self.assertEqual(self.history.undo(), 2)
+        self.assertEqual(self.manager.products, self.products + [cake])
+        self.assertEqual(self.history.undo(), 1)
+        self.assertEqual(self.manager.products, self.products)
+        self.assertFalse(self.history.can_undo())
+        self.history.redo()
+        self.history.redo()
+        self.assertEqual(self.manager.products, [self.products[0], self.products[2], self.products[4], self.products[5], cake])
+        self.assertFalse(self.history.can_redo())
+
+    def test_action_is_one_step(self):
+        with self.history.action():
+            self.manager.remove_by_range("amount", 1, 2)
+            self.manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Cake", 1, 10))
+            self.manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Cake", 2, 10))
+        self.assertEqual(len(self.history.undo_steps), 1)
+        self.assertEqual(len(self.history.undo_steps[0][0].entries), 2)
+        self.history.undo()
+        self.assertEqual(self.manager.products, self.products)
+
+    def test_new_change_drops_redo(self):
+        self.manager.delete_product(0)
+        self.history.undo()
+        self.manager.delete_product(5)
+        self.assertFalse(self.history.can_redo())
+        self.assertEqual(self.history.bytes, UndoHistory.REFERENCE_BYTES * 2 + UndoHistory.PRODUCT_BYTES)
+
+    def test_memory_cap_drops_oldest(self):
+        self.history.max_bytes = (UndoHistory.REFERENCE_BYTES * 2 + UndoHistory.PRODUCT_BYTES) * 2
+        for _ in range(3):
+            self.manager.delete_product(0)
+        self.assertEqual((len(self.history.undo_steps), self.history.dropped), (2, 1))
+        self.history.undo()
+        self.history.undo()
+        self.assertEqual(self.history.undo(), 0)
+        self.assertEqual(self.manager.products, self.products[1:])
+
+    def test_clear_forgets_history(self):
+        self.manager.delete_product(0)
+        self.manager.clear_products()
+        self.assertFalse(self.history.can_undo())
+        self.assertEqual(self.history.bytes, 0)
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        for name in ["Alpha Supply", "Beta", "alphabet", "Gamma"]:
+            self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), name, 1, 250))
+        self.index = NameIndex(self.manager)
+
+    def test_search_substring(self):
+        self.assertEqual(self.index.search("ALPHA"), [0, 2])
+        self.assertEqual(self.index.search("bet"), [1, 2])
+        self.assertEqual(self.index.search("zz"), [])
+
+    def test_search_short_text(self):
+        self.assertIsNone(self.index.search("a"))
+        self.assertEqual(self.index.search("l"), [0, 2])
+
+    def test_index_follows_manager(self):
+        self.manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Alpaca", 1, 10))
+        self.assertEqual(self.index.search("alp"), [0, 2, 4])
+        self.manager.delete_product(0)
+        self.assertEqual(self.index.search("alp"), [1, 3])
+        self.assertNotIn("Alpha Supply", self.index.name_counts)
+        self.manager.clear_products()
+        self.assertEqual(self.index.search("alp"), [])
+
+    def test_positions_follow_edits_lazily(self):
+        history = UndoHistory(self.manager)
+        self.assertEqual(self.index.search("bet"), [1, 2])
+        self.manager.delete_product(0)
+        self.manager.remove_rows(range(1, 2))
+        self.assertEqual(self.index.search("bet"), [0])
+        self.assertEqual(self.index.search("gam"), [1])
+        history.undo()
+        history.undo()
+        self.assertEqual(self.index.search("bet"), [1, 2])
+        self.assertEqual(self.index.search("alp"), [0, 2])
+        self.assertEqual(len(self.index._changes), 4)
+        self.index.MAX_CHANGES = 1
+        self.manager.delete_product(0)
+        self.assertEqual(self.index._changes, [])
+        self.assertEqual(self.index.search("alp"), [1])
+
+class TestProductAggregates(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        self.manager.add_product(Belt(datetime.datetime(2023, 1, 5), "Belt", 10, True))
+        self.aggregates = ProductAggregates(self.manager)
+        self.manager.add_product(Belt(datetime.datetime(2023, 2, 1), "Belt", 4, False))
+        self.manager.add_product(Cup(datetime.datetime(2023, 1, 20), "Cup", 20, 250))
+
+    def test_totals(self):
+        self.assertEqual(self.aggregates.amount_by_type(), {"Belt": 14, "Cup": 20})
+        self.assertEqual(self.aggregates.amount_by_month(), {"2023-01": 30, "2023-02": 4})
+        self.assertEqual(self.aggregates.amount_by_metal(), {True: 10, False: 4})
+
+    def test_totals_after_removal(self):
+        self.manager.remove_by_range("amount", 10, 20)
+        self.assertEqual(self.aggregates.amount_by_type(), {"Belt": 4})
+        self.assertEqual(self.aggregates.amount_by_month(), {"2023-02": 4})
+        self.assertEqual(self.aggregates.amount_by_metal(), {True: 0, False: 4})
+        self.manager.clear_products()
+        self.assertEqual(self.aggregates.amount_by_type(), {})
+
 class TestProductTableModel(unittest.TestCase):
     def setUp(self):
         self.manager = ProductManager()
@@ -97,6 +330,111 @@ class TestProductTableModel(unittest.TestCase):
         self.assertEqual(self.model.headerData(2, Qt.Orientation.Horizontal), "Amount")
         self.assertEqual(self.model.headerData(3, Qt.Orientation.Horizontal), "Special Attribute")
 
+    def test_sort_by_amount(self):
+        self.manager.add_product(self.sample_belt)
+        self.manager.add_product(self.sample_cake)
+        self.manager.add_product(self.sample_cup)
+        self.model.sort(2, Qt.SortOrder.AscendingOrder)
+        self.assertEqual([self.model.data(self.model.index(row, 2)) for row in range(3)], ["5", "10", "20"])
+        self.model.sort(2, Qt.SortOrder.DescendingOrder)
+        self.assertEqual([self.model.data(self.model.index(row, 2)) for row in range(3)], ["20", "10", "5"])
+
+    def test_sort_special_and_date_are_typed(self):
+        self.manager.add_product(Cup(datetime.datetime(2024, 1, 10), "B", 1, 1000))
+        self.manager.add_product(Cake(datetime.datetime(2023, 12, 2), "A", 1, 200))
+        self.model.sort(3)
+        self.assertEqual(self.model.data(self.model.index(0, 3)), "200")
+        self.model.sort(0)
+        self.assertEqual(self.model.data(self.model.index(0, 1)), "A")
+
+    def test_sort_cache_and_invalidation(self):
+        self.manager.add_product(self.sample_cup)
+        self.manager.add_product(self.sample_cake)
+        self.model.sort(1)
+        order = self.model._row_order()
+        self.model.sort(2)
+        self.model.sort(1)
+        self.assertIs(self.model._row_order(), order)
+        self.manager.add_product(self.sample_belt)
+        self.assertEqual(self.model.data(self.model.index(0, 1)), "Belt")
+        self.assertEqual(self.model.source_row(0), 2)
+
+    def test_sort_follows_edits(self):
+        history = UndoHistory(self.manager)
+        for amount in [5, 3, 9, 3, 7]:
+            self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Cup", amount, 250))
+        self.model.sort(2)
+        entry = self.model._sort_cache[2]
+        expected = lambda: sorted(range(len(self.manager.products)), key=lambda row: self.manager.products[row].amount)
+        shown = lambda: [self.model.source_row(row) for row in range(self.model.rowCount())]
+        self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Cup", 3, 250))
+        self.assertEqual(shown(), expected())
+        self.manager.remove_rows([0, 2])
+        self.assertEqual(shown(), expected())
+        self.assertEqual(entry[2], [0, 2])
+        history.undo()
+        self.assertEqual(shown(), expected())
+        self.assertEqual(entry[2], [])
+        self.model.sort(2, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(shown(), expected()[::-1])
+        self.assertIs(self.model._sort_cache[2], entry)
+        self.assertEqual(self.model.sort_positions([0, 1, 2]), [2, 0, 1])
+        self.manager.insert_rows([1], [Cup(datetime.datetime(2023, 1, 1), "Cup", 1, 250)])
+        self.assertNotIn(2, self.model._sort_cache)
+        self.assertEqual(shown(), expected()[::-1])
+
+    def test_sort_reset(self):
+        self.manager.add_product(self.sample_cup)
+        self.manager.add_product(self.sample_cake)
+        self.model.sort(2)
+        self.model.sort(-1)
+        self.assertEqual(self.model.source_row(0), 0)
+
+class TestProductFilterModel(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        self.source = ProductTableModel(self.manager)
+        self.model = ProductFilterModel(self.source, NameIndex(self.manager))
+        for name, amount in [("Red cup", 30), ("Blue cup", 10), ("Red cake", 20)]:
+            self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), name, amount, 250))
+
+    def test_unfiltered(self):
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual(self.model.data(self.model.index(1, 1)), "Blue cup")
+
+    def test_filter_and_sort(self):
+        self.model.set_filter_text("red")
+        self.assertEqual(self.model.rowCount(), 2)
+        self.model.sort(2, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.model.data(self.model.index(0, 1)), "Red cake")
+        self.assertEqual(self.model.source_row(0), 2)
+
+    def test_filter_follows_changes(self):
+        self.model.set_filter_text("cup")
+        self.manager.remove_equal("name", "Red cup", True)
+        self.assertEqual(self.model.rowCount(), 1)
+        self.assertEqual(self.model.data(self.model.index(0, 1)), "Blue cup")
+
+    def test_remove_rows_reports_ranges(self):
+        self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Red mug", 5, 250))
+        removed_ranges = []
+        self.model.rowsRemoved.connect(lambda parent, first, last: removed_ranges.append((first, last)))
+        self.model.sort(2, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.model.remove_rows([0, 1, 3]), 3)
+        self.assertEqual(removed_ranges, [(3, 3), (0, 1)])
+        self.assertEqual([product.name for product in self.manager.products], ["Red cake"])
+        self.assertEqual(self.model.rowCount(), 1)
+
+    def test_sorted_filter_after_deletes(self):
+        for name, amount in [("Red mug", 5), ("Green cup", 25), ("Red pot", 15)]:
+            self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), name, amount, 250))
+        self.model.sort(2, Qt.SortOrder.DescendingOrder)
+        self.model.set_filter_text("red")
+        self.manager.delete_product(1)
+        self.manager.delete_product(2)
+        names = [self.model.data(self.model.index(row, 1)) for row in range(self.model.rowCount())]
+        self.assertEqual(names, ["Red cup", "Red cake", "Red pot"])
+
 class TestProductFormManager(unittest.TestCase):
     def setUp(self):
         self.mock_layout = MagicMock()
@@ -155,6 +493,889 @@ class TestProductFileHandler(unittest.TestCase):
         self.assertEqual(loaded_products[2].name, "Cup")
         self.assertEqual(loaded_products[2].volume, 250)
 
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, "logs")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, filename):
+        with open(os.path.join(self.directory, filename)) as file:
+            return file.read().splitlines()
+
+    def test_log_message(self):
+        logger = Logger(self.directory)
+        for i in range(3):
+            logger.log_message("ERROR", f"Message {i}", filename="test.log")
+        logger.log_message("INFO", "Other", filename="other.log")
+        logger.flush()
+        lines = self.read("test.log")
+        self.assertEqual([line.split(" ", 2)[2] for line in lines], ["ERROR Message 0", "ERROR Message 1", "ERROR Message 2"])
+        self.assertEqual(len(self.read("other.log")), 1)
+        logger.close()
+        self.assertEqual(logger.files, {})
+        self.assertFalse(logger.writer.is_alive())
+
+    def test_rotate_by_day(self):
+        logger = Logger(self.directory)
+        logger.queue.put((datetime.datetime(2025, 4, 16, 23, 59), "ERROR", "Old day", None, 0))
+        logger.queue.put((datetime.datetime(2025, 4, 17, 0, 1), "ERROR", "New day", None, 0))
+        logger.flush()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["16-04-2025.1.log.gz", "17-04-2025.log"])
+        with gzip.open(os.path.join(self.directory, "16-04-2025.1.log.gz"), "rt") as file:
+            self.assertEqual(file.read(), "16-04-2025 23:59:00 ERROR Old day\n")
+        logger.close()
+
+    def test_rotate_by_size(self):
+        logger = Logger(self.directory, max_bytes=100, max_archives=2)
+        for i in range(8):
+            logger.log_message("ERROR", f"Message {i} " + "x" * 40, filename="test.log")
+        logger.flush()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["test.3.log.gz", "test.4.log.gz"])
+        logger.close()
+
+    def test_archive_earlier_days_at_start(self):
+        os.makedirs(self.directory)
+        today = f"{datetime.datetime.now().strftime('%d-%m-%Y')}.log"
+        files = {"14-04-2025.1.log.gz": datetime.datetime(2025, 4, 14, 12), "15-04-2025.1.log.gz": datetime.datetime(2025, 4, 15, 12),
+                 "16-04-2025.1.log": datetime.datetime(2025, 4, 16, 10), "16-04-2025.log": datetime.datetime(2025, 4, 16, 23),
+                 today: datetime.datetime.now()}
+        for filename, modified in files.items():
+            with open(os.path.join(self.directory, filename), "w") as file:
+                file.write(filename)
+            os.utime(os.path.join(self.directory, filename), (modified.timestamp(), modified.timestamp()))
+        logger = Logger(self.directory, max_archives=3)
+        logger.flush()
+        # Only rotated leftovers are picked up by default
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(files.keys() - {"16-04-2025.1.log"} | {"16-04-2025.1.log.gz"}))
+        logger.close()
+        logger = Logger(self.directory, max_archives=3, archive_earlier_days=True)
+        logger.flush()
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(["15-04-2025.1.log.gz", "16-04-2025.1.log.gz", "16-04-2025.2.log.gz", today]))
+        with gzip.open(os.path.join(self.directory, "16-04-2025.2.log.gz"), "rt") as file:
+            self.assertEqual(file.read(), "16-04-2025.log")
+        self.assertEqual(self.read(today), [today])
+        logger.close()
+
+    def test_collapse_repeated_messages(self):
+        logger = Logger(self.directory)
+        for _ in range(5):
+            logger.log_message("ERROR", "Unsupported REM condition: color = red", filename="test.log")
+        logger.log_message("ERROR", "Other", filename="test.log")
+        logger.flush()
+        lines = [line.split(" ", 2)[2] for line in self.read("test.log")]
+        self.assertEqual(lines, ["ERROR Unsupported REM condition: color = red", "ERROR Other",
+                                 "ERROR Unsupported REM condition: color = red (repeated 4 times)"])
+        logger.close()
+
+    def test_rate_limit(self):
+        logger = Logger(self.directory, dedup_window=0, rate_limit=2)
+        for i in range(5):
+            logger.log_message("WARNING", f"Message {i}", filename="test.log")
+        logger.close()
+        lines = [line.split(" ", 2)[2] for line in self.read("test.log")]
+        self.assertEqual(lines[:2], ["WARNING Message 0", "WARNING Message 1"])
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2], "WARNING 3 WARNING messages suppressed by rate limit")
+
+    def test_repeats_reported_once_when_rate_limited(self):
+        logger = Logger(self.directory, dedup_window=60)
+        for _ in range(3):
+            logger.log_message("ERROR", "A", filename="test.log")
+        # The window ends and the next copy is rate limited
+        logger.seen[("ERROR", "A", "test.log")][0] -= 60
+        with patch.object(logger, "_allow", return_value=False):
+            logger.log_message("ERROR", "A", filename="test.log")
+        logger.close()
+        lines = [line.split(" ", 2)[2] for line in self.read("test.log")]
+        self.assertEqual(lines, ["ERROR A", "ERROR A (repeated 2 times)"])
+
+    def test_json_lines(self):
+        logger = Logger(self.directory, json_lines=True)
+        logger.log_message("ERROR", "Failed", filename="test.log")
+        logger.log_message("ERROR", "Failed", filename="test.log")
+        logger.close()
+        records = [json.loads(line) for line in self.read("test.log")]
+        self.assertEqual([(record["level"], record["message"], record.get("repeated")) for record in records],
+                         [("ERROR", "Failed", None), ("ERROR", "Failed", 1)])
+
+    def test_full_queue_drops_messages(self):
+        logger = Logger(self.directory, queue_size=1)
+        with patch.object(logger.queue, "put_nowait", side_effect=queue.Full):
+            logger.log_message("ERROR", "Lost", filename="test.log")
+        logger.log_message("ERROR", "Kept", filename="test.log")
+        logger.close()
+        lines = self.read("test.log")
+        self.assertTrue(lines[0].endswith("ERROR Kept"))
+        self.assertTrue(lines[1].endswith("WARNING 1 log messages dropped, queue was full"))
+
+class TestCommandParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = CommandParser()
+
+    def test_parse_commands(self):
+        commands = list(self.parser.parse(["ADD Cake; 01.01.2028; Test cake; 10; 20", "", "# note",
+                                           "REM special = 15", "SAVE out.txt", "LIST"]))
+        self.assertEqual([type(command) for command in commands], [AddCommand, RemoveCommand, SaveCommand, UnknownCommand])
+        self.assertEqual([command.line_num for command in commands], [1, 4, 5, 6])
+        self.assertEqual(str(commands[0].product), "Cake(01.01.2028, \"Test cake\", 10, 20)")
+        self.assertEqual(commands[2].filename, "out.txt")
+
+    def test_parse_add_fields(self):
+        belt = self.parser.parse_line(1, "ADD Belt;1.2.2028;  Spaced name ; 3;False").product
+        self.assertEqual((belt.supplyDate, belt.name, belt.amount, belt.metal), (datetime.datetime(2028, 2, 1), "Spaced name", 3, False))
+        self.assertEqual(self.parser.parse_line(2, "ADD Cup; 01.01.2028; Cup; 5; 250; extra").product.volume, 250)
+
+    def test_parse_invalid_commands(self):
+        self.assertEqual(self.parser.parse_line(1, "ADD Cake; 01.01.2028; Test").error, "Invalid ADD command format")
+        self.assertEqual(self.parser.parse_line(2, "ADD Boot; 01.01.2028; Test; 1; 2").error, "Unknown product type: Boot")
+        self.assertIsInstance(self.parser.parse_line(3, "ADD Cake; 31.02.2028; Test; 1; 2"), InvalidCommand)
+        self.assertEqual(self.parser.parse_line(4, "REM color = red").error, "Unsupported REM condition: color = red")
+        self.assertIsInstance(self.parser.parse_line(5, "REM 300 <= amount <= 100"), InvalidCommand)
+
+    def test_parse_conditions(self):
+        condition = self.parser.parse_condition("100 < amount < 300")
+        self.assertEqual((condition.field, condition.range_min, condition.range_max), ("amount", 101, 299))
+        condition = self.parser.parse_condition("supplyDate < 2025-01-01")
+        self.assertFalse(condition.is_greater)
+        self.assertLess(condition.value, datetime.datetime(2025, 1, 1))
+        condition = self.parser.parse_condition("name != Test name")
+        self.assertEqual((condition.value, condition.is_equal), ("Test name", False))
+
+    def test_parse_compound_conditions(self):
+        products = [Cup(datetime.datetime(2024, 1, 1), "Old cup", 5, 250), Cup(datetime.datetime(2026, 1, 1), "New cup", 5, 250),
+                    Cake(datetime.datetime(2024, 1, 1), "Old cake", 5, 10), Belt(datetime.datetime(2024, 1, 1), "Belt", 50, True)]
+        cases = {
+            "type = Cup AND amount < 10 AND supplyDate < 2025-01-01": [True, False, False, False],
+            "type = Belt OR (type = Cake AND NOT special > 20)": [False, False, True, True],
+            "NOT (type = Cup OR amount >= 50)": [False, False, True, False],
+            "name = Old cup OR name = New cup": [True, True, False, False],
+        }
+        for text, expected in cases.items():
+            predicate = self.parser.parse_condition(text).predicate()
+            self.assertEqual([predicate(product) for product in products], expected, text)
+
+    def test_keywords_in_simple_condition_values(self):
+        for text, value in (("name = Tom AND Jerry", "Tom AND Jerry"), ("name = Salt OR Pepper", "Salt OR Pepper"), ("(name = Foo (bar))", "Foo (bar)")):
+            condition = self.parser.parse_condition(text)
+            self.assertEqual((condition.field, condition.value), ("name", value), text)
+        condition = self.parser.parse_condition("name = Foo (bar) AND amount > 1")
+        self.assertEqual((condition.operator, condition.conditions[0].value), ("AND", "Foo (bar)"))
+
+    def test_parse_queries(self):
+        count, total, select, select_all = self.parser.parse(["COUNT", "SUM special WHERE type = Cup", "SELECT amount > 5 AND type = Cake INTO out.txt", "SELECT * INTO all.txt"])
+        self.assertEqual([type(command) for command in (count, total, select, select_all)], [QueryCommand] * 4)
+        self.assertIsNone(count.condition)
+        self.assertEqual((total.kind, total.field, total.condition.type_name), ("SUM", "special", "Cup"))
+        self.assertEqual((select.filename, select.condition.operator), ("out.txt", "AND"))
+        self.assertEqual((select_all.filename, select_all.condition), ("all.txt", None))
+        self.assertEqual(self.parser.parse_line(5, "SUM name").error, "Invalid SUM command format: name")
+        self.assertEqual(self.parser.parse_line(6, "SELECT amount > 5").error, "Invalid SELECT command format: amount > 5")
+
+    def test_parse_invalid_compound_conditions(self):
+        self.assertEqual(self.parser.parse_line(1, "REM (type = Cup").error, "Missing ')' in REM condition")
+        self.assertEqual(self.parser.parse_line(2, "REM type = Cup AND").error, "Incomplete REM condition")
+        self.assertEqual(self.parser.parse_line(3, "REM type = Boot OR amount > 1").error, "Unsupported REM condition: type = Boot")
+        self.assertEqual(self.parser.parse_line(4, "REM amount > 1 AND type = Cup )").error, "Unexpected ')' in REM condition: amount > 1 AND type = Cup )")
+        # Typos in compound conditions must not fall back to an inequality on the whole text
+        for text in ("name != Foo AND amount >> 5", "name != Foo AND amount => 5", "name != Foo AND amont > 5", "name != Foo AND (amount > 5"):
+            self.assertTrue(self.parser.parse_line(5, f"REM {text}").error, text)
+
+class TestScenarioCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ScenarioCache(os.path.join(self.directory.name, "cache"))
+        self.parser = CommandParser()
+        self.filename = os.path.join(self.directory.name, "commands.txt")
+        with open(self.filename, "w") as file:
+            file.write("ADD Cake; 01.01.2028; Test cake; 10; 20\nREM amount > 5\nLIST\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_second_load_skips_parsing(self):
+        first = self.cache.load(self.filename, self.parser)
+        with patch.object(CommandParser, 'parse', side_effect=AssertionError("parsed again")):
+            second = self.cache.load(self.filename, self.parser)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+        self.assertEqual([type(command) for command in second], [type(command) for command in first])
+        self.assertEqual(str(second[0].product), str(first[0].product))
+
+    def test_decodes_like_uncached_path(self):
+        with open(self.filename, "wb") as file:
+            file.write("ADD Cake; 01.01.2028; Café; 10; 20\r\nREM name = Café\r\n".encode(locale.getpreferredencoding(False), errors="replace"))
+        with open(self.filename, "r") as file:
+            expected = list(self.parser.parse(file))
+        commands = self.cache.load(self.filename, self.parser)
+        self.assertEqual((commands[0].product.name, commands[1].condition.value), (expected[0].product.name, expected[1].condition.value))
+
+    def test_changed_file_is_parsed_again(self):
+        self.cache.load(self.filename, self.parser)
+        with open(self.filename, "a") as file:
+            file.write("SAVE out.txt\n")
+        self.assertIsInstance(self.cache.load(self.filename, self.parser)[-1], SaveCommand)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_corrupted_entry_is_rebuilt(self):
+        self.cache.load(self.filename, self.parser)
+        entry = os.path.join(self.cache.directory, os.listdir(self.cache.directory)[0])
+        with open(entry, "r+b") as file:
+            file.seek(-10, os.SEEK_END)
+            file.write(b"corrupted!")
+        self.assertEqual(len(self.cache.load(self.filename, self.parser)), 3)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(len(self.cache.load(self.filename, self.parser)), 3)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ScenarioCache(self.cache.directory, max_entries=2)
+        filenames = []
+        for i in range(3):
+            filenames.append(os.path.join(self.directory.name, f"commands{i}.txt"))
+            with open(filenames[-1], "w") as file:
+                file.write(f"REM amount > {i}\n")
+
+        def age_entries():
+            for name in os.listdir(cache.directory):
+                path = os.path.join(cache.directory, name)
+                os.utime(path, (os.path.getmtime(path) - 10, os.path.getmtime(path) - 10))
+
+        cache.load(filenames[0], self.parser)
+        age_entries()
+        cache.load(filenames[1], self.parser)
+        age_entries()
+        cache.load(filenames[0], self.parser)
+        cache.load(filenames[2], self.parser)
+        self.assertEqual(len(os.listdir(cache.directory)), 2)
+        self.assertEqual((cache.misses, cache.hits), (3, 1))
+        cache.load(filenames[0], self.parser)
+        cache.load(filenames[1], self.parser)
+        self.assertEqual((cache.misses, cache.hits), (4, 2))
+
+    def test_stale_parser_version_is_rebuilt(self):
+        self.cache.load(self.filename, self.parser)
+        with patch('ScenarioCache.PARSER_VERSION', 999):
+            self.cache.load(self.filename, self.parser)
+        self.assertEqual(self.cache.misses, 2)
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SessionCache(os.path.join(self.directory.name, "session"))
+        self.filename = os.path.join(self.directory.name, "supply.txt")
+        self.products = [Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15), Belt(datetime.datetime(2024, 2, 2), "Belt", 3, True)]
+        ProductFileHandler.save_products(self.products, self.filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_restore_unchanged_source(self):
+        self.assertIsNone(self.cache.restore())
+        source = SessionCache.stamp(self.filename)
+        self.assertTrue(self.cache.save(source, self.products + [Cup(datetime.datetime(2025, 3, 3), "Cup", 7, 250)]))
+        restored_source, products = self.cache.restore()
+        self.assertEqual(restored_source, source)
+        self.assertEqual([str(product) for product in products], [str(product) for product in self.products] + ['Cup(03.03.2025, "Cup", 7, 250)'])
+
+    def test_changed_source_is_stale(self):
+        self.cache.save(SessionCache.stamp(self.filename), self.products)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(self.cache.restore())
+        self.cache.save(SessionCache.stamp(self.filename), self.products)
+        with open(self.filename, "a") as file:
+            file.write("Cup(01.01.2028, \"Cup\", 1, 100)\n")
+        self.assertIsNone(self.cache.restore())
+
+    def test_corrupted_snapshot_is_ignored(self):
+        self.cache.save(SessionCache.stamp(self.filename), self.products)
+        with open(self.cache.path, "r+b") as file:
+            file.seek(-10, os.SEEK_END)
+            file.write(b"corrupted!")
+        self.assertIsNone(self.cache.restore())
+        self.cache.clear()
+        self.assertFalse(os.path.exists(self.cache.path))
+
+class TestSnapshotFile(unittest.TestCase):
+    def test_round_trip_and_validation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "items.snap")
+            self.assertTrue(SnapshotFile.write(path, b"HEAD", [1, 2, 3]))
+            self.assertEqual(SnapshotFile.read(path, lambda file: file.read(4) == b"HEAD", int), [1, 2, 3])
+            self.assertIsNone(SnapshotFile.read(path, lambda file: file.read(4) == b"LOST", int))
+            self.assertIsNone(SnapshotFile.read(path, lambda file: file.read(4) == b"HEAD", str))
+            self.assertIsNone(SnapshotFile.read(os.path.join(directory, "missing.snap"), lambda file: True, int))
+            self.assertFalse(SnapshotFile.write(path, b"HEAD", [lambda: None]))
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["items.snap"])
+
+class TestCommandProcessor(unittest.TestCase):
+    def setUp(self):
+        self.manager = ProductManager()
+        self.logger = MagicMock()
+        self.processor = CommandProcessor(self.manager, ProductFileHandler(), self.logger)
+
+    def test_compound_remove(self):
+        self.assertTrue(self.processor.process_commands([
+            "ADD Cup; 01.01.2024; Old cup; 5; 250",
+            "ADD Cup; 01.01.2026; New cup; 5; 250",
+            "ADD Cake; 01.01.2024; Old cake; 5; 10",
+            "REM type = Cup AND amount < 10 AND supplyDate < 2025-01-01",
+        ]))
+        self.assertEqual([product.name for product in self.manager.products], ["New cup", "Old cake"])
+        entry, = self.processor.explain_commands(["REM NOT type = Cake"])
+        self.assertEqual(entry.matches, 1)
+
+    def test_queries(self):
+        output = []
+        self.processor.output = output.append
+        self.processor.process_commands([
+            "ADD Cup; 01.01.2024; Old cup; 5; 250",
+            "ADD Cake; 01.01.2024; Old cake; 7; 10",
+            "ADD Belt; 01.01.2024; Belt; 9; True",
+        ])
+        queries = list(self.processor.parser.parse(["COUNT", "COUNT amount > 6", "SUM amount WHERE NOT type = Belt", "SUM special"]))
+        self.assertEqual([self.processor.execute(command) for command in queries], [3, 2, 12, 260])
+        self.assertEqual(output[1], "COUNT amount > 6 -> 2")
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "cups.txt")
+            self.assertEqual(self.processor.execute(self.processor.parser.parse_line(1, f"SELECT type != Belt INTO {filename}")), 2)
+            self.assertEqual([product.name for product in ProductFileHandler.load_products(filename)], ["Old cup", "Old cake"])
+        self.assertEqual(len(self.manager.products), 3)
+        entries = self.processor.explain_commands(["REM type = Cup", "COUNT amount < 8"])
+        self.assertEqual(entries[1].matches, 1)
+
+    def test_process_commands(self):
+        lines = ["ADD Cake; 01.01.2028; Test cake; 10; 20", "ADD Cup; 01.01.2028; Test cup; 300; 250", "REM 100 <= amount <= 300"]
+        self.assertTrue(self.processor.process_commands(lines))
+        self.assertEqual([product.name for product in self.manager.products], ["Test cake"])
+
+    def test_unknown_command(self):
+        self.assertTrue(self.processor.process_commands(["", "# comment", "DROP all"]))
+        self.logger.log_message.assert_called_once_with("WARNING", "Unknown command at line 3: DROP all")
+
+    def test_transaction_keywords_are_whole_words(self):
+        self.assertTrue(self.processor.process_commands(["BEGINNING", "COMMITTEE x"]))
+        self.assertEqual(self.logger.log_message.call_count, 2)
+        self.assertEqual(self.processor.parser.parse_line(1, "BEGIN now").error, "BEGIN takes no arguments: now")
+
+    def test_query_keywords_are_whole_words(self):
+        self.assertTrue(self.processor.process_commands(["COUNTRY road", "SUMMARY", "SELECTED foo"]))
+        self.assertEqual(self.logger.log_message.call_count, 3)
+
+    def test_failed_command_stops_processing(self):
+        self.assertFalse(self.processor.process_commands(["REM color = red", "ADD Cake; 01.01.2028; Test cake; 10; 20"]))
+        self.assertEqual(len(self.manager.products), 0)
+        self.assertEqual(self.logger.log_message.call_count, 2)
+
+    def test_remove_by_supply_date(self):
+        lines = ["ADD Cake; 01.01.2024; Old cake; 10; 20", "ADD Cake; 01.01.2025; New cake; 10; 20", "REM supplyDate < 2025-01-01"]
+        self.assertTrue(self.processor.process_commands(lines))
+        self.assertEqual([product.name for product in self.manager.products], ["New cake"])
+
+    def test_invalid_command_after_valid_ones(self):
+        self.assertFalse(self.processor.process_commands(["ADD Cake; 01.01.2028; Test cake; 10; 20", "ADD Cake; 01.01.2028; Bad"]))
+        self.assertEqual(len(self.manager.products), 1)
+        self.logger.log_message.assert_any_call("ERROR", "Failed processing line 2: ADD Cake; 01.01.2028; Bad. Error: Invalid ADD command format")
+
+    def test_add_runs_are_batched(self):
+        listener = MagicMock()
+        self.manager.add_listener(listener)
+        lines = ["ADD Cake; 01.01.2028; A; 10; 20", "ADD Cake; 01.01.2028; B; 10; 20", "REM name = A",
+                 "ADD Cup; 01.01.2028; C; 5; 250", "ADD Cup; 01.01.2028; D; 5; 250", "ADD Cup; 01.01.2028; E; 5; 250"]
+        self.assertTrue(self.processor.process_commands(lines))
+        self.assertEqual([len(call.args[1]) for call in listener.products_added.call_args_list], [2, 3])
+        self.assertEqual([product.name for product in self.manager.products], ["B", "C", "D", "E"])
+
+    def test_transaction_rollback_and_commit(self):
+        lines = ["ADD Cake; 01.01.2028; Kept; 10; 20", "BEGIN", "ADD Cake; 01.01.2028; Dropped; 10; 20", "REM amount = 10", "ROLLBACK",
+                 "BEGIN", "ADD Cup; 01.01.2028; Committed; 5; 250", "COMMIT"]
+        self.assertTrue(self.processor.process_commands(lines))
+        self.assertEqual([product.name for product in self.manager.products], ["Kept", "Committed"])
+
+    def test_failure_rolls_back_open_transaction(self):
+        lines = ["ADD Cake; 01.01.2028; Kept; 10; 20", "BEGIN", "REM amount = 10", "BEGIN", "ADD Cup; 01.01.2028; Cup; 5; 250", "REM color = red"]
+        self.assertFalse(self.processor.process_commands(lines))
+        self.assertEqual([product.name for product in self.manager.products], ["Kept"])
+        self.logger.log_message.assert_any_call("WARNING", "Rolled back transaction started at line 2 (2 changes)")
+
+    def test_uncommitted_transaction_is_rolled_back(self):
+        self.assertTrue(self.processor.process_commands(["BEGIN", "ADD Cake; 01.01.2028; Cake; 10; 20"]))
+        self.assertEqual(len(self.manager.products), 0)
+        self.assertFalse(self.processor.process_commands(["COMMIT"]))
+
+    def test_atomic_command_file(self):
+        self.processor.atomic = True
+        self.manager.add_product(Cake(datetime.datetime(2028, 1, 1), "Existing", 10, 20))
+        self.assertFalse(self.processor.process_commands(["REM amount = 10", "ADD Cup; 01.01.2028; Cup; 5; 250", "ADD Boot; 1.1.2028; x; 1; 1"]))
+        self.assertEqual([product.name for product in self.manager.products], ["Existing"])
+        self.assertTrue(self.processor.process_commands(["ADD Cup; 01.01.2028; Cup; 5; 250", "BEGIN", "REM amount = 5", "COMMIT"]))
+        self.assertEqual([product.name for product in self.manager.products], ["Existing"])
+        self.assertEqual(self.manager.listeners, [])
+
+    def test_explain_does_not_change_products(self):
+        for amount in (50, 150, 250):
+            self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Cup", amount, 250))
+        products = self.manager.products
+        version = self.manager.version
+        entries = self.processor.explain_commands(["ADD Cup; 01.01.2028; New; 120; 250", "REM 100 <= amount <= 200",
+                                                   "REM amount >= 100", "SAVE out.txt", "LIST", "REM color = red", "REM amount > 1"])
+        self.assertEqual([entry.matches for entry in entries], [1, 2, 1, 1, None, None])
+        self.assertEqual(entries[-1].error, "Unsupported REM condition: color = red")
+        self.assertIs(self.manager.products, products)
+        self.assertEqual(self.manager.version, version)
+        self.assertFalse(os.path.exists("out.txt"))
+
+    def test_explain_transactions(self):
+        self.manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Cup", 50, 250))
+        entries = self.processor.explain_commands(["BEGIN", "REM amount = 50", "ROLLBACK", "REM amount < 100", "COMMIT"])
+        self.assertEqual([entry.matches for entry in entries], [0, 1, 0, 1, 0])
+        self.assertEqual(entries[-1].error, "COMMIT without BEGIN")
+
+    def test_missing_file(self):
+        self.assertFalse(self.processor.process_command_file("missing_commands.txt"))
+        self.logger.log_message.assert_called_once_with("ERROR", "Command file not found: missing_commands.txt")
+
+class TestCommandServer(unittest.TestCase):
+    def setUp(self):
+        self.product_manager = ProductManager()
+        self.product_manager.add_product(Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15))
+        self.logger = MagicMock()
+        self.server = CommandServer(CommandProcessor(self.product_manager, ProductFileHandler(), self.logger))
+
+    def run_clients(self, *scripts):
+        async def client(lines):
+            host, port = self.server.address().split(":")
+            reader, writer = await asyncio.open_connection(host, int(port))
+            replies = []
+            for line in lines:
+                if line is None:
+                    break
+                writer.write(line.encode() + b"\n")
+                await writer.drain()
+                replies.append((await reader.readline()).decode().strip())
+            writer.close()
+            await writer.wait_closed()
+            return replies
+
+        async def run():
+            await self.server.start()
+            try:
+                return await asyncio.gather(*(client(lines) for lines in scripts))
+            finally:
+                await self.server.close()
+        return asyncio.run(run())
+
+    def test_replies(self):
+        replies, = self.run_clients(["ADD Cup; 01.01.2028; Test cup; 30; 250", "REM amount < 10", "FOO", "REM foo"])
+        self.assertEqual(replies[:3], ["OK 1", "OK 1", "ERR Unknown command: FOO"])
+        self.assertTrue(replies[3].startswith("ERR Unsupported REM condition"))
+        self.assertEqual(self.server.commands, 4)
+
+    def test_concurrent_clients(self):
+        scripts = [[f"ADD Cup; 01.01.2028; Cup {i}; {j}; 250" for j in range(20)] for i in range(5)]
+        results = self.run_clients(*scripts)
+        self.assertEqual(results, [["OK 1"] * 20] * 5)
+        self.assertEqual(len(self.product_manager.products), 101)
+
+    def test_transaction_rolled_back_on_disconnect(self):
+        replies, = self.run_clients(["BEGIN", "REM amount < 10", None])
+        self.assertEqual(replies, ["OK 0", "OK 1"])
+        self.assertEqual(len(self.product_manager.products), 1)
+        self.assertFalse(self.server.lock.locked())
+
+    def test_idle_transaction_times_out(self):
+        self.server.transaction_timeout = 0.2
+        async def run():
+            await self.server.start()
+            try:
+                host, port = self.server.address().split(":")
+                idle_reader, idle_writer = await asyncio.open_connection(host, int(port))
+                idle_writer.write(b"BEGIN\nREM amount < 10\n")
+                replies = [(await idle_reader.readline()).decode().strip() for _ in range(2)]
+                reader, writer = await asyncio.open_connection(host, int(port))
+                writer.write(b"COUNT\n")
+                replies.append((await reader.readline()).decode().strip())
+                replies.append((await idle_reader.readline()).decode().strip())
+                replies.append(await idle_reader.readline())
+                for stream in (idle_writer, writer):
+                    stream.close()
+                    await stream.wait_closed()
+                return replies
+            finally:
+                await self.server.close()
+        replies = asyncio.run(run())
+        self.assertEqual(replies, ["OK 0", "OK 1", "OK 1", "ERR Transaction timed out, rolled back", b""])
+        self.assertEqual(len(self.product_manager.products), 1)
+        self.assertFalse(self.server.lock.locked())
+
+    def test_invalid_lines(self):
+        async def run():
+            await self.server.start()
+            try:
+                host, port = self.server.address().split(":")
+                reader, writer = await asyncio.open_connection(host, int(port))
+                writer.write(b"BEGIN\nREM name = \xff\nCOUNT\n" + b"x" * (CommandServer.LINE_LIMIT + 10) + b"\n")
+                replies = [(await reader.readline()).decode().strip() for _ in range(4)]
+                replies.append(await reader.readline())
+                writer.close()
+                await writer.wait_closed()
+                return replies
+            finally:
+                await self.server.close()
+        replies = asyncio.run(run())
+        self.assertEqual(replies, ["OK 0", "ERR Line 2 is not valid UTF-8", "OK 1", f"ERR Line longer than {CommandServer.LINE_LIMIT} bytes", b""])
+        self.assertFalse(self.server.lock.locked())
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.enabled = Metrics.enabled
+        Metrics.reset()
+        self.manager = ProductManager()
+        self.manager.add_products([Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15), Cup(datetime.datetime(2023, 1, 1), "Cup", 20, 250)])
+
+    def tearDown(self):
+        Metrics.enable(self.enabled)
+        Metrics.reset()
+
+    def test_disabled(self):
+        Metrics.enable(False)
+        self.manager.remove_by_inequality("amount", 10, True)
+        self.assertEqual(Metrics.snapshot(), {})
+        self.assertEqual(Metrics.report(), "No operations recorded")
+
+    def test_record_operations(self):
+        Metrics.enable()
+        self.manager.remove_by_inequality("amount", 10, True)
+        processor = CommandProcessor(self.manager, ProductFileHandler(), MagicMock())
+        processor.process_commands(["ADD Cup; 01.01.2028; A; 1; 250", "ADD Cup; 01.01.2028; B; 1; 250", "REM amount = 1", "COUNT"])
+        stats = Metrics.snapshot()
+        self.assertEqual((stats["ProductManager.remove_by_inequality"]["count"], stats["ProductManager.remove_by_inequality"]["rows"]), (1, 1))
+        self.assertEqual((stats["CommandProcessor.AddCommand"]["count"], stats["CommandProcessor.AddCommand"]["rows"]), (1, 2))
+        self.assertEqual(stats["CommandProcessor.RemoveCommand"]["rows"], 2)
+        self.assertEqual(stats["CommandProcessor.QueryCommand"]["rows"], 1)
+        self.assertEqual(sum(stats["ProductManager.remove_where"]["histogram"].values()), 2)
+        self.assertIn("ProductManager.remove_where", Metrics.report())
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.supply_file = os.path.join(self.temp_dir.name, "supply.txt")
+        ProductFileHandler.save_products([Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15)], self.supply_file)
+        self.modes, self.directory = Profiler.modes, Profiler.directory
+
+    def tearDown(self):
+        Profiler.modes, Profiler.directory = self.modes, self.directory
+        self.temp_dir.cleanup()
+
+    def test_disabled(self):
+        Profiler.configure("", os.path.join(self.temp_dir.name, "logs"))
+        ProductFileHandler.load_products(self.supply_file)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "logs")))
+
+    def test_profile_cpu_and_memory(self):
+        Profiler.configure("all", os.path.join(self.temp_dir.name, "logs"))
+        self.assertEqual(Profiler.modes, {"cpu", "memory"})
+        processor = CommandProcessor(ProductManager(), ProductFileHandler(), MagicMock())
+        commands_file = os.path.join(self.temp_dir.name, "commands.txt")
+        with open(commands_file, "w") as file:
+            file.write("ADD Cup; 01.01.2028; Test cup; 30; 250\n")
+        processor.process_command_file(commands_file)
+        prof_file, report_file = Profiler.last_files
+        self.assertTrue(prof_file.endswith("_process_command_file.prof"))
+        with open(report_file) as file:
+            report = file.read()
+        self.assertIn("functions by cumulative time", report)
+        self.assertIn("allocation sites", report)
+
+    def test_nested_calls_report_once(self):
+        Profiler.configure("memory", os.path.join(self.temp_dir.name, "logs"))
+        with Profiler.profile("outer"):
+            ProductFileHandler.load_products(self.supply_file)
+        self.assertEqual(len(os.listdir(os.path.join(self.temp_dir.name, "logs"))), 1)
+        self.assertTrue(Profiler.last_files[0].endswith("_outer.txt"))
+
+class TestMetricsServer(unittest.TestCase):
+    def setUp(self):
+        self.enabled = Metrics.enabled
+        Metrics.reset()
+        self.manager = ProductManager()
+        self.logger = Logger(tempfile.mkdtemp())
+        self.server = MetricsServer(self.manager, self.logger)
+        self.address = self.server.start()
+
+    def tearDown(self):
+        self.server.close()
+        self.logger.close()
+        shutil.rmtree(self.logger.directory)
+        Metrics.enable(self.enabled)
+        Metrics.reset()
+
+    def test_metrics(self):
+        counts = dict(CommandProcessor.command_counts)
+        processor = CommandProcessor(self.manager, ProductFileHandler(), self.logger)
+        processor.process_commands(["ADD Cup; 01.01.2028; A; 1; 250", "ADD Cake; 01.01.2028; B; 1; 10", "REM name = A", "COUNT"])
+        with urllib.request.urlopen(f"http://{self.address}/metrics") as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+            lines = response.read().decode().splitlines()
+        self.assertIn('lab4_products{type="Cake"} 1', lines)
+        self.assertNotIn('lab4_products{type="Cup"} 1', lines)
+        self.assertIn(f'lab4_commands_total{{kind="ADD"}} {counts.get("ADD", 0) + 2}', lines)
+        self.assertIn(f'lab4_commands_total{{kind="REM"}} {counts.get("REM", 0) + 1}', lines)
+        self.assertIn('lab4_operation_seconds_count{operation="CommandProcessor.RemoveCommand"} 1', lines)
+        self.assertIn('lab4_operation_seconds_bucket{operation="CommandProcessor.RemoveCommand",le="+Inf"} 1', lines)
+        self.assertTrue(any(line.startswith("lab4_log_queue_depth ") for line in lines))
+
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(f"http://{self.address}/other")
+        self.assertEqual(context.exception.code, 404)
+
+class TestDataGenerator(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_supply_file(self):
+        filename = os.path.join(self.temp_dir.name, "supply.txt")
+        generator = DataGenerator(seed=3, types={"Cake": 1, "Cup": 1}, names=5, start_date=datetime.date(2025, 1, 1),
+                                  end_date=datetime.date(2025, 1, 31), amount_min=10, amount_max=20, amount_distribution="normal")
+        self.assertEqual(generator.write_supply(filename, rows=500), 500)
+        products = ProductFileHandler.load_products(filename)
+        self.assertEqual(len(products), 500)
+        self.assertEqual({type(product) for product in products}, {Cake, Cup})
+        self.assertLessEqual(len({product.name for product in products}), 5)
+        self.assertTrue(all(10 <= product.amount <= 20 and product.supplyDate.month == 1 for product in products))
+
+    def test_reproducible(self):
+        first = DataGenerator(seed=7, name_skew=1.2).command_lines(300)
+        self.assertEqual(first, DataGenerator(seed=7, name_skew=1.2).command_lines(300))
+        self.assertNotEqual(first, DataGenerator(seed=8, name_skew=1.2).command_lines(300))
+        commands = list(CommandParser().parse(first.splitlines()))
+        self.assertEqual(len(commands), 300)
+        self.assertFalse(any(isinstance(command, InvalidCommand) for command in commands))
+
+    def test_size_and_selectivity(self):
+        filename = os.path.join(self.temp_dir.name, "commands.txt")
+        generator = DataGenerator(seed=1)
+        generator.CHUNK_ROWS = 100
+        generator.write_commands(filename, size=20000, add_ratio=0, rem_ratio=1, save_ratio=0, selectivity=0.1)
+        self.assertGreaterEqual(os.path.getsize(filename), 20000)
+        for command in CommandParser().parse_file(filename):
+            self.assertAlmostEqual(command.condition.range_max - command.condition.range_min + 1, 50, delta=1)
+
+    def test_workers_give_equal_files(self):
+        files = []
+        for workers in (1, 2):
+            files.append(os.path.join(self.temp_dir.name, f"supply_{workers}.txt"))
+            generator = DataGenerator(seed=5, workers=workers)
+            generator.CHUNK_ROWS = 100
+            self.assertEqual(generator.write_supply(files[-1], rows=950), 950)
+        with open(files[0]) as first, open(files[1]) as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            DataGenerator(amount_distribution="cauchy")
+        with self.assertRaises(ValueError):
+            DataGenerator(types={"Boot": 1})
+
+@unittest.skipIf(os.environ.get("LAB4_SKIP_PERF"), "performance tier disabled by LAB4_SKIP_PERF")
+class TestPerformance(unittest.TestCase):
+    """Time must grow about linearly with input size, the fitted log-log slope is 1 for linear and 2 for quadratic paths"""
+
+    ROWS = 10000
+    SIZES = (ROWS, ROWS * 2, ROWS * 4)
+    MAX_SLOPE = 1.5
+    # Fast operations are repeated until a timing is long enough to survive scheduler noise
+    MIN_SECONDS = 0.05
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.files = {}
+        cls.products = {}
+        for rows in cls.SIZES:
+            cls.files[rows] = os.path.join(cls.temp_dir.name, f"supply_{rows}.txt")
+            DataGenerator(seed=rows).write_supply(cls.files[rows], rows=rows)
+            cls.products[rows] = ProductFileHandler.load_products(cls.files[rows])
+        cls.output_file = os.path.join(cls.temp_dir.name, "output.txt")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def mean_time(self, setup, run):
+        # CPU time of this process, so other jobs on a shared machine do not count
+        total = 0.0
+        calls = 0
+        batch = 1
+        while total < self.MIN_SECONDS:
+            states = [setup() for _ in range(batch)]
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.process_time()
+                for state in states:
+                    run(state)
+                total += time.process_time() - start
+            finally:
+                gc.enable()
+            calls += batch
+            batch = min(batch * 2, 32)
+        return total / calls
+
+    def best_time(self, setup, run, repeat=3):
+        return min(self.mean_time(setup, run) for _ in range(repeat))
+
+    def assertLinear(self, setup, run):
+        # Least squares over three sizes, a single noisy timing moves the slope much less than a ratio of two
+        times = [self.best_time(lambda rows=rows: setup(rows), run) for rows in self.SIZES]
+        xs = [math.log(rows) for rows in self.SIZES]
+        ys = [math.log(seconds) for seconds in times]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+        self.assertLess(slope, self.MAX_SLOPE, " -> ".join(f"{seconds * 1000:.2f} ms" for seconds in times))
+
+    def peak_bytes_per_row(self, setup, run, rows):
+        state = setup()
+        tracemalloc.start()
+        try:
+            run(state)
+            return tracemalloc.get_traced_memory()[1] / rows
+        finally:
+            tracemalloc.stop()
+
+    def manager(self, rows):
+        manager = ProductManager()
+        manager.add_products(self.products[rows].copy())
+        return manager
+
+    def test_load_scaling(self):
+        self.assertLinear(lambda rows: self.files[rows], ProductFileHandler.load_products)
+
+    def test_save_scaling(self):
+        self.assertLinear(lambda rows: self.products[rows], lambda products: ProductFileHandler.save_products(products, self.output_file))
+
+    def test_remove_scaling(self):
+        condition = CommandParser().parse_condition("100 <= amount <= 300 OR type = Belt")
+        self.assertLinear(self.manager, condition.apply)
+
+    def test_remove_rows_scaling(self):
+        self.assertLinear(self.manager, lambda manager: manager.remove_rows(range(0, len(manager.products), 2)))
+
+    def test_bulk_add_scaling(self):
+        lines = {rows: DataGenerator(seed=rows).command_lines(rows, add_ratio=1, rem_ratio=0, save_ratio=0).splitlines()
+                 for rows in self.SIZES}
+        self.assertLinear(lambda rows: lines[rows],
+                          lambda commands: CommandProcessor(ProductManager(), ProductFileHandler(), MagicMock()).process_commands(commands))
+
+    def test_memory_budgets(self):
+        rows = self.ROWS
+        # Products themselves, about 220 bytes per row today
+        self.assertLess(self.peak_bytes_per_row(lambda: self.files[rows], ProductFileHandler.load_products, rows), 400)
+        # Kept and removed row lists only
+        self.assertLess(self.peak_bytes_per_row(lambda: self.manager(rows), lambda manager: manager.remove_by_range("amount", 100, 300), rows), 64)
+        # Saving streams, independent of row count
+        self.assertLess(self.peak_bytes_per_row(lambda: self.products[rows], lambda products: ProductFileHandler.save_products(products, self.output_file), rows), 16)
+        # Dry run keeps one byte per row and the matching row numbers
+        processor = CommandProcessor(self.manager(rows), ProductFileHandler(), MagicMock())
+        self.assertLess(self.peak_bytes_per_row(lambda: ["REM amount > 250", "COUNT type = Cup"], processor.explain_commands, rows), 64)
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_suite(self):
+        with patch('sys.stderr', new_callable=io.StringIO):
+            results = benchmarks.run_suite([200], repeat=1)
+        self.assertEqual([result["benchmark"] for result in results],
+                         ["load_products", "save_products", "bulk_add", *benchmarks.REMOVALS, "table_data"])
+        self.assertTrue(all(result["rows"] == 200 and result["seconds"] > 0 for result in results))
+        json.dumps(results)
+
+    def test_compare(self):
+        baseline = [{"benchmark": "load_products", "rows": 1000, "seconds": 0.1}, {"benchmark": "bulk_add", "rows": 1000, "seconds": 0.1}]
+        results = [{"benchmark": "load_products", "rows": 1000, "seconds": 0.2}, {"benchmark": "bulk_add", "rows": 1000, "seconds": 0.11}]
+        regressions = benchmarks.compare(results, baseline, 1.25)
+        self.assertEqual(regressions, ["load_products at 1000 rows: 100.0 ms -> 200.0 ms (2.00x)"])
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.supply_file = "temp_cli_supply.txt"
+        self.commands_file = "temp_cli_commands.txt"
+        self.output_file = "temp_cli_output.txt"
+        ProductFileHandler.save_products([Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15)], self.supply_file)
+        with open(self.commands_file, "w") as file:
+            file.write(f"ADD Cup; 01.01.2028; Test cup; 30; 250\nSAVE {self.output_file}\n")
+
+    def tearDown(self):
+        for filename in (self.supply_file, self.commands_file, self.output_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_run_command_files(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(cli.main([self.supply_file, self.commands_file, "--cache-dir", cache_dir]), 0)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertIn("load", stderr.getvalue())
+        self.assertEqual(len(ProductFileHandler.load_products(self.output_file)), 2)
+
+    def test_run_stdin(self):
+        with patch('sys.stdin', io.StringIO(f"REM amount < 10\nSAVE {self.output_file}\n")), patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(cli.main([self.supply_file]), 0)
+        self.assertEqual(ProductFileHandler.load_products(self.output_file), [])
+
+    def test_serve_does_not_read_stdin(self):
+        with patch('sys.stdin', io.StringIO("REM amount < 10\n")), patch('sys.stderr', new_callable=io.StringIO), \
+                patch('cli.serve', new_callable=AsyncMock) as serve:
+            self.assertEqual(cli.main([self.supply_file, "--serve", "0"]), 0)
+            self.assertEqual(sys.stdin.read(), "REM amount < 10\n")
+        self.assertEqual(len(serve.call_args.args[0].product_manager.products), 1)
+
+    def test_dry_run(self):
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout, patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(cli.main([self.supply_file, self.commands_file, "--dry-run", "--no-cache"]), 0)
+        self.assertIn("line 1: ADD Cup; 01.01.2028; Test cup; 30; 250 -> 1 rows", stdout.getvalue())
+        self.assertFalse(os.path.exists(self.output_file))
+
+    def test_stats(self):
+        enabled = Metrics.enabled
+        try:
+            with patch('sys.stdout', new_callable=io.StringIO), patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                self.assertEqual(cli.main([self.supply_file, self.commands_file, "--no-cache", "--stats"]), 0)
+        finally:
+            Metrics.enable(enabled)
+            Metrics.reset()
+        self.assertIn("ProductFileHandler.load_products", stderr.getvalue())
+        self.assertIn("CommandProcessor.SaveCommand", stderr.getvalue())
+
+    def test_does_not_import_qt(self):
+        result = subprocess.run([sys.executable, "-c", "import cli, sys; print('PyQt6' in sys.modules)"],
+                                capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_core_imports_are_lazy(self):
+        code = ("import sys; from main import ProductManager, CommandProcessor; import cli\n"
+                "print(sorted(name for name in ('PyQt6', 'asyncio', 'http.server', 'pstats') if name in sys.modules))\n"
+                "import main; main.ProductWindow; print('PyQt6' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(result.stdout.split("\n")[:2], ["[]", "True"])
+
+    def test_import_time_budget(self):
+        if os.environ.get("LAB4_SKIP_PERF"):
+            self.skipTest("LAB4_SKIP_PERF is set")
+        # CPU time of the core import in units of a fixed pure-Python workload run by the same interpreter,
+        # so the budget scales with the machine. About 0.7 when written, a core import 40% slower fails.
+        code = ("import time\n"
+                "start = time.process_time(); import cli; core = time.process_time() - start\n"
+                "start = time.process_time(); sum(i * i for i in range(1_000_000)); reference = time.process_time() - start\n"
+                "print(core / reference)")
+        # Best of a few interpreters, the first one also warms the bytecode cache
+        ratio = min(float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout) for _ in range(3))
+        self.assertLess(ratio, 1.0)
+
 class TestProductWindow(unittest.TestCase):
     def setUp(self):
         self.window = ProductWindow()
@@ -162,6 +1383,7 @@ class TestProductWindow(unittest.TestCase):
     def test_initial_state(self):
         self.assertEqual(self.window.windowTitle(), "Product supply")
         self.assertEqual(len(self.window.product_manager.products), 0)
+        self.assertIsNone(self.window.scenario_cache)
         
     def test_add_product(self):
         self.window.name_edit.setText("Test Product")
@@ -174,6 +1396,12 @@ class TestProductWindow(unittest.TestCase):
         self.assertEqual(len(self.window.product_manager.products), 1)
         self.assertEqual(self.window.product_manager.products[0].name, "Test Product")
 
+    def test_summary_panel(self):
+        self.window.product_manager.add_product(Cup(datetime.datetime(2023, 1, 1), "Cup", 20, 250))
+        self.window.refresh_summary()
+        self.assertIn("Cup: 20", self.window.type_summary.text())
+        self.assertIn("2023-01: 20", self.window.month_summary.text())
+
     @patch.object(QMessageBox, 'warning')
     def test_add_product_empty_name(self, mock_warning):
         self.window.name_edit.setText("")
@@ -190,6 +1418,52 @@ class TestProductWindow(unittest.TestCase):
         self.window.delete_product()
         self.assertEqual(len(self.window.product_manager.products), 0)
 
+    @patch.object(QMessageBox, 'question', return_value=QMessageBox.StandardButton.Yes)
+    def test_delete_selected_products(self, mock_question):
+        for amount in range(5):
+            self.window.product_manager.add_product(Cup(datetime.datetime.now(), "Cup", amount, 250))
+        self.window.filter_model.layoutChanged.emit()
+        self.window.table_view.selectRow(1)
+        self.window.table_view.selectionModel().select(
+            self.window.filter_model.index(3, 0),
+            self.window.table_view.selectionModel().SelectionFlag.Select | self.window.table_view.selectionModel().SelectionFlag.Rows
+        )
+        self.window.delete_product()
+        mock_question.assert_called_once()
+        self.assertEqual([product.amount for product in self.window.product_manager.products], [0, 2, 4])
+
+    @patch.object(QMessageBox, 'information')
+    def test_explain_scenario(self, mock_info):
+        self.window.product_manager.add_product(Cup(datetime.datetime.now(), "Cup", 5, 250))
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("REM amount < 10\n")
+        try:
+            with patch.object(QFileDialog, 'getOpenFileName', return_value=(file.name, None)), tempfile.TemporaryDirectory() as cache_dir:
+                self.window.scenario_cache = ScenarioCache(cache_dir)
+                self.window.explain_scenario()
+        finally:
+            os.remove(file.name)
+        self.assertIn("1 REM commands would remove 1 products", mock_info.call_args.args[2])
+        self.assertEqual(len(self.window.product_manager.products), 1)
+
+    @patch.object(DiagnosticsDialog, 'exec')
+    def test_show_diagnostics(self, mock_exec):
+        enabled = Metrics.enabled
+        try:
+            Metrics.enable()
+            Metrics.record("ProductTableModel.data", 0.001)
+            self.window.show_diagnostics()
+            mock_exec.assert_called_once()
+            dialog = DiagnosticsDialog(self.window)
+            self.assertIn("ProductTableModel.data", dialog.report_text.toPlainText())
+            dialog.reset_button.click()
+            self.assertEqual(dialog.report_text.toPlainText(), "No operations recorded")
+            dialog.enabled_check.setChecked(False)
+            self.assertFalse(Metrics.enabled)
+        finally:
+            Metrics.enable(enabled)
+            Metrics.reset()
+
     @patch.object(ProductFileHandler, 'save_products')
     @patch.object(QFileDialog, 'getSaveFileName', return_value=("test.txt", None))
     def test_save_products(self, mock_dialog, mock_save):
@@ -213,7 +1487,41 @@ class TestProductWindow(unittest.TestCase):
     def test_load_products_failure(self, mock_critical, mock_dialog, mock_load):
         self.window.load_products()
         mock_critical.assert_called_once()
-        
+
+    @patch.object(QMessageBox, 'question', return_value=QMessageBox.StandardButton.Yes)
+    def test_undo_redo_delete(self, mock_question):
+        for name in ("First", "Second"):
+            self.window.name_edit.setText(name)
+            self.window.add_product()
+        self.window.table_view.selectRow(0)
+        self.window.delete_product()
+        self.assertTrue(self.window.undo_button.isEnabled())
+        self.window.undo()
+        self.assertEqual([product.name for product in self.window.product_manager.products], ["First", "Second"])
+        self.assertEqual(self.window.filter_model.rowCount(), 2)
+        self.assertTrue(self.window.redo_button.isEnabled())
+        self.window.redo()
+        self.assertEqual([product.name for product in self.window.product_manager.products], ["Second"])
+        self.assertFalse(self.window.redo_button.isEnabled())
+
+    @patch.object(QMessageBox, 'information')
+    def test_session_restored_on_launch(self, mock_info):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "supply.txt")
+            ProductFileHandler.save_products([Cake(datetime.datetime(2023, 1, 1), "Cake", 5, 15)], filename)
+            cache = SessionCache(os.path.join(directory, "session"))
+            window = ProductWindow(cache)
+            with patch.object(QFileDialog, 'getOpenFileName', return_value=(filename, None)):
+                window.load_products()
+            window.product_manager.add_product(Cup(datetime.datetime(2025, 3, 3), "Cup", 7, 250))
+            window.close()
+
+            with patch.object(ProductFileHandler, 'load_products', side_effect=AssertionError("parsed again")):
+                restored = ProductWindow(cache)
+            self.assertEqual(len(restored.product_manager.products), 2)
+            self.assertEqual(restored.filter_model.rowCount(), 2)
+            self.assertEqual(restored.session_source, SessionCache.stamp(filename))
+
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file